@@ -0,0 +1,170 @@
+"""Cache des itinéraires calculés par l'application."""
+
+import threading
+import time
+from collections import OrderedDict
+
+from compteurs import TableCompteurs
+
+# Compteurs du cache, dans l'ordre de leur ligne de TableCompteurs
+COMPTEURS = ("succes", "echecs", "evictions", "expirations", "regroupements")
+
+
+class _Calcul:
+    """Calcul en cours, attendu par les requêtes identiques simultanées."""
+
+    def __init__(self):
+        self.termine = threading.Event()
+        self.valeur = None
+        self.erreur = None
+
+
+class CacheItineraires:
+    """Cache borné (LRU) à durée de vie limitée des itinéraires.
+
+    Les itinéraires sont conservés par clef (codes UIC de départ et
+    d'arrivée, filtres et prix). Lorsque le cache est plein, l'entrée
+    utilisée le moins récemment est retirée. Plusieurs requêtes identiques
+    simultanées ne déclenchent qu'un seul calcul, dont elles partagent le
+    résultat. Le cache est vidé dès que la version des données du réseau
+    change.
+
+    Chaque processus de service conserve ses propres itinéraires, mais les
+    compteurs du cache sont conservés dans une TableCompteurs partagée par
+    les processus créés après le cache : statistiques renvoie les totaux
+    de l'ensemble des processus.
+
+    Parameters
+    ----------
+    capacite : int
+        Nombre maximal d'itinéraires conservés (par défaut : 1024)
+
+    duree_vie : float
+        Durée de conservation d'un itinéraire en secondes (par défaut :
+        3600)
+
+    erreurs_individuelles : tuple
+        Exceptions propres à la requête qui a lancé le calcul (par exemple
+        son annulation) : les requêtes qui attendaient ce calcul le
+        relancent au lieu de recevoir l'exception (par défaut : aucune)
+    """
+
+    def __init__(self, capacite=1024, duree_vie=3600,
+                 erreurs_individuelles=()):
+        if capacite < 1:
+            raise ValueError("La capacité doit être au moins de 1")
+        self.capacite = capacite
+        self.duree_vie = duree_vie
+        self.erreurs_individuelles = tuple(erreurs_individuelles)
+        self.version = None
+        self._entrees = OrderedDict()
+        self._en_cours = {}
+        self._verrou = threading.Lock()
+        self._compteurs = TableCompteurs(len(COMPTEURS), nb_lignes=1)
+
+    def __len__(self):
+        return len(self._entrees)
+
+    def _compter(self, **valeurs):
+        """Ajoute des valeurs aux compteurs partagés du cache."""
+        self._compteurs.ajouter(
+            "cache", [COMPTEURS.index(nom) for nom in valeurs],
+            list(valeurs.values()))
+
+    def invalider(self):
+        """Vide le cache."""
+        with self._verrou:
+            self._entrees.clear()
+
+    def obtenir(self, clef, calcul, version=None):
+        """Renvoie l'itinéraire associé à la clef, en le calculant au besoin.
+
+        Parameters
+        ----------
+        clef : tuple
+            Clef de l'itinéraire
+
+        calcul : callable
+            Fonction sans argument calculant l'itinéraire. Les exceptions
+            qu'elle lève sont transmises à toutes les requêtes en attente
+            mais ne sont pas conservées.
+
+        version : any
+            Version des données du réseau : le cache est vidé lorsqu'elle
+            change
+
+        Returns
+        -------
+        any
+            L'itinéraire renvoyé par calcul.
+        """
+        while True:
+            en_cours, meneur, valeur = self._reserver(clef, version)
+            if meneur:
+                return self._calculer(clef, calcul, version, en_cours)
+            if en_cours is None:
+                return valeur
+            en_cours.termine.wait()
+            if en_cours.erreur is None:
+                return en_cours.valeur
+            if not isinstance(en_cours.erreur, self.erreurs_individuelles):
+                raise en_cours.erreur
+
+    def _reserver(self, clef, version):
+        """Cherche la clef dans le cache, sinon rejoint ou lance son calcul.
+
+        Renvoie le calcul en cours (None si la clef est en cache), s'il
+        vient d'être lancé par cette requête et la valeur en cache."""
+        with self._verrou:
+            if version != self.version:
+                self._entrees.clear()
+                self.version = version
+            entree = self._entrees.get(clef)
+            if entree is not None:
+                expiration, valeur = entree
+                if expiration > time.monotonic():
+                    self._entrees.move_to_end(clef)
+                    self._compter(succes=1)
+                    return None, False, valeur
+                del self._entrees[clef]
+                self._compter(expirations=1)
+            en_cours = self._en_cours.get(clef)
+            if en_cours is None:
+                en_cours = self._en_cours[clef] = _Calcul()
+                self._compter(echecs=1)
+                return en_cours, True, None
+            self._compter(regroupements=1)
+            return en_cours, False, None
+
+    def _calculer(self, clef, calcul, version, en_cours):
+        """Effectue le calcul, le conserve en cache et réveille les
+        requêtes qui l'attendaient."""
+        try:
+            en_cours.valeur = calcul()
+        except BaseException as erreur:
+            en_cours.erreur = erreur
+            raise
+        finally:
+            with self._verrou:
+                del self._en_cours[clef]
+                if en_cours.erreur is None and version == self.version:
+                    self._entrees[clef] = (time.monotonic() + self.duree_vie,
+                                           en_cours.valeur)
+                    if len(self._entrees) > self.capacite:
+                        self._entrees.popitem(last=False)
+                        self._compter(evictions=1)
+            en_cours.termine.set()
+        return en_cours.valeur
+
+    def statistiques(self):
+        """Renvoie les compteurs du cache sous forme de dictionnaire.
+
+        Les compteurs sont les totaux de tous les processus ; la taille et
+        la capacité sont celles du cache du processus appelant.
+        """
+        valeurs = self._compteurs.lignes().get("cache", [0] * len(COMPTEURS))
+        with self._verrou:
+            taille = len(self._entrees)
+        return {"taille": taille, "capacite": self.capacite,
+                **{nom: int(valeur)
+                   for nom, valeur in zip(COMPTEURS, valeurs)}}
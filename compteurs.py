@@ -0,0 +1,92 @@
+"""Compteurs nommés partagés entre les processus de service."""
+
+import mmap
+import multiprocessing
+import zlib
+
+import numpy as np
+
+
+class TableCompteurs:
+    """Lignes de compteurs nommées, partagées entre processus.
+
+    Les compteurs occupent une zone de mémoire anonyme partagée, héritée
+    par les processus créés après la table : chaque processus de service y
+    ajoute ses valeurs et la lecture renvoie les totaux de tous les
+    processus. Chaque nom occupe une ligne choisie d'après son empreinte
+    (la suivante si elle est prise par un autre nom).
+
+    Parameters
+    ----------
+    nb_valeurs : int
+        Nombre de compteurs de chaque ligne
+
+    nb_lignes : int
+        Nombre maximal de noms (par défaut : 256)
+
+    taille : int
+        Nombre maximal d'octets des noms (par défaut : 63)
+    """
+
+    def __init__(self, nb_valeurs, nb_lignes=256, taille=63):
+        if nb_valeurs < 1 or nb_lignes < 1:
+            raise ValueError("La table doit contenir au moins une ligne et "
+                             "une valeur par ligne")
+        self.nb_lignes = nb_lignes
+        self.taille = taille
+        self._noms = mmap.mmap(-1, nb_lignes * (taille + 1))
+        self._memoire = mmap.mmap(-1, nb_lignes * nb_valeurs * 8)
+        self._valeurs = np.frombuffer(self._memoire, dtype=np.float64
+                                      ).reshape(nb_lignes, nb_valeurs)
+        self._verrou = multiprocessing.Lock()
+
+    def _ligne(self, nom):
+        """Renvoie la ligne d'un nom, réservée au besoin, ou None si la
+        table est pleine."""
+        octets = nom.encode("utf-8")[:self.taille].ljust(self.taille, b"\0")
+        debut = zlib.crc32(octets) % self.nb_lignes
+        for decalage in range(self.nb_lignes):
+            ligne = (debut + decalage) % self.nb_lignes
+            position = ligne * (self.taille + 1)
+            case = self._noms[position:position + self.taille + 1]
+            if not case[0]:
+                self._noms[position:position + self.taille + 1] = \
+                    b"\1" + octets
+                return ligne
+            if case[1:] == octets:
+                return ligne
+        return None
+
+    def ajouter(self, nom, indices, valeurs):
+        """Ajoute des valeurs à des compteurs de la ligne d'un nom et
+        indique si elles ont été comptées (False si la table est pleine).
+
+        Parameters
+        ----------
+        nom : str
+            Nom de la ligne
+
+        indices : list[int]
+            Positions distinctes des compteurs dans la ligne
+
+        valeurs : list[float]
+            Valeurs ajoutées, une par position
+        """
+        with self._verrou:
+            ligne = self._ligne(nom)
+            if ligne is None:
+                return False
+            self._valeurs[ligne, indices] += valeurs
+        return True
+
+    def lignes(self):
+        """Renvoie une copie des compteurs de chaque nom."""
+        resultat = {}
+        with self._verrou:
+            for ligne in range(self.nb_lignes):
+                position = ligne * (self.taille + 1)
+                case = self._noms[position:position + self.taille + 1]
+                if case[0]:
+                    nom = case[1:].rstrip(b"\0").decode("utf-8", "replace")
+                    resultat[nom] = self._valeurs[ligne].copy()
+        return resultat
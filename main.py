@@ -1,25 +1,84 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify
+from reseau import RAYON_CORRESPONDANCE, Reseau
+from cache_itineraires import CacheItineraires
+from metriques import Metriques
+from serveur import TableAnnulations, servir
 import src.plus_court_chemin as pcc
-import pandas as pd
+from src.plus_court_chemin.chronometre import chronometre
+import argparse
+import threading
 import time
 
 
 app = Flask(__name__)
 
-def nom_to_code(nom, ref):
-    if nom == "":
-        raise ValueError("Une gare n'a pas été renseignée")
-
-    result = ref[ref["Intitulé plateforme"] == nom]["Code UIC"]
-
-    if result.empty:
-        raise ValueError(f"La gare '{nom}' est inconnu")
-    else:
-        return int(result.iloc[0])
-
-def code_to_nom(code, ref):
-    conv = ref[ref["Code UIC"] == code]
-    return(list(conv["Intitulé plateforme"])[0])
+#durées des étapes (importation, traitement, recherche et requêtes),
+#agrégées en histogrammes exposés sur /metrics, totaux de tous les processus
+#de service comme les compteurs du cache exposés sur /cache_stats
+metriques = Metriques()
+#durées des étapes de la requête en cours, si elle les a demandées
+etapes_requete = threading.local()
+
+
+def observer_etape(nom, duree):
+    """Ajoute la durée d'une étape aux histogrammes et, si la requête en
+    cours a demandé son chronométrage, à sa réponse."""
+    metriques.observer(nom, duree)
+    durees = getattr(etapes_requete, 'durees', None)
+    if durees is not None:
+        durees[nom] = durees.get(nom, 0) + duree
+
+pcc.ajouter_observateur(observer_etape)
+
+#le réseau est importé et préparé une seule fois, au démarrage, puis
+#enregistré dans un fichier binaire que les démarrages suivants ouvrent
+#directement tant que les fichiers de données n'ont pas changé
+FICHIER_RESEAU = "data/reseau.pccg"
+#des correspondances à pied sont ajoutées entre les gares distantes d'au
+#plus RAYON_CORRESPONDANCE mètres
+reseau = Reseau.charger("data", binaire=FICHIER_RESEAU,
+                        rayon_correspondance=RAYON_CORRESPONDANCE)
+#les itinéraires des combinaisons de filtres précalculées par precalcul.py
+#sont lus dans leurs tables, sans recherche
+DOSSIER_TABLES = "data/tables"
+reseau.charger_tables(DOSSIER_TABLES)
+verrou_reseau = threading.Lock()
+
+#les itinéraires déjà calculés sont conservés une heure ; une recherche
+#annulée par son client est relancée par les requêtes qui l'attendaient
+cache = CacheItineraires(capacite=1024, duree_vie=3600,
+                         erreurs_individuelles=(pcc.RechercheAnnulee,))
+
+#durée maximale d'une recherche, en secondes
+BUDGET_RECHERCHE = 5
+
+#recherches en cours, par identifiant de recherche envoyé par le
+#navigateur : partagées entre les processus de service, l'annulation d'une
+#recherche pouvant être reçue par un autre processus que celui qui l'exécute
+annulations = TableAnnulations()
+
+
+def reseau_courant():
+    """Renvoie le réseau, rechargé si les fichiers de données ont changé."""
+    global reseau
+    if reseau.est_perime():
+        with verrou_reseau:
+            if reseau.est_perime():
+                nouveau = Reseau.charger(
+                    "data", binaire=FICHIER_RESEAU,
+                    rayon_correspondance=RAYON_CORRESPONDANCE)
+                nouveau.charger_tables(DOSSIER_TABLES)
+                reseau = nouveau
+    return reseau
+
+
+def reponse(result, statut=200):
+    """Renvoie le résultat en json, avec la durée de chaque étape en
+    millisecondes si la requête l'a demandée."""
+    durees = getattr(etapes_requete, 'durees', None)
+    if durees is not None:
+        result['timing'] = {nom: 1000 * duree for nom, duree in durees.items()}
+    return jsonify(result), statut
 
 @app.route('/')
 def index():
@@ -27,6 +86,7 @@ def index():
 
 
 @app.route('/search_route', methods=['POST'])
+@chronometre('requete.search_route')
 def search_route():
     #on importe les variables de selection depuis le code javascript
     from_gare = request.form['from_gare']
@@ -37,98 +97,106 @@ def search_route():
     classe1 = request.form['classe1']
     classe2 = request.form['classe2']
     prix = request.form['prix']
+    #durée de chaque étape renvoyée avec la réponse si timing vaut 'true'
+    etapes_requete.durees = {} if request.form.get('timing') == 'true' else None
     
-    #on importe et traite les données
-    ref_gare = pcc.Importation("data/referentiel-gares-voyageurs.csv").lecture()
-    ref_gare = ref_gare[["Code UIC", "Intitulé plateforme"]]
-
-    df1 = pcc.Importation("data/tarifs-tgv-inoui-ouigo.csv").lecture()
-    if prix == "max":
-        colonne_to_drop = "Prix minimum"
-    else :
-        colonne_to_drop = "Prix maximum"
-
-    df1 = df1.drop(["Gare origine", "Destination", "Profil tarifaire", colonne_to_drop], axis= 1)
-    df1 = df1.set_axis(["Transporteur", "Origine", "Destination", "Classe", "Prix"], axis= 1)
-
-    df2 = pcc.Importation("data/tarifs-ter-par-od.csv").lecture()
-    df2 = df2.drop(["Région", "Origine", "Destination", "Libellé tarif"], axis= 1)
-    df2 = df2[df2.iloc[:,2] == "Tarif normal"]
-    df2 = df2.drop(["Type tarif"], axis= 1)
-    
-    df2 = df2.set_axis(["Origine", "Destination", "Prix"], axis= 1)
-
-    df = pd.concat([df1, df2],ignore_index=True, sort=False)
-    df = df.fillna('ter')
-
-    #on ajoute les correspondances de transport en commun dans quelques villes
-    def correspondance():
-        df = {
-        'Origine': [87751404,87319012,87765024,87765024,87765008,87765008,87318964,87318964,87747006,87335521,87109306,87109306,87223263,87223263,87286005,87286005,
-                8751008,87751081,87590299,87590299,87756353,87756353,87756254,87756254,87721175,87723197,87721175,87282624,87721175,87721001,87721175,87722025,
-                87721159,87282624,87721159,87721001,87723197,87282624,87697128,87723197,87547000,87547000,87547000,87547000,87547000,87547000,87686667,87686667,
-                87686667,87686667,87686667,87686667,87391003,87391003,87391003,87391003,87391003,87391003,87113001,87113001,87113001,87113001,87113001,87113001,
-                87686006,87686006,87686006,87686006,87686006,87686006,87271007,87271007,87271007,87271007,87271007,87271007,87271494,87271494,87271494,87271494,
-                87271494,87271494],
-        'Destination': [87319012,87751404,87765008,87318964,87318964,87765024,87765024,87765008,87335521,87747006,87223263,87286005,87109306,87286005,87109306,87223263,
-                87751081,8751008,87756353,87756254,87590299,87756254,87590299,87756353,87723197,87721175,87282624,87721175,87721001,87721175,87722025,87721175,
-                87282624,87721159,87721001,87721159,87282624,87723197,87723197,87697128,87686667,87391003,87113001,87686006,87271007,87271494,87391003,87113001,
-                87686006,87271007,87271494,87547000,87113001,87686006,87271007,87271494,87547000,87686667,87686006,87271007,87271494,87547000,87686667,87391003,
-                87271007,87271494,87547000,87686667,87391003,87113001,87271494,87547000,87686667,87391003,87113001,87686006,87271007,87547000,87686667,87391003,
-                87113001,87686006],
-        'Prix': [2]*82
-        }
-        data=pd.DataFrame(df)
-        return data
+    filtres = (tgv != 'false', ouigo != 'false', ter != 'false',
+               classe1 != 'false', classe2 != 'false',
+               'max' if prix == 'max' else 'min')
+    with pcc.etape('requete.reseau'):
+        reseau_actuel = reseau_courant()
+
+    #la recherche peut être annulée par le navigateur et s'arrête d'elle-même
+    #une fois son budget de temps dépassé
+    search_id = request.form.get('search_id')
+    if search_id:
+        annulations.enregistrer(search_id)
+        jeton = annulations.jeton(search_id, BUDGET_RECHERCHE)
+    else:
+        jeton = pcc.JetonAnnulation(BUDGET_RECHERCHE)
 
-    df = pd.concat([df, correspondance()],ignore_index=True, sort=False)
-    df = df.fillna('corres')
-    
-    
-    if tgv == 'false':
-        df = df.query('Transporteur != "TGV INOUI"')
-        
-    if ouigo == 'false':
-        df  = df.query('Transporteur != "OUIGO"')
-        
-    if ter == 'false':
-        df = df.query('Transporteur != "ter"')
-        
-    if classe1 == 'false':
-        df  = df.query('Classe != 1.0')
-        
-    if classe2 == 'false':
-        df = df.query('Classe != 2.0')
-    
     try:
-        from_code = nom_to_code(from_gare, ref_gare)
-        to_code = nom_to_code(to_gare, ref_gare)
+        #une annulation reçue avant l'enregistrement arrête la recherche ici
+        jeton.verifier()
+        with pcc.etape('requete.gares'):
+            from_code = reseau_actuel.gares.code(from_gare)
+            to_code = reseau_actuel.gares.code(to_gare)
         t = time.time()
-        route =  pcc.Dijkstra(df, "Origine", "Destination", "Prix").chemin_destination(from_code, to_code)
+        #on récupère le sous-réseau correspondant aux filtres choisis,
+        #seulement si l'itinéraire n'est pas déjà dans le cache
+        with pcc.etape('requete.recherche'):
+            route = cache.obtenir(
+                (from_code, to_code) + filtres,
+                lambda: reseau_actuel.itineraire(from_code, to_code,
+                                                 *filtres, jeton=jeton),
+                reseau_actuel.version)
+    except pcc.DelaiDepasse:
+        result = {
+        'route': f"La recherche a dépassé la durée maximale de {BUDGET_RECHERCHE}s, veuillez réessayer.",
+        }
+        return reponse(result, 504)
+    except pcc.RechercheAnnulee as erreur:
+        result = {
+        'route': str(erreur),
+        }
+        return reponse(result, 409)
     except ValueError as route:
         result = {
         'route':  str(route),
         }
-        return jsonify(result)
+        return reponse(result)
+    finally:
+        if search_id:
+            annulations.retirer(search_id)
     
-    route_str = str([code_to_nom(gare, ref_gare) for gare in route[0]])
-    route_str = route_str.replace('[', '')
-    route_str = route_str.replace(']', '')
-    route_str = route_str.replace("'", ' ')
-    route_str = route_str.replace('"', ' ')
-    route_str = route_str.replace(',', '\n\u2003↓\n\u2003↓\n\u2003↓\n')
+    with pcc.etape('requete.formatage'):
+        route_str = str([reseau_actuel.gares.nom(gare) for gare in route[0]])
+        route_str = route_str.replace('[', '')
+        route_str = route_str.replace(']', '')
+        route_str = route_str.replace("'", ' ')
+        route_str = route_str.replace('"', ' ')
+        route_str = route_str.replace(',', '\n\u2003↓\n\u2003↓\n\u2003↓\n')
 
 
     
-    result = {
-        'route':   f"Itinéraire de {from_gare} à {to_gare}: \n\n{route_str} \n\nPrix {prix} : {route[1]}€  \n\nExecution de Dijkstra : {time.time()-t}s\n\n",
-    }
+        result = {
+            'route':   f"Itinéraire de {from_gare} à {to_gare}: \n\n{route_str} \n\nPrix {prix} : {route[1]}€  \n\nExecution de Dijkstra : {time.time()-t}s\n\n",
+        }
     
-    return jsonify(result)
+    return reponse(result)
+
+@app.route('/cancel_search', methods=['POST'])
+def cancel_search():
+    #le navigateur signale l'abandon d'une recherche, qui libère le serveur
+    search_id = request.form.get('search_id')
+    return jsonify({'annulee': bool(search_id)
+                    and annulations.annuler(search_id)})
+
+@app.route('/metrics')
+def metrics():
+    return Response(metriques.exposer(),
+                    content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/cache_stats')
+def cache_stats():
+    return jsonify(cache.statistiques())
 
 @app.route('/route')
 def route():
     return render_template('route.html')
 
 if __name__ == '__main__':
-    app.run(debug=True)
+    parser = argparse.ArgumentParser(description="Application de recherche d'itinéraires")
+    parser.add_argument('--processus', type=int, default=0,
+                        help="nombre de processus de service (par défaut : serveur de développement)")
+    parser.add_argument('--hote', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    options = parser.parse_args()
+    if options.processus:
+        #les graphes les plus demandés sont construits avant la création des
+        #processus, qui en héritent sans les reconstruire (leurs listes sont
+        #ensuite copiées dans chaque processus qui les parcourt)
+        reseau.preparer()
+        servir(app, options.hote, options.port, options.processus)
+    else:
+        app.run(host=options.hote, port=options.port, debug=True)
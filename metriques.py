@@ -0,0 +1,129 @@
+"""Histogrammes de latence des étapes, au format texte de Prometheus."""
+
+import bisect
+
+from compteurs import TableCompteurs
+
+# Bornes supérieures des classes des histogrammes, en secondes
+BORNES = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+          1, 2.5, 5, 10)
+
+
+class HistogrammeLatence:
+    """Histogramme des durées d'une étape.
+
+    Parameters
+    ----------
+    bornes : tuple[float]
+        Bornes supérieures croissantes des classes, en secondes ; une
+        dernière classe sans borne est ajoutée (par défaut : BORNES)
+    """
+
+    def __init__(self, bornes=BORNES):
+        self.bornes = tuple(bornes)
+        self.effectifs = [0] * (len(self.bornes) + 1)
+        self.somme = 0.0
+        self.nombre = 0
+
+    def observer(self, duree):
+        """Ajoute une durée en secondes à l'histogramme."""
+        self.effectifs[bisect.bisect_left(self.bornes, duree)] += 1
+        self.somme += duree
+        self.nombre += 1
+
+    def cumuls(self):
+        """Renvoie les couples (borne, nombre de durées inférieures ou
+        égales), la dernière borne étant "+Inf"."""
+        cumul = 0
+        resultat = []
+        for borne, effectif in zip(self.bornes + ("+Inf",), self.effectifs):
+            cumul += effectif
+            resultat.append((borne, cumul))
+        return resultat
+
+
+class Metriques:
+    """Histogrammes de latence par étape, partagés entre les requêtes.
+
+    Les histogrammes sont conservés dans une TableCompteurs : les
+    processus de service créés après les métriques y ajoutent tous leurs
+    durées, et chacun expose les histogrammes de l'ensemble des processus.
+
+    Parameters
+    ----------
+    nom : str
+        Nom de la métrique exposée (par défaut :
+        "pcc_etape_duree_secondes")
+
+    bornes : tuple[float]
+        Bornes des histogrammes, voir HistogrammeLatence (par défaut :
+        BORNES)
+
+    nb_etapes : int
+        Nombre maximal d'étapes distinctes ; les durées des étapes
+        suivantes ne sont pas comptées (par défaut : 256)
+    """
+
+    def __init__(self, nom="pcc_etape_duree_secondes", bornes=BORNES,
+                 nb_etapes=256):
+        if list(bornes) != sorted(bornes):
+            raise ValueError("Les bornes doivent être croissantes")
+        self.nom = nom
+        self.bornes = tuple(bornes)
+        # Par étape : effectifs des classes, somme et nombre des durées
+        self._compteurs = TableCompteurs(len(self.bornes) + 3, nb_etapes)
+
+    def observer(self, etape, duree):
+        """Ajoute la durée d'une étape, en secondes."""
+        classes = len(self.bornes) + 1
+        self._compteurs.ajouter(
+            etape, [bisect.bisect_left(self.bornes, duree), classes,
+                    classes + 1], [1, duree, 1])
+
+    def histogrammes(self):
+        """Renvoie les histogrammes de toutes les étapes observées, par
+        nom d'étape."""
+        classes = len(self.bornes) + 1
+        histogrammes = {}
+        for etape, valeurs in self._compteurs.lignes().items():
+            histogramme = histogrammes[etape] = HistogrammeLatence(
+                self.bornes)
+            histogramme.effectifs = [int(effectif)
+                                     for effectif in valeurs[:classes]]
+            histogramme.somme = float(valeurs[classes])
+            histogramme.nombre = int(valeurs[classes + 1])
+        return histogrammes
+
+    def exposer(self):
+        """Renvoie les histogrammes au format texte de Prometheus.
+
+        Examples
+        --------
+        >>> metriques = Metriques(bornes=(0.1, 1))
+        >>> metriques.observer("dijkstra", 0.5)
+        >>> print(metriques.exposer())
+        # HELP pcc_etape_duree_secondes Durée des étapes du calcul d'itinéraires.
+        # TYPE pcc_etape_duree_secondes histogram
+        pcc_etape_duree_secondes_bucket{etape="dijkstra",le="0.1"} 0
+        pcc_etape_duree_secondes_bucket{etape="dijkstra",le="1"} 1
+        pcc_etape_duree_secondes_bucket{etape="dijkstra",le="+Inf"} 1
+        pcc_etape_duree_secondes_sum{etape="dijkstra"} 0.5
+        pcc_etape_duree_secondes_count{etape="dijkstra"} 1
+        <BLANKLINE>
+        """
+        lignes = [
+            f"# HELP {self.nom} Durée des étapes du calcul d'itinéraires.",
+            f"# TYPE {self.nom} histogram",
+        ]
+        histogrammes = self.histogrammes()
+        for etape in sorted(histogrammes):
+            histogramme = histogrammes[etape]
+            etiquette = etape.replace("\\", "\\\\").replace('"', '\\"')
+            for borne, cumul in histogramme.cumuls():
+                lignes.append(f'{self.nom}_bucket{{etape="{etiquette}",'
+                              f'le="{borne}"}} {cumul}')
+            lignes.append(f'{self.nom}_sum{{etape="{etiquette}"}} '
+                          f'{histogramme.somme}')
+            lignes.append(f'{self.nom}_count{{etape="{etiquette}"}} '
+                          f'{histogramme.nombre}')
+        return "\n".join(lignes) + "\n"
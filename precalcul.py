@@ -0,0 +1,54 @@
+"""Précalcule les tables d'itinéraires servies par l'application.
+
+Une recherche complète est lancée depuis chaque gare, en parallèle, pour
+chaque combinaison de filtres demandée ; l'application lit ensuite les
+itinéraires de ces combinaisons dans les tables, sans recherche.
+"""
+
+import argparse
+import sys
+import time
+
+from reseau import RAYON_CORRESPONDANCE, Reseau, lire_profil, nom_profil
+
+
+def main(arguments=None):
+    parseur = argparse.ArgumentParser(
+        prog="python precalcul.py",
+        description="Précalcul des tables d'itinéraires")
+    parseur.add_argument("--dossier", default="data",
+                         help="dossier des fichiers de données")
+    parseur.add_argument("--binaire", default="data/reseau.pccg",
+                         help="fichier binaire du réseau")
+    parseur.add_argument("--tables", default="data/tables",
+                         help="dossier où écrire les tables")
+    parseur.add_argument("--profils", nargs="+",
+                         default=[nom_profil(prix="min"),
+                                  nom_profil(prix="max")],
+                         help="combinaisons de filtres (tgv, ouigo, ter, "
+                              "classe 1 et classe 2 cochés ou non, puis "
+                              "prix), par exemple 11111-min")
+    parseur.add_argument("--rayon", type=float,
+                         default=RAYON_CORRESPONDANCE,
+                         help="rayon des correspondances entre gares "
+                              "proches, en mètres")
+    parseur.add_argument("--processus", type=int,
+                         help="nombre de processus de calcul")
+    options = parseur.parse_args(arguments)
+    for profil in options.profils:
+        try:
+            lire_profil(profil)
+        except ValueError as erreur:
+            parseur.error(str(erreur))
+
+    reseau = Reseau.charger(options.dossier, binaire=options.binaire,
+                            rayon_correspondance=options.rayon)
+    for profil in options.profils:
+        debut = time.perf_counter()
+        reseau.calculer_tables(options.tables, [profil], options.processus)
+        print(f"{profil} : {time.perf_counter() - debut:.1f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,587 @@
+"""Préparation du réseau ferroviaire utilisé par l'application."""
+
+import glob
+import os
+import threading
+import unicodedata
+
+import numpy as np
+import pandas as pd
+import src.plus_court_chemin as pcc
+
+# Prix d'une correspondance entre deux gares, en euros
+PRIX_CORRESPONDANCE = 2
+# Distance maximale, en mètres, entre deux gares reliées par une
+# correspondance à pied (voir Reseau.charger)
+RAYON_CORRESPONDANCE = 500
+
+
+def correspondance():
+    """Renvoie les correspondances de transport en commun dans quelques
+    villes, au prix fixe de PRIX_CORRESPONDANCE."""
+    df = {
+    'Origine': [87751404,87319012,87765024,87765024,87765008,87765008,87318964,87318964,87747006,87335521,87109306,87109306,87223263,87223263,87286005,87286005,
+            8751008,87751081,87590299,87590299,87756353,87756353,87756254,87756254,87721175,87723197,87721175,87282624,87721175,87721001,87721175,87722025,
+            87721159,87282624,87721159,87721001,87723197,87282624,87697128,87723197,87547000,87547000,87547000,87547000,87547000,87547000,87686667,87686667,
+            87686667,87686667,87686667,87686667,87391003,87391003,87391003,87391003,87391003,87391003,87113001,87113001,87113001,87113001,87113001,87113001,
+            87686006,87686006,87686006,87686006,87686006,87686006,87271007,87271007,87271007,87271007,87271007,87271007,87271494,87271494,87271494,87271494,
+            87271494,87271494],
+    'Destination': [87319012,87751404,87765008,87318964,87318964,87765024,87765024,87765008,87335521,87747006,87223263,87286005,87109306,87286005,87109306,87223263,
+            87751081,8751008,87756353,87756254,87590299,87756254,87590299,87756353,87723197,87721175,87282624,87721175,87721001,87721175,87722025,87721175,
+            87282624,87721159,87721001,87721159,87282624,87723197,87723197,87697128,87686667,87391003,87113001,87686006,87271007,87271494,87391003,87113001,
+            87686006,87271007,87271494,87547000,87113001,87686006,87271007,87271494,87547000,87686667,87686006,87271007,87271494,87547000,87686667,87391003,
+            87271007,87271494,87547000,87686667,87391003,87113001,87271494,87547000,87686667,87391003,87113001,87686006,87271007,87547000,87686667,87391003,
+            87113001,87686006],
+    'Prix minimum': [PRIX_CORRESPONDANCE]*82,
+    'Prix maximum': [PRIX_CORRESPONDANCE]*82
+    }
+    data = pd.DataFrame(df)
+    data["Transporteur"] = "corres"
+    return data
+
+
+def nom_profil(tgv=True, ouigo=True, ter=True, classe1=True, classe2=True,
+               prix="min"):
+    """Renvoie le nom d'une combinaison de filtres et de prix, par exemple
+    "11111-min" lorsque tous les filtres sont cochés, utilisé comme nom
+    de fichier de sa table d'itinéraires."""
+    filtres = "".join("1" if filtre else "0"
+                      for filtre in (tgv, ouigo, ter, classe1, classe2))
+    return f"{filtres}-{'max' if prix == 'max' else 'min'}"
+
+
+def lire_profil(nom):
+    """Renvoie les arguments de Reseau.dijkstra (filtres puis prix)
+    correspondant à un nom donné par nom_profil."""
+    filtres, _, prix = nom.partition("-")
+    if len(filtres) != 5 or set(filtres) - {"0", "1"} or prix not in (
+            "min", "max"):
+        raise ValueError(f"Profil invalide : {nom}")
+    return tuple(filtre == "1" for filtre in filtres) + (prix,)
+
+
+def normaliser(nom):
+    """Renvoie le nom sans accents, en minuscules et avec des espaces
+    simples, afin de comparer des noms de gares."""
+    nom = unicodedata.normalize("NFKD", nom)
+    nom = "".join(c for c in nom if not unicodedata.combining(c))
+    return " ".join(nom.casefold().split())
+
+
+class IndexGares:
+    """Index des gares par nom et par code UIC.
+
+    Les deux correspondances sont stockées dans des dictionnaires, une
+    recherche ne coûte donc qu'un accès par clef. Un nom peut être donné
+    avec ou sans accents et dans n'importe quelle casse. Lorsque plusieurs
+    gares portent le même nom, la première du référentiel est retenue.
+
+    Parameters
+    ----------
+    codes : list
+        Codes UIC des gares
+
+    noms : list
+        Intitulés des gares, dans le même ordre que les codes
+
+    normalises : list
+        Intitulés déjà normalisés par normaliser, dans le même ordre (par
+        défaut : None, calculés ici)
+    """
+
+    def __init__(self, codes, noms, normalises=None):
+        if normalises is None:
+            normalises = [normaliser(nom) for nom in noms]
+        self._codes = {}
+        self._codes_normalises = {}
+        self._noms = {}
+        for code, nom, normalise in zip(codes, noms, normalises):
+            self._codes.setdefault(nom, code)
+            self._codes_normalises.setdefault(normalise, code)
+            self._noms.setdefault(code, nom)
+
+    @classmethod
+    def depuis_referentiel(cls, ref_gares):
+        """Construit l'index à partir du référentiel des gares."""
+        return cls(ref_gares["Code UIC"].astype(int).tolist(),
+                   ref_gares["Intitulé plateforme"].tolist())
+
+    def __len__(self):
+        return len(self._noms)
+
+    def code(self, nom):
+        """Renvoie le code UIC de la gare de nom donné.
+
+        Parameters
+        ----------
+        nom : str
+            Intitulé de la gare
+
+        Returns
+        -------
+        int
+            Code UIC de la gare.
+        """
+        if nom == "":
+            raise ValueError("Une gare n'a pas été renseignée")
+        code = self._codes.get(nom)
+        if code is None:
+            code = self._codes_normalises.get(normaliser(nom))
+        if code is None:
+            raise ValueError(f"La gare '{nom}' est inconnu")
+        return code
+
+    def nom(self, code):
+        """Renvoie l'intitulé de la gare de code UIC donné, ou le code
+        lui-même si la gare est absente du référentiel."""
+        return self._noms.get(code, str(code))
+
+
+class Reseau:
+    """Réseau ferroviaire préparé une seule fois.
+
+    Le réseau regroupe le référentiel des gares et la table des arêtes
+    (TGV, OUIGO, TER et correspondances) avec les prix minimum et maximum.
+    Il est construit au démarrage de l'application puis partagé en lecture
+    seule par toutes les requêtes.
+
+    Parameters
+    ----------
+    ref_gares : pandas.DataFrame
+        Référentiel des gares (colonnes "Code UIC" et "Intitulé plateforme")
+
+    aretes : pandas.DataFrame
+        Arêtes du réseau (colonnes "Transporteur", "Origine", "Destination",
+        "Classe", "Prix minimum" et "Prix maximum")
+
+    correspondances : pandas.DataFrame
+        Arêtes de correspondance, également incluses dans aretes
+
+    fichiers : list[str]
+        Fichiers de données dont le réseau est issu, surveillés par
+        est_perime (par défaut : aucun)
+
+    rayon_correspondance : float
+        Rayon des correspondances générées entre gares proches, voir
+        charger (par défaut : None, aucune)
+    """
+
+    def __init__(self, ref_gares, aretes, correspondances, fichiers=(),
+                 rayon_correspondance=None):
+        self.ref_gares = ref_gares
+        self.fichiers = list(fichiers)
+        self.rayon_correspondance = rayon_correspondance
+        self.version = self._version(self.fichiers)
+        self.gares = IndexGares.depuis_referentiel(ref_gares)
+        self.aretes = aretes
+        self.correspondances = correspondances
+        self._preparer_filtres(aretes["Transporteur"].to_numpy(),
+                               aretes["Classe"].to_numpy())
+
+    def _preparer_filtres(self, transporteur, classe):
+        """Prépare les arêtes conservées lorsqu'un filtre de l'interface est
+        décoché, à partir du transporteur et de la classe de chaque arête."""
+        self._exclusions = {
+            "tgv": transporteur != "TGV INOUI",
+            "ouigo": transporteur != "OUIGO",
+            "ter": transporteur != "ter",
+            "classe1": classe != 1,
+            "classe2": classe != 2,
+        }
+        self._nb_aretes = len(transporteur)
+        self._masques = {}
+        self._vues = {}
+        self._verrou = threading.Lock()
+        # Tables d'itinéraires précalculées, par combinaison de filtres
+        self.tables = {}
+
+    @classmethod
+    def charger(cls, dossier="data", cache=None, binaire=None,
+                rayon_correspondance=None):
+        """Importe et prépare les fichiers de données du réseau.
+
+        Parameters
+        ----------
+        dossier : str
+            Dossier contenant les fichiers de données (par défaut : "data")
+
+        cache : str
+            Dossier du cache de lecture des fichiers, voir
+            plus_court_chemin.Importation (par défaut : None, pas de cache)
+
+        binaire : str
+            Fichier binaire du réseau, voir exporter (par défaut : None).
+            S'il correspond aux fichiers de données actuels, le réseau y
+            est ouvert sans lire les fichiers de données ; sinon il est
+            réécrit après leur lecture.
+
+        rayon_correspondance : float
+            Distance en mètres en deçà de laquelle une correspondance est
+            ajoutée entre deux gares, en plus des correspondances de
+            correspondance() (par défaut : None, aucune). Les
+            correspondances générées sont conservées dans le fichier
+            binaire, recalculé si le rayon change.
+
+        Returns
+        -------
+        Reseau
+            Le réseau prêt à être interrogé.
+        """
+        fichiers = [f"{dossier}/referentiel-gares-voyageurs.csv",
+                    f"{dossier}/tarifs-tgv-inoui-ouigo.csv",
+                    f"{dossier}/tarifs-ter-par-od.csv"]
+        if binaire is not None and os.path.exists(binaire):
+            try:
+                reseau = ReseauBinaire(binaire)
+            except (OSError, ValueError, KeyError):  # fichier illisible
+                reseau = None
+            if (reseau is not None and reseau.fichiers == fichiers
+                    and reseau.rayon_correspondance == rayon_correspondance
+                    and not reseau.est_perime()):
+                return reseau
+        # Seules les colonnes utiles sont analysées
+        ref_gares = pcc.Importation(
+            fichiers[0], cache=cache,
+            colonnes=["Code UIC", "Intitulé plateforme", "Longitude",
+                      "Latitude"],
+            types={"Code UIC": "int64", "Longitude": "float64",
+                   "Latitude": "float64"}).lecture()
+
+        df1 = pcc.Importation(
+            fichiers[1], cache=cache,
+            colonnes=["Transporteur", "Gare origine - code UIC",
+                      "Gare destination - code UIC", "Classe",
+                      "Prix minimum", "Prix maximum"],
+            types={"Gare origine - code UIC": "int64",
+                   "Gare destination - code UIC": "int64",
+                   "Prix minimum": "float64",
+                   "Prix maximum": "float64"}).lecture()
+        df1 = df1.set_axis(["Transporteur", "Origine", "Destination", "Classe",
+                            "Prix minimum", "Prix maximum"], axis=1)
+
+        df2 = pcc.Importation(
+            fichiers[2], cache=cache,
+            colonnes=["Origine - code UIC", "Destination - code UIC",
+                      "Type tarif", "Prix"],
+            types={"Origine - code UIC": "int64",
+                   "Destination - code UIC": "int64",
+                   "Prix": "float64"}).lecture()
+        df2 = df2[df2.iloc[:, 2] == "Tarif normal"]
+        df2 = df2.drop(["Type tarif"], axis=1)
+        df2 = df2.set_axis(["Origine", "Destination", "Prix minimum"], axis=1)
+        df2["Prix maximum"] = df2["Prix minimum"]
+        df2["Transporteur"] = "ter"
+
+        correspondances = correspondance()
+        if rayon_correspondance is not None:
+            traitement = pcc.Traitement(correspondances, "Origine",
+                                        "Destination", "Prix minimum")
+            generees = traitement.correspondances(
+                ref_gares, rayon_correspondance, PRIX_CORRESPONDANCE)
+            generees["Prix maximum"] = generees["Prix minimum"]
+            generees["Transporteur"] = "corres"
+            correspondances = traitement.ajouter_aretes(
+                generees).drop_duplicates(["Origine", "Destination"],
+                                          ignore_index=True)
+        with pcc.etape("reseau.concatenation"):
+            aretes = pd.concat([df1, df2, correspondances],
+                               ignore_index=True, sort=False)
+        reseau = cls(ref_gares, aretes, correspondances, fichiers,
+                     rayon_correspondance)
+        if binaire is not None:
+            reseau.exporter(binaire)
+        return reseau
+
+    def exporter(self, chemin):
+        """Écrit le réseau dans un fichier binaire, ouvert ensuite par
+        ReseauBinaire en quelques millisecondes.
+
+        Le fichier contient le graphe de toutes les arêtes au format CSR
+        avec les prix minimum et maximum, le transporteur et la classe de
+        chaque arête, le référentiel des gares et la version des fichiers
+        de données dont il est issu.
+
+        Parameters
+        ----------
+        chemin : str
+            Chemin du fichier à écrire
+        """
+        graphe = pcc.Graphe.depuis_dataframe(self.aretes, "Origine",
+                                             "Destination", "Prix minimum")
+        noms = self.ref_gares["Intitulé plateforme"].astype(str).tolist()
+        transporteurs, codes = np.unique(
+            self.aretes["Transporteur"].to_numpy(dtype=str),
+            return_inverse=True)
+        pcc.enregistrer_graphe(
+            chemin, graphe,
+            poids={"min": self.aretes["Prix minimum"],
+                   "max": self.aretes["Prix maximum"]},
+            attributs={"transporteur": codes.astype(np.int16),
+                       "classe": self.aretes["Classe"].fillna(0)
+                       .to_numpy(dtype=np.int8)},
+            tableaux={"gares_codes": self.ref_gares["Code UIC"]
+                      .to_numpy(dtype=np.int64),
+                      "gares_noms": noms,
+                      "gares_noms_normalises": [normaliser(nom)
+                                                for nom in noms]},
+            metadonnees={"version": self.version,
+                         "rayon_correspondance": self.rayon_correspondance,
+                         "transporteurs": transporteurs.tolist()})
+
+    @staticmethod
+    def _version(fichiers):
+        """Renvoie la version des fichiers de données : leur date de
+        modification et leur taille."""
+        version = []
+        for fichier in fichiers:
+            try:
+                etat = os.stat(fichier)
+            except OSError:
+                version.append((fichier, None, None))
+            else:
+                version.append((fichier, etat.st_mtime_ns, etat.st_size))
+        return tuple(version)
+
+    def est_perime(self):
+        """Indique si un fichier de données a changé depuis le chargement."""
+        return self._version(self.fichiers) != self.version
+
+    def aretes_prix(self, prix):
+        """Renvoie les arêtes avec une unique colonne "Prix".
+
+        Parameters
+        ----------
+        prix : str
+            "max" pour le prix maximum, le prix minimum sinon
+
+        Returns
+        -------
+        pandas.DataFrame
+            Les arêtes dont la colonne "Prix" correspond au prix demandé.
+        """
+        if prix == "max":
+            colonne_prix, colonne_to_drop = "Prix maximum", "Prix minimum"
+        else:
+            colonne_prix, colonne_to_drop = "Prix minimum", "Prix maximum"
+        return self.aretes.drop(columns=colonne_to_drop).rename(
+            columns={colonne_prix: "Prix"})
+
+    def masque(self, tgv=True, ouigo=True, ter=True, classe1=True,
+               classe2=True):
+        """Renvoie le masque des arêtes conservées par une combinaison de
+        filtres.
+
+        Le masque de chaque combinaison est calculé à la première demande
+        puis conservé.
+
+        Parameters
+        ----------
+        tgv, ouigo, ter : bool
+            Transporteurs autorisés
+
+        classe1, classe2 : bool
+            Classes autorisées
+
+        Returns
+        -------
+        numpy.ndarray
+            Tableau de booléens aligné sur les lignes de aretes.
+        """
+        clef = (tgv, ouigo, ter, classe1, classe2)
+        masque = self._masques.get(clef)
+        if masque is None:
+            masque = np.ones(self._nb_aretes, dtype=bool)
+            for nom, autorise in zip(("tgv", "ouigo", "ter", "classe1",
+                                      "classe2"), clef):
+                if not autorise:
+                    masque &= self._exclusions[nom]
+            self._masques[clef] = masque
+        return masque
+
+    def dijkstra(self, tgv=True, ouigo=True, ter=True, classe1=True,
+                 classe2=True, prix="min"):
+        """Renvoie l'algorithme de Dijkstra sur le sous-réseau filtré.
+
+        Le graphe de chacune des combinaisons de filtres et de prix est
+        construit à la première recherche qui l'utilise puis réutilisé
+        par les suivantes.
+
+        Parameters
+        ----------
+        tgv, ouigo, ter : bool
+            Transporteurs autorisés
+
+        classe1, classe2 : bool
+            Classes autorisées
+
+        prix : str
+            "max" pour le prix maximum, le prix minimum sinon
+
+        Returns
+        -------
+        plus_court_chemin.Dijkstra
+            L'algorithme prêt à être interrogé.
+        """
+        prix = "max" if prix == "max" else "min"
+        clef = (tgv, ouigo, ter, classe1, classe2, prix)
+        vue = self._vues.get(clef)
+        if vue is None:
+            with self._verrou:
+                vue = self._vues.get(clef)
+                if vue is None:
+                    vue = self._construire(
+                        self.masque(tgv, ouigo, ter, classe1, classe2), prix)
+                    self._vues[clef] = vue
+        return vue
+
+    def preparer(self, combinaisons=((True,) * 5 + ("min",),
+                                     (True,) * 5 + ("max",))):
+        """Construit à l'avance les graphes de combinaisons de filtres.
+
+        Appelée avant de créer les processus de service, elle leur évite
+        de construire chacun ces graphes à leur première recherche.
+
+        Parameters
+        ----------
+        combinaisons : iterable[tuple]
+            Arguments de dijkstra (filtres puis prix) des graphes à
+            construire (par défaut : tous les filtres, prix minimum et
+            maximum)
+        """
+        for filtres in combinaisons:
+            self.dijkstra(*filtres).graphe.preparer()
+
+    def itineraire(self, depart, arrivee, tgv=True, ouigo=True, ter=True,
+                   classe1=True, classe2=True, prix="min", jeton=None):
+        """Renvoie le plus court chemin entre deux gares sur le sous-réseau
+        filtré.
+
+        Si la table d'itinéraires de la combinaison de filtres est
+        chargée (voir charger_tables), le chemin y est lu ; sinon il est
+        recherché par Dijkstra.chemin_destination.
+
+        Parameters
+        ----------
+        depart, arrivee : int
+            Codes UIC des gares
+
+        tgv, ouigo, ter, classe1, classe2, prix :
+            Filtres et prix, voir dijkstra
+
+        jeton : plus_court_chemin.JetonAnnulation
+            Jeton d'annulation de la recherche
+
+        Returns
+        -------
+        list
+            Le chemin et son coût, voir Dijkstra.chemin_destination.
+        """
+        filtres = (tgv, ouigo, ter, classe1, classe2,
+                   "max" if prix == "max" else "min")
+        table = self.tables.get(filtres)
+        if table is not None and depart in table:
+            return table.chemin_destination(depart, arrivee)
+        return self.dijkstra(*filtres).chemin_destination(depart, arrivee,
+                                                          jeton)
+
+    def calculer_tables(self, dossier, profils=(nom_profil(prix="min"),
+                                                nom_profil(prix="max")),
+                        processus=None):
+        """Calcule et enregistre les tables d'itinéraires de combinaisons de
+        filtres, une recherche complète étant lancée depuis chaque gare.
+
+        Parameters
+        ----------
+        dossier : str
+            Dossier où écrire les tables, un fichier par profil
+
+        profils : iterable[str]
+            Noms des combinaisons de filtres, voir nom_profil (par défaut :
+            tous les filtres, prix minimum et maximum)
+
+        processus : int
+            Nombre de processus de calcul (par défaut : le nombre de
+            processeurs)
+        """
+        os.makedirs(dossier, exist_ok=True)
+        for profil in profils:
+            table = pcc.TableCouts(self.dijkstra(*lire_profil(profil)),
+                                   processus=processus)
+            table.sauvegarder(os.path.join(dossier, f"{profil}.pccg"))
+
+    def charger_tables(self, dossier):
+        """Charge les tables d'itinéraires d'un dossier écrit par
+        calculer_tables.
+
+        Les tables sont projetées en mémoire. Celles qui ne correspondent
+        plus au réseau (fichiers de données modifiés depuis leur calcul)
+        sont ignorées.
+
+        Parameters
+        ----------
+        dossier : str
+            Dossier des tables
+
+        Returns
+        -------
+        list[str]
+            Les profils chargés.
+        """
+        charges = []
+        for chemin in sorted(glob.glob(os.path.join(dossier, "*.pccg"))):
+            profil = os.path.basename(chemin)[:-len(".pccg")]
+            try:
+                filtres = lire_profil(profil)
+                table = pcc.TableCouts(self.dijkstra(*filtres), chemin=chemin)
+            except (OSError, ValueError, KeyError):  # table périmée
+                continue
+            self.tables[filtres] = table
+            charges.append(profil)
+        return charges
+
+    def _construire(self, masque, prix):
+        """Construit l'algorithme de Dijkstra sur les arêtes conservées par
+        le masque, pondérées par le prix demandé."""
+        with pcc.etape("reseau.filtrage"):
+            aretes = self.aretes_prix(prix)[masque]
+        return pcc.Dijkstra(aretes, "Origine", "Destination", "Prix")
+
+
+class ReseauBinaire(Reseau):
+    """Réseau ouvert depuis un fichier écrit par Reseau.exporter.
+
+    Les tableaux du graphe sont projetés en mémoire : l'ouverture ne lit
+    ni les fichiers de données ni le graphe, et les pages du fichier sont
+    partagées par tous les processus qui l'ouvrent. Le référentiel et les
+    tables d'arêtes ne sont pas disponibles (ref_gares, aretes et
+    correspondances valent None), seule la recherche d'itinéraires l'est.
+
+    Parameters
+    ----------
+    chemin : str
+        Chemin du fichier binaire
+    """
+
+    def __init__(self, chemin):
+        self.fichier = pcc.FichierGraphe(chemin)
+        metadonnees = self.fichier.metadonnees
+        self.ref_gares = None
+        self.aretes = None
+        self.correspondances = None
+        self.rayon_correspondance = metadonnees.get("rayon_correspondance")
+        self.version = tuple(tuple(version)
+                             for version in metadonnees["version"])
+        self.fichiers = [fichier for fichier, _, _ in self.version]
+        self.gares = IndexGares(
+            self.fichier.tableau("gares_codes").tolist(),
+            self.fichier.tableau("gares_noms"),
+            self.fichier.tableau("gares_noms_normalises"))
+        transporteurs = np.array(metadonnees["transporteurs"], dtype=object)
+        self._preparer_filtres(
+            transporteurs[self.fichier.attribut("transporteur")],
+            self.fichier.attribut("classe"))
+
+    def _construire(self, masque, prix):
+        with pcc.etape("reseau.filtrage"):
+            graphe = self.fichier.graphe(prix, masque)
+        return pcc.Dijkstra.depuis_graphe(graphe)
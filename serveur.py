@@ -0,0 +1,243 @@
+"""Service de l'application par plusieurs processus.
+
+Le processus principal importe l'application, prépare le réseau et ouvre
+la socket d'écoute, puis crée les processus de service par fork : ils
+héritent du réseau déjà en mémoire au lieu de le recharger chacun, et les
+tableaux du graphe, projetés depuis le fichier binaire du réseau, ne sont
+présents qu'une fois en mémoire quel que soit le nombre de processus.
+Les objets Python hérités (index des gares, listes des graphes préparés)
+ne restent partagés que tant qu'ils ne sont pas utilisés : le compteur de
+références d'un objet lu est modifié, ce qui copie sa page mémoire dans le
+processus qui le lit.
+Tous les processus acceptent les connexions sur la même socket.
+"""
+
+import gc
+import mmap
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import time
+import zlib
+
+from werkzeug.serving import make_server
+
+import src.plus_court_chemin as pcc
+
+# Durée de vie minimale d'un processus de service, en secondes : un
+# processus arrêté plus tôt n'est relancé qu'après cette durée
+DUREE_MINIMALE = 1
+
+LIBRE, EN_COURS, ANNULEE = 0, 1, 2
+
+
+class TableAnnulations:
+    """Recherches en cours et annulées, partagées entre processus.
+
+    La table occupe une zone de mémoire anonyme partagée, héritée par les
+    processus créés après elle : la demande d'annulation d'une recherche
+    peut être reçue par un autre processus que celui qui l'exécute. Chaque
+    identifiant occupe une case choisie d'après son empreinte ; une
+    recherche dont la case est reprise par une autre ne peut plus être
+    annulée et s'arrête à l'échéance de son jeton. L'annulation d'une
+    recherche pas encore enregistrée est conservée jusqu'à son
+    enregistrement : la recherche s'arrête alors dès son début.
+
+    Parameters
+    ----------
+    nb_cases : int
+        Nombre de recherches suivies simultanément (par défaut : 1024)
+
+    taille : int
+        Nombre maximal d'octets des identifiants (par défaut : 63)
+    """
+
+    def __init__(self, nb_cases=1024, taille=63):
+        if nb_cases < 1:
+            raise ValueError("Le nombre de cases doit être au moins de 1")
+        self.nb_cases = nb_cases
+        self.taille = taille
+        self._memoire = mmap.mmap(-1, nb_cases * (taille + 1))
+        self._verrou = multiprocessing.Lock()
+
+    def _case(self, identifiant):
+        """Renvoie la position de la case d'un identifiant et l'identifiant
+        encodé sur la taille d'une case."""
+        octets = identifiant.encode("utf-8")[:self.taille].ljust(self.taille,
+                                                                 b"\0")
+        return zlib.crc32(octets) % self.nb_cases * (self.taille + 1), octets
+
+    def _etat(self, position, octets):
+        """Renvoie l'état de la case si elle contient l'identifiant, LIBRE
+        sinon."""
+        case = self._memoire[position:position + self.taille + 1]
+        return case[0] if case[1:] == octets else LIBRE
+
+    def enregistrer(self, identifiant):
+        """Enregistre une recherche en cours, ou annulée si son annulation
+        a déjà été demandée."""
+        position, octets = self._case(identifiant)
+        with self._verrou:
+            if self._etat(position, octets) != ANNULEE:
+                self._memoire[position:position + self.taille + 1] = \
+                    bytes([EN_COURS]) + octets
+
+    def annuler(self, identifiant):
+        """Demande l'annulation d'une recherche et indique si elle était en
+        cours.
+
+        L'annulation d'une recherche inconnue est conservée pour son
+        enregistrement, sauf si sa case est occupée par une autre
+        recherche en cours.
+        """
+        position, octets = self._case(identifiant)
+        with self._verrou:
+            etat = self._etat(position, octets)
+            if etat == LIBRE:
+                if self._memoire[position] != EN_COURS:
+                    self._memoire[position:position + self.taille + 1] = \
+                        bytes([ANNULEE]) + octets
+                return False
+            self._memoire[position] = ANNULEE
+        return etat == EN_COURS
+
+    def est_annulee(self, identifiant):
+        """Indique si l'annulation de la recherche a été demandée."""
+        return self._etat(*self._case(identifiant)) == ANNULEE
+
+    def retirer(self, identifiant):
+        """Retire une recherche terminée."""
+        position, octets = self._case(identifiant)
+        with self._verrou:
+            if self._etat(position, octets) != LIBRE:
+                self._memoire[position] = LIBRE
+
+    def jeton(self, identifiant, delai=None):
+        """Renvoie le jeton d'annulation d'une recherche enregistrée."""
+        return JetonPartage(self, identifiant, delai)
+
+
+class JetonPartage(pcc.JetonAnnulation):
+    """Jeton d'annulation dont l'annulation peut venir d'un autre
+    processus, par une TableAnnulations.
+
+    Parameters
+    ----------
+    table : TableAnnulations
+        Table où la recherche est enregistrée
+
+    identifiant : str
+        Identifiant de la recherche
+
+    delai : float
+        Durée maximale de la recherche en secondes, voir JetonAnnulation
+    """
+
+    def __init__(self, table, identifiant, delai=None):
+        super().__init__(delai)
+        self.table = table
+        self.identifiant = identifiant
+
+    @property
+    def annule(self):
+        return super().annule or self.table.est_annulee(self.identifiant)
+
+    def verifier(self):
+        if self.table.est_annulee(self.identifiant):
+            self.annuler()
+        super().verifier()
+
+
+def _servir_processus(application, ecoute):
+    """Boucle d'un processus de service, qui ne se termine pas."""
+    # L'arrêt est commandé par le processus principal
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    code = 0
+    try:
+        serveur = make_server(*ecoute.getsockname()[:2], application,
+                              threaded=True, fd=ecoute.fileno())
+        serveur.serve_forever()
+    except BaseException:
+        code = 1
+        sys.excepthook(*sys.exc_info())
+    finally:
+        os._exit(code)
+
+
+def servir(application, hote="127.0.0.1", port=5000, processus=None):
+    """Sert l'application avec plusieurs processus, jusqu'à la réception
+    de SIGINT ou SIGTERM.
+
+    Les processus de service héritent de tout ce que l'application a
+    chargé avant l'appel, sans le recharger ; seuls les tableaux NumPy et
+    les fichiers projetés en mémoire restent partagés une fois utilisés.
+    Un processus de service arrêté anormalement est remplacé.
+
+    Parameters
+    ----------
+    application : callable
+        Application WSGI, par exemple l'application Flask
+
+    hote : str
+        Adresse d'écoute (par défaut : "127.0.0.1")
+
+    port : int
+        Port d'écoute (par défaut : 5000)
+
+    processus : int
+        Nombre de processus de service (par défaut : le nombre de
+        processeurs)
+    """
+    if not hasattr(os, "fork"):
+        raise OSError("Le service par plusieurs processus nécessite fork")
+    processus = processus or os.cpu_count() or 1
+    if processus < 1:
+        raise ValueError("Le nombre de processus doit être au moins de 1")
+
+    ecoute = socket.create_server((hote, port), backlog=128)
+    # Les objets déjà créés sont exclus du ramasse-miettes : ses parcours
+    # ne copient plus leurs pages, qui restent partagées tant qu'aucun
+    # processus ne modifie leur compteur de références
+    gc.collect()
+    gc.freeze()
+
+    enfants = {}
+    arret = False
+
+    def lancer():
+        pid = os.fork()
+        if pid == 0:
+            _servir_processus(application, ecoute)
+        enfants[pid] = time.monotonic()
+
+    def arreter(signum, frame):
+        nonlocal arret
+        arret = True
+        for pid in list(enfants):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, arreter)
+    signal.signal(signal.SIGTERM, arreter)
+    print(f" * Service sur http://{hote}:{port} par {processus} processus",
+          file=sys.stderr)
+    for _ in range(processus):
+        lancer()
+    try:
+        while enfants:
+            pid, _ = os.wait()
+            debut = enfants.pop(pid, None)
+            if not arret and debut is not None:
+                attente = DUREE_MINIMALE - (time.monotonic() - debut)
+                if attente > 0:
+                    time.sleep(attente)
+                if not arret:
+                    lancer()
+    finally:
+        ecoute.close()
+        gc.unfreeze()
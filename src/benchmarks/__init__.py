@@ -0,0 +1,10 @@
+"""Mesures de performance reproductibles de plus_court_chemin.
+
+Lancement depuis le dossier src :
+
+    python -m benchmarks --sortie mesures.json
+    python -m benchmarks --comparer mesures.json
+"""
+
+from .suite import (FICHIERS, PAIRES_SNCF, comparer, executer,
+                    mesurer)
@@ -0,0 +1,63 @@
+"""Lance la suite de mesures et écrit ses résultats au format json."""
+
+import argparse
+import json
+import sys
+
+from .suite import DOSSIER_DONNEES, comparer, executer
+
+
+def main(arguments=None):
+    parseur = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Mesures de performance de plus_court_chemin")
+    parseur.add_argument("--dossier", default=DOSSIER_DONNEES,
+                         help="dossier des fichiers de données")
+    parseur.add_argument("--graine", type=int, default=0,
+                         help="graine du tirage des requêtes")
+    parseur.add_argument("--repetitions", type=int, default=5,
+                         help="nombre d'exécutions mesurées par étape")
+    parseur.add_argument("--paires", type=int, default=50,
+                         help="nombre de paires tirées par réseau")
+    parseur.add_argument("--sources", type=int, default=5,
+                         help="nombre de sources tirées par réseau")
+    parseur.add_argument("--strategies", nargs="+",
+                         default=["tas", "bidirectionnel"],
+                         help="stratégies de Dijkstra mesurées")
+    parseur.add_argument("--k", type=int, default=5,
+                         help="nombre de chemins de chemins_alternatifs")
+    parseur.add_argument("--sortie",
+                         help="fichier json des résultats (sinon affichés)")
+    parseur.add_argument("--comparer", metavar="REFERENCE",
+                         help="fichier json de résultats de référence")
+    parseur.add_argument("--seuil", type=float, default=0.2,
+                         help="ralentissement toléré lors de la comparaison")
+    options = parseur.parse_args(arguments)
+
+    resultats = executer(options.dossier, options.graine, options.repetitions,
+                         options.paires, options.sources, options.strategies,
+                         options.k)
+    texte = json.dumps(resultats, indent=2, ensure_ascii=False)
+    if options.sortie:
+        with open(options.sortie, "w", encoding="utf-8") as fichier:
+            fichier.write(texte + "\n")
+    elif not options.comparer:
+        print(texte)
+
+    if options.comparer:
+        with open(options.comparer, encoding="utf-8") as fichier:
+            reference = json.load(fichier)
+        regressions = 0
+        for clef, avant, apres, rapport, regression in comparer(
+                reference, resultats, options.seuil):
+            regressions += regression
+            print(f"{'!' if regression else ' '} {clef:<50} "
+                  f"{1000 * avant:10.3f} ms {1000 * apres:10.3f} ms "
+                  f"x{rapport:.2f}")
+        # Code de retour non nul en cas de régression
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,317 @@
+"""Suite de mesures : importation, construction du graphe et requêtes."""
+
+import datetime
+import gc
+import os
+import platform
+import random
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+
+from plus_court_chemin.dijkstra import Dijkstra
+from plus_court_chemin.importation import Importation
+
+# Dossier data à la racine du dépôt
+DOSSIER_DONNEES = os.path.normpath(os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "data"))
+
+# Fichiers de données mesurés et leur séparateur
+FICHIERS = {
+    "referentiel-gares-voyageurs.csv": ";",
+    "referentiel-gares-voyageurs.xlsx": ";",
+    "tarifs-tgv-inoui-ouigo.csv": ";",
+    "tarifs-ter-par-od.csv": ";",
+    "air_routes_edges.csv": ",",
+}
+
+# Réseaux mesurés : fichier, séparateur, colonnes de départ, d'arrivée et
+# de distance
+RESEAUX = {
+    "sncf": ("tarifs-tgv-inoui-ouigo.csv", ";", "Gare origine - code UIC",
+             "Gare destination - code UIC", "Prix minimum"),
+    "aerien": ("air_routes_edges.csv", ",", "from", "to", "dist"),
+}
+
+# Trajets fixes du réseau SNCF, en codes UIC
+PAIRES_SNCF = [
+    (87686006, 87751008),  # Paris Gare de Lyon -> Marseille Saint-Charles
+    (87391003, 87581009),  # Paris Montparnasse -> Bordeaux Saint-Jean
+    (87223263, 87756056),  # Lille Europe -> Nice
+    (87212027, 87471003),  # Strasbourg -> Rennes
+    (87723197, 87611004),  # Lyon Part Dieu -> Toulouse Matabiau
+]
+
+
+def mesurer(fonction, repetitions=5, echauffement=1, operations=1,
+            preparation=None):
+    """Mesure la durée d'exécution d'une fonction sans argument.
+
+    Comme timeit, le ramasse-miettes est suspendu pendant chaque
+    exécution ; les exécutions d'échauffement ne sont pas retenues.
+
+    Parameters
+    ----------
+    fonction : callable
+        Fonction à mesurer
+
+    repetitions : int
+        Nombre d'exécutions mesurées (par défaut : 5)
+
+    echauffement : int
+        Nombre d'exécutions préalables non mesurées (par défaut : 1)
+
+    operations : int
+        Nombre d'opérations effectuées par une exécution, par exemple le
+        nombre de requêtes (par défaut : 1)
+
+    preparation : callable
+        Fonction sans argument appelée avant chaque exécution, hors de la
+        mesure ; fonction reçoit alors son résultat en argument (par
+        défaut : None)
+
+    Returns
+    -------
+    dict
+        Durées minimale, médiane, moyenne et maximale en secondes.
+    """
+    if repetitions < 1:
+        raise ValueError("Le nombre de répétitions doit être au moins de 1")
+    def executer():
+        if preparation is None:
+            return fonction
+        argument = preparation()
+        return lambda: fonction(argument)
+
+    for _ in range(echauffement):
+        executer()()
+    durees = []
+    actif = gc.isenabled()
+    try:
+        for _ in range(repetitions):
+            execution = executer()
+            gc.disable()
+            debut = time.perf_counter()
+            execution()
+            durees.append(time.perf_counter() - debut)
+            if actif:
+                gc.enable()
+    finally:
+        if actif:
+            gc.enable()
+    return {
+        "repetitions": repetitions,
+        "operations": operations,
+        "min_s": min(durees),
+        "mediane_s": statistics.median(durees),
+        "moyenne_s": statistics.fmean(durees),
+        "max_s": max(durees),
+    }
+
+
+def _requetes(dijkstra, paires):
+    """Renvoie une fonction calculant le chemin de chaque paire."""
+    def requetes():
+        for source, destination in paires:
+            try:
+                dijkstra.chemin_destination(source, destination)
+            except ValueError:  # pas de trajet : la recherche est mesurée
+                pass
+    return requetes
+
+
+def _alternatives(dijkstra, paires, k):
+    """Renvoie une fonction calculant les k meilleurs chemins de chaque
+    paire."""
+    def alternatives():
+        for source, destination in paires:
+            try:
+                dijkstra.chemins_alternatifs(source, destination, k)
+            except ValueError:
+                pass
+    return alternatives
+
+
+def _arbres(dijkstra, sources):
+    """Renvoie une fonction calculant les chemins depuis chaque source."""
+    def arbres():
+        for source in sources:
+            try:
+                dijkstra.chemin_partout(source)
+            except ValueError:  # une gare est inaccessible depuis la source
+                pass
+    return arbres
+
+
+def _parcours(dijkstra, sources):
+    """Renvoie une fonction calculant l'arbre complet des plus courts
+    chemins depuis chaque source, sans remonter les chemins."""
+    indices = [dijkstra.graphe.indice(source) for source in sources]
+
+    def parcours():
+        for indice in indices:
+            dijkstra._parcours(indice)
+    return parcours
+
+
+def _contexte(graine, repetitions, nb_paires, nb_sources, strategies, k):
+    """Décrit la machine et les paramètres de la mesure."""
+    return {
+        "date": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "plateforme": platform.platform(),
+        "processeur": platform.processor() or platform.machine(),
+        "graine": graine,
+        "repetitions": repetitions,
+        "nb_paires": nb_paires,
+        "nb_sources": nb_sources,
+        "strategies": list(strategies),
+        "k": k,
+    }
+
+
+def executer(dossier=DOSSIER_DONNEES, graine=0, repetitions=5, nb_paires=50,
+             nb_sources=5, strategies=("tas", "bidirectionnel"), k=5):
+    """Lance toutes les mesures.
+
+    Les paires et sources tirées au hasard ne dépendent que de la graine :
+    deux exécutions de même graine mesurent les mêmes requêtes. Les
+    fichiers absents du dossier sont ignorés et listés dans "absents".
+
+    Parameters
+    ----------
+    dossier : str
+        Dossier des fichiers de données (par défaut : le dossier data du
+        dépôt)
+
+    graine : int
+        Graine du tirage des paires et des sources (par défaut : 0)
+
+    repetitions : int
+        Nombre d'exécutions mesurées de chaque étape (par défaut : 5)
+
+    nb_paires : int
+        Nombre de paires tirées par réseau pour chemin_destination
+        (par défaut : 50)
+
+    nb_sources : int
+        Nombre de sources tirées par réseau pour chemin_partout
+        (par défaut : 5)
+
+    strategies : tuple[str]
+        Stratégies de Dijkstra mesurées (par défaut : tas et
+        bidirectionnel)
+
+    k : int
+        Nombre de chemins demandés à chemins_alternatifs (par défaut : 5)
+
+    Returns
+    -------
+    dict
+        Contexte de la mesure, mesures par étape et fichiers absents. Les
+        clefs des mesures sont de la forme "etape/reseau/strategie".
+    """
+    mesures = {}
+    absents = []
+
+    for nom, sep in FICHIERS.items():
+        chemin = os.path.join(dossier, nom)
+        if not os.path.exists(chemin):
+            absents.append(nom)
+            continue
+        # Une nouvelle Importation à chaque exécution : rien n'est réutilisé
+        mesures[f"lecture/{nom}"] = mesurer(
+            lambda: Importation(chemin, sep).lecture(), repetitions)
+
+    for reseau, (nom, sep, depart, arrivee, distance) in RESEAUX.items():
+        chemin = os.path.join(dossier, nom)
+        if not os.path.exists(chemin):
+            continue
+        dataf = Importation(chemin, sep).lecture()
+        if reseau == "aerien":
+            dataf = dataf[dataf["label"] == "route"]
+
+        generateur = random.Random(graine)
+        origines = sorted(set(dataf[depart]))
+        destinations = sorted(set(dataf[arrivee]))
+        paires = [(generateur.choice(origines),
+                   generateur.choice(destinations))
+                  for _ in range(nb_paires)]
+        sources = generateur.sample(origines, min(nb_sources, len(origines)))
+
+        mesures[f"construction/{reseau}"] = mesurer(
+            lambda: Dijkstra(dataf, depart, arrivee, distance), repetitions)
+        # graph est mémorisé : il est mesuré sur un Dijkstra neuf, construit
+        # hors de la mesure
+        mesures[f"graph/{reseau}"] = mesurer(
+            Dijkstra.graph, repetitions,
+            preparation=lambda: Dijkstra(dataf, depart, arrivee, distance))
+
+        # Les k meilleurs chemins ne dépendent pas de la stratégie
+        dijkstra = Dijkstra(dataf, depart, arrivee, distance)
+        if reseau == "sncf":
+            mesures[f"chemins_alternatifs_fixes/{reseau}/k{k}"] = mesurer(
+                _alternatives(dijkstra, PAIRES_SNCF, k), repetitions,
+                operations=len(PAIRES_SNCF))
+        mesures[f"chemins_alternatifs/{reseau}/k{k}"] = mesurer(
+            _alternatives(dijkstra, paires, k), repetitions,
+            operations=len(paires))
+
+        for strategie in strategies:
+            dijkstra = Dijkstra(dataf, depart, arrivee, distance, strategie)
+            if reseau == "sncf":
+                mesures[f"chemin_destination_fixes/{reseau}/{strategie}"] = \
+                    mesurer(_requetes(dijkstra, PAIRES_SNCF), repetitions,
+                            operations=len(PAIRES_SNCF))
+            mesures[f"chemin_destination/{reseau}/{strategie}"] = mesurer(
+                _requetes(dijkstra, paires), repetitions,
+                operations=len(paires))
+            # Les réseaux réels ne sont pas fortement connexes :
+            # chemin_partout s'arrête à la première gare inaccessible, le
+            # parcours complet est donc aussi mesuré seul
+            mesures[f"chemin_partout/{reseau}/{strategie}"] = mesurer(
+                _arbres(dijkstra, sources), repetitions,
+                operations=len(sources))
+            mesures[f"parcours/{reseau}/{strategie}"] = mesurer(
+                _parcours(dijkstra, sources), repetitions,
+                operations=len(sources))
+
+    return {
+        "contexte": _contexte(graine, repetitions, nb_paires, nb_sources,
+                              strategies, k),
+        "mesures": mesures,
+        "absents": absents,
+    }
+
+
+def comparer(ancien, nouveau, seuil=0.2):
+    """Compare deux résultats d'executer, étape par étape.
+
+    Les durées médianes sont comparées ; une étape est une régression si
+    elle est plus lente de plus de seuil (en proportion).
+
+    Parameters
+    ----------
+    ancien, nouveau : dict
+        Résultats de référence et résultats à comparer
+
+    seuil : float
+        Ralentissement toléré (par défaut : 0.2, soit 20 %)
+
+    Returns
+    -------
+    list[tuple]
+        Pour chaque étape commune : clef, médianes ancienne et nouvelle,
+        rapport nouvelle / ancienne et indicateur de régression.
+    """
+    lignes = []
+    for clef in sorted(ancien["mesures"].keys() & nouveau["mesures"].keys()):
+        avant = ancien["mesures"][clef]["mediane_s"]
+        apres = nouveau["mesures"][clef]["mediane_s"]
+        rapport = apres / avant if avant > 0 else float("inf")
+        lignes.append((clef, avant, apres, rapport, rapport > 1 + seuil))
+    return lignes
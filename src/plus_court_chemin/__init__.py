@@ -1,4 +1,31 @@
-from .importation import Importation
+import importlib
+
 from .dijkstra import Dijkstra
-from .exportation import Exportation
-from .traitement import Traitement
+from .graphe import Graphe
+from .reperes import Reperes
+from .contraction import HierarchieContraction
+from .dynamique import GrapheDynamique
+from .annulation import JetonAnnulation, RechercheAnnulee, DelaiDepasse
+from .chronometre import ajouter_observateur, retirer_observateur, etape
+from .binaire import FichierGraphe, enregistrer_graphe
+from .table_couts import TableCouts
+
+# Classes reposant sur pandas, importées à leur première utilisation : le
+# calcul d'itinéraires seul n'importe pas pandas
+_DIFFERES = {
+    "Importation": ".importation",
+    "Exportation": ".exportation",
+    "Traitement": ".traitement",
+}
+
+
+def __getattr__(nom):
+    if nom not in _DIFFERES:
+        raise AttributeError(f"module {__name__!r} has no attribute {nom!r}")
+    valeur = getattr(importlib.import_module(_DIFFERES[nom], __name__), nom)
+    globals()[nom] = valeur
+    return valeur
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_DIFFERES))
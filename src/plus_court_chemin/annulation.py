@@ -0,0 +1,53 @@
+"""Annulation et limite de durée des recherches de plus court chemin."""
+
+import threading
+import time
+
+# Nombre de noeuds fixés entre deux vérifications du jeton
+PERIODE_VERIFICATION = 256
+
+
+class RechercheAnnulee(Exception):
+    """La recherche a été annulée avant d'aboutir."""
+
+
+class DelaiDepasse(RechercheAnnulee):
+    """La recherche a dépassé la durée qui lui était accordée."""
+
+
+class JetonAnnulation:
+    """Jeton consulté régulièrement par une recherche en cours.
+
+    Un autre fil d'exécution peut annuler la recherche avec annuler ; si
+    une durée maximale est donnée, la recherche s'interrompt aussi une
+    fois l'échéance passée. La recherche lève alors RechercheAnnulee ou
+    DelaiDepasse au plus tard PERIODE_VERIFICATION noeuds plus tard.
+
+    Parametre
+    ----------
+    delai : float
+        Durée maximale de la recherche en secondes (par défaut : None,
+        pas de limite).
+    """
+
+    def __init__(self, delai=None):
+        self.delai = delai
+        self.echeance = None if delai is None else time.monotonic() + delai
+        self._annule = threading.Event()
+
+    def annuler(self):
+        """Demande l'arrêt de la recherche."""
+        self._annule.set()
+
+    @property
+    def annule(self):
+        """Indique si l'arrêt de la recherche a été demandé."""
+        return self._annule.is_set()
+
+    def verifier(self):
+        """Lève une exception si la recherche doit s'arrêter."""
+        if self._annule.is_set():
+            raise RechercheAnnulee("La recherche a été annulée")
+        if self.echeance is not None and time.monotonic() > self.echeance:
+            raise DelaiDepasse(
+                f"La recherche a dépassé la durée maximale de {self.delai}s")
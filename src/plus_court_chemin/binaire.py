@@ -0,0 +1,254 @@
+"""Fichier binaire de graphe, ouvert par projection en mémoire.
+
+Le fichier commence par 8 octets magiques et la longueur de l'en-tête
+(entier de 8 octets petit-boutiste), suivis de l'en-tête json puis des
+tableaux, chacun aligné sur 64 octets. L'en-tête donne le type, la
+taille et la position de chaque tableau : ils sont ouverts avec
+numpy.memmap, sans lecture ni copie, et les pages du fichier sont
+partagées par tous les processus qui l'ouvrent.
+"""
+
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from .graphe import Graphe
+
+MAGIE = b"PCCGRAF1"
+ALIGNEMENT = 64
+
+
+def _chaines(valeurs):
+    """Encode des chaînes en un tableau d'octets utf-8 et les positions
+    de début de chacune (plus la fin de la dernière)."""
+    encodees = [str(valeur).encode("utf-8") for valeur in valeurs]
+    positions = np.zeros(len(encodees) + 1, dtype=np.int64)
+    np.cumsum([len(chaine) for chaine in encodees], out=positions[1:])
+    return np.frombuffer(b"".join(encodees), dtype=np.uint8), positions
+
+
+def _tableaux_colonne(nom, valeurs):
+    """Renvoie les tableaux à écrire pour une colonne : le tableau lui-même
+    s'il est numérique, ses octets et positions s'il contient du texte."""
+    tableau = np.asarray(valeurs)
+    if tableau.dtype.kind in "biuf":
+        return {nom: tableau}, "nombres"
+    octets, positions = _chaines(tableau.tolist())
+    return {nom + ".octets": octets, nom + ".positions": positions}, "texte"
+
+
+def enregistrer_graphe(chemin, graphe, poids=None, attributs=None,
+                       tableaux=None, metadonnees=None):
+    """Écrit un graphe dans un fichier binaire lisible par FichierGraphe.
+
+    Le fichier est écrit dans un fichier temporaire puis renommé : un
+    processus qui l'ouvre au même moment lit l'ancienne ou la nouvelle
+    version, jamais un fichier incomplet.
+
+    Parametres
+    ----------
+    chemin : str
+        Chemin du fichier à écrire.
+    graphe : Graphe
+        Le graphe ; ses poids forment le mode "defaut".
+    poids : dict
+        Autres poids des arêtes par mode (par exemple {"max": ...}),
+        dans l'ordre des lignes de la table dont le graphe est issu.
+    attributs : dict
+        Attributs numériques des arêtes (par exemple un code de
+        transporteur), dans l'ordre des lignes de la table.
+    tableaux : dict
+        Tableaux libres, numériques ou de texte (par exemple les noms
+        des gares).
+    metadonnees : dict
+        Informations sérialisables en json conservées dans l'en-tête.
+    """
+    ordre = np.asarray(graphe.ordre)
+    colonnes = {"offsets": np.asarray(graphe.offsets, dtype=np.int64),
+                "cibles": np.asarray(graphe.cibles, dtype=np.int32),
+                "ordre": ordre.astype(np.int64),
+                "poids/defaut": np.asarray(graphe.poids)}
+    noeuds, type_noeuds = _tableaux_colonne("noeuds", graphe.noeuds)
+    colonnes.update(noeuds)
+    for mode, valeurs in (poids or {}).items():
+        colonnes[f"poids/{mode}"] = np.asarray(valeurs)[ordre]
+    for nom, valeurs in (attributs or {}).items():
+        colonnes[f"attributs/{nom}"] = np.asarray(valeurs)[ordre]
+    types_tableaux = {}
+    for nom, valeurs in (tableaux or {}).items():
+        ajout, types_tableaux[nom] = _tableaux_colonne(f"tableaux/{nom}",
+                                                       valeurs)
+        colonnes.update(ajout)
+    for nom, tableau in colonnes.items():
+        if tableau.dtype.kind not in "biuf":
+            raise TypeError(f"Le tableau {nom} n'est pas numérique")
+
+    # Les positions des tableaux dépendent de la taille de l'en-tête : on
+    # réserve la place d'un en-tête aux positions maximales puis on complète
+    entete = {"noeuds": type_noeuds, "tableaux": types_tableaux,
+              "metadonnees": metadonnees or {}, "colonnes": {}}
+    for nom, tableau in colonnes.items():
+        entete["colonnes"][nom] = {"type": tableau.dtype.str,
+                                   "taille": len(tableau),
+                                   "position": 2 ** 62}
+    debut = -(-(16 + len(json.dumps(entete).encode())) // ALIGNEMENT) \
+        * ALIGNEMENT
+    position = debut
+    for nom, tableau in colonnes.items():
+        entete["colonnes"][nom]["position"] = position
+        position += -(-tableau.nbytes // ALIGNEMENT) * ALIGNEMENT
+    texte = json.dumps(entete).encode()
+
+    dossier = os.path.dirname(os.path.abspath(chemin))
+    descripteur, temporaire = tempfile.mkstemp(dir=dossier, suffix=".tmp")
+    try:
+        with os.fdopen(descripteur, "wb") as fichier:
+            fichier.write(MAGIE)
+            fichier.write(len(texte).to_bytes(8, "little"))
+            fichier.write(texte)
+            for nom, tableau in colonnes.items():
+                fichier.write(b"\0" * (entete["colonnes"][nom]["position"]
+                                       - fichier.tell()))
+                fichier.write(np.ascontiguousarray(tableau).tobytes())
+        # mkstemp crée le fichier lisible par son seul propriétaire
+        os.chmod(temporaire, 0o644)
+        os.replace(temporaire, chemin)
+    except BaseException:
+        os.remove(temporaire)
+        raise
+
+
+class FichierGraphe:
+    """Graphe ouvert depuis un fichier écrit par enregistrer_graphe.
+
+    Les tableaux sont projetés en mémoire : l'ouverture ne lit que
+    l'en-tête, quelle que soit la taille du graphe.
+
+    Parametres
+    ----------
+    chemin : str
+        Chemin du fichier.
+
+    Attributs
+    ----------
+    noeuds : numpy.ndarray
+        Étiquettes des noeuds.
+    offsets, cibles, ordre : numpy.memmap
+        Tableaux CSR du graphe complet, voir Graphe.
+    modes : list[str]
+        Modes de poids disponibles.
+    metadonnees : dict
+        Informations données à l'enregistrement.
+    """
+
+    def __init__(self, chemin):
+        self.chemin = chemin
+        with open(chemin, "rb") as fichier:
+            if fichier.read(len(MAGIE)) != MAGIE:
+                raise ValueError(f"{chemin} n'est pas un fichier de graphe")
+            taille = int.from_bytes(fichier.read(8), "little")
+            self._entete = json.loads(fichier.read(taille))
+        self.metadonnees = self._entete["metadonnees"]
+        self.modes = [nom.split("/", 1)[1] for nom in self._entete["colonnes"]
+                      if nom.startswith("poids/")]
+        self.offsets = self._colonne("offsets")
+        self.cibles = self._colonne("cibles")
+        self.ordre = self._colonne("ordre")
+        if self._entete["noeuds"] == "texte":
+            noeuds = self._texte("noeuds")
+            self.noeuds = np.empty(len(noeuds), dtype=object)
+            self.noeuds[:] = noeuds
+        else:
+            self.noeuds = self._colonne("noeuds")
+
+    def _colonne(self, nom):
+        """Projette en mémoire un tableau du fichier."""
+        description = self._entete["colonnes"].get(nom)
+        if description is None:
+            raise KeyError(nom)
+        if description["taille"] == 0:
+            return np.empty(0, dtype=description["type"])
+        return np.memmap(self.chemin, dtype=description["type"], mode="r",
+                         offset=description["position"],
+                         shape=(description["taille"],))
+
+    def _texte(self, nom):
+        """Décode une colonne de texte."""
+        octets = self._colonne(nom + ".octets").tobytes()
+        positions = self._colonne(nom + ".positions").tolist()
+        return [octets[debut:fin].decode("utf-8")
+                for debut, fin in zip(positions, positions[1:])]
+
+    def poids(self, mode="defaut"):
+        """Renvoie les poids des arêtes d'un mode, dans l'ordre CSR."""
+        if mode not in self.modes:
+            raise ValueError(f"Mode inconnu, doit être parmi {self.modes}")
+        return self._colonne(f"poids/{mode}")
+
+    def attribut(self, nom):
+        """Renvoie un attribut des arêtes, dans l'ordre CSR."""
+        return self._colonne(f"attributs/{nom}")
+
+    def tableau(self, nom):
+        """Renvoie un tableau libre : tableau numérique projeté en mémoire
+        ou liste de chaînes."""
+        if nom not in self._entete["tableaux"]:
+            raise KeyError(nom)
+        if self._entete["tableaux"][nom] == "texte":
+            return self._texte(f"tableaux/{nom}")
+        return self._colonne(f"tableaux/{nom}")
+
+    def graphe(self, mode="defaut", masque=None):
+        """Renvoie le graphe d'un mode de poids, éventuellement restreint
+        à certaines arêtes.
+
+        Sans masque, ou si le masque conserve toutes les arêtes, le graphe
+        repose directement sur les tableaux projetés en mémoire. Sinon, le
+        graphe est identique à celui construit par Graphe.depuis_aretes
+        sur les seules lignes conservées : les noeuds sans arête en sont
+        retirés.
+
+        Parametres
+        ----------
+        mode : str
+            Mode de poids (par défaut : "defaut").
+        masque : numpy.ndarray
+            Booléens des arêtes conservées, dans l'ordre CSR (par
+            défaut : toutes).
+
+        Renvoie
+        -------
+        Graphe :
+            Le graphe demandé.
+        """
+        poids = self.poids(mode)
+        if masque is not None:
+            masque = np.asarray(masque, dtype=bool)
+            if len(masque) != len(self.cibles):
+                raise ValueError("Le masque doit contenir une valeur par "
+                                 "arête")
+            if masque.all():
+                masque = None
+        if masque is None:
+            return Graphe(self.noeuds, self.offsets, self.cibles, poids,
+                          self.ordre)
+        nb_noeuds = len(self.noeuds)
+        origines = np.repeat(np.arange(nb_noeuds),
+                             np.diff(self.offsets))[masque]
+        cibles = np.asarray(self.cibles)[masque]
+        # Renumérotation dense des noeuds restants, dans le même ordre
+        utilises = np.zeros(nb_noeuds, dtype=bool)
+        utilises[origines] = True
+        utilises[cibles] = True
+        nouveaux = np.cumsum(utilises) - 1
+        offsets = np.zeros(int(utilises.sum()) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(nouveaux[origines], minlength=len(offsets) - 1),
+                  out=offsets[1:])
+        ordre = np.asarray(self.ordre)[masque]
+        return Graphe(self.noeuds[utilises], offsets,
+                      nouveaux[cibles].astype(np.int32),
+                      np.asarray(poids)[masque],
+                      np.argsort(np.argsort(ordre, kind="stable"),
+                                 kind="stable"))
@@ -0,0 +1,85 @@
+"""Chronométrage des étapes de l'importation, du traitement et de la
+recherche de plus courts chemins."""
+
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+# Fonctions appelées avec le nom et la durée de chaque étape ; le tuple est
+# remplacé, jamais modifié, et peut donc être lu sans verrou
+_observateurs = ()
+_verrou = threading.Lock()
+
+
+def ajouter_observateur(observateur):
+    """Enregistre une fonction appelée à la fin de chaque étape.
+
+    Parameters
+    ----------
+    observateur : callable
+        Fonction appelée avec le nom de l'étape et sa durée en secondes,
+        dans le fil d'exécution qui a effectué l'étape.
+    """
+    global _observateurs
+    with _verrou:
+        _observateurs = _observateurs + (observateur,)
+
+
+def retirer_observateur(observateur):
+    """Retire une fonction enregistrée par ajouter_observateur."""
+    global _observateurs
+    with _verrou:
+        if observateur not in _observateurs:
+            raise ValueError("Observateur inconnu")
+        _observateurs = tuple(o for o in _observateurs if o is not observateur)
+
+
+@contextmanager
+def etape(nom):
+    """Chronomètre le bloc et transmet sa durée aux observateurs.
+
+    Sans observateur, le bloc n'est pas chronométré. Une étape
+    interrompue par une exception est tout de même transmise.
+
+    Parameters
+    ----------
+    nom : str
+        Nom de l'étape, par exemple "dijkstra.construction"
+
+    Examples
+    --------
+    >>> durees = []
+    >>> observateur = lambda nom, duree: durees.append(nom)
+    >>> ajouter_observateur(observateur)
+    >>> with etape("calcul"):
+    ...     total = sum(range(10))
+    >>> retirer_observateur(observateur)
+    >>> durees
+    ['calcul']
+    """
+    observateurs = _observateurs
+    if not observateurs:
+        yield
+        return
+    debut = time.perf_counter()
+    try:
+        yield
+    finally:
+        duree = time.perf_counter() - debut
+        for observateur in observateurs:
+            observateur(nom, duree)
+
+
+def chronometre(nom):
+    """Décorateur chronométrant chaque appel de la fonction comme une
+    étape de nom donné."""
+    def decorateur(fonction):
+        @functools.wraps(fonction)
+        def enveloppe(*args, **kwargs):
+            if not _observateurs:
+                return fonction(*args, **kwargs)
+            with etape(nom):
+                return fonction(*args, **kwargs)
+        return enveloppe
+    return decorateur
@@ -0,0 +1,300 @@
+"""Hiérarchies de contraction : prétraitement du graphe permettant des
+recherches de plus court chemin très rapides entre deux noeuds."""
+
+import heapq
+import time
+
+from .dijkstra import INFINI, _cumuls
+
+
+class HierarchieContraction:
+    """Hiérarchie de contraction construite sur le graphe d'un Dijkstra.
+
+    Le prétraitement retire (contracte) les noeuds un par un, du moins
+    important au plus important. Lorsqu'un noeud v est retiré, une arête
+    raccourci u -> w est ajoutée pour chaque couple de voisins dont le
+    plus court chemin passait par v. Chaque noeud reçoit ainsi un rang et
+    tout plus court chemin monte puis descend dans la hiérarchie : une
+    recherche bidirectionnelle qui ne suit que les arêtes montantes suffit
+    alors, et ne visite qu'une petite partie du graphe.
+
+    Parametres
+    ----------
+    dijkstra : Dijkstra
+        L'algorithme de Dijkstra dont le graphe est prétraité.
+    limite_temoins : int
+        Nombre maximal de noeuds fixés par une recherche de chemin témoin
+        lors de la contraction (par défaut : 100). Une limite plus basse
+        accélère le prétraitement mais ajoute des raccourcis inutiles.
+
+    Attributs
+    ----------
+    rangs : list[int]
+        Le rang de chaque noeud dans la hiérarchie.
+    nb_raccourcis : int
+        Le nombre d'arêtes raccourcis ajoutées.
+    duree_pretraitement : float
+        La durée du prétraitement en secondes.
+    noeuds_fixes : int
+        Le nombre de noeuds fixés lors de la dernière recherche.
+    """
+
+    def __init__(self, dijkstra, limite_temoins=100):
+        self.dijkstra = dijkstra
+        self.limite_temoins = limite_temoins
+        self.noeuds_fixes = 0
+        debut = time.perf_counter()
+        self._contracter()
+        self.duree_pretraitement = time.perf_counter() - debut
+
+    def _temoins(self, sortants, depart, exclu, limite_cout, cibles):
+        """Recherche de Dijkstra limitée depuis depart, sans passer par le
+        noeud exclu. Elle s'arrête dès que toutes les cibles sont fixées,
+        au-delà du coût limite ou après limite_temoins noeuds fixés."""
+        distances = {depart: 0}
+        tas = [(0, depart)]
+        restantes = len(cibles)
+        nb_marques = 0
+        while tas and nb_marques < self.limite_temoins and restantes:
+            coefficient, selection = heapq.heappop(tas)
+            if coefficient > distances[selection]:
+                continue
+            nb_marques += 1
+            if selection in cibles:
+                restantes -= 1
+            for noeud, poids in sortants[selection].items():
+                cout = coefficient + poids
+                if (cout <= limite_cout and noeud != exclu
+                        and cout < distances.get(noeud, INFINI)):
+                    distances[noeud] = cout
+                    heapq.heappush(tas, (cout, noeud))
+        return distances
+
+    def _raccourcis(self, sortants, entrants, noeud):
+        """Renvoie les raccourcis (u, w, coût) nécessaires à la contraction
+        du noeud."""
+        raccourcis = []
+        if not sortants[noeud]:
+            return raccourcis
+        limite = max(sortants[noeud].values())
+        for amont, poids_amont in entrants[noeud].items():
+            temoins = self._temoins(sortants, amont, noeud,
+                                    poids_amont + limite, sortants[noeud])
+            for aval, poids_aval in sortants[noeud].items():
+                if aval == amont:
+                    continue
+                cout = poids_amont + poids_aval
+                if temoins.get(aval, INFINI) > cout:
+                    raccourcis.append((amont, aval, cout))
+        return raccourcis
+
+    @staticmethod
+    def _priorite(sortants, entrants, contractes, noeud, raccourcis):
+        """Priorité de contraction : différence entre le nombre de
+        raccourcis ajoutés et d'arêtes retirées, augmentée du nombre de
+        voisins déjà contractés pour répartir les contractions."""
+        return (len(raccourcis) - len(sortants[noeud]) - len(entrants[noeud])
+                + contractes[noeud])
+
+    def _contracter(self):
+        """Contracte tous les noeuds et construit les graphes montants."""
+        offsets, cibles, poids = self.dijkstra.graphe.listes()
+        nb_noeuds = len(offsets) - 1
+        sortants = [{} for _ in range(nb_noeuds)]
+        entrants = [{} for _ in range(nb_noeuds)]
+        for depart in range(nb_noeuds):
+            for j in range(offsets[depart], offsets[depart + 1]):
+                arrivee = cibles[j]
+                # Les boucles sont inutiles et seule la moins chère des
+                # arêtes parallèles est conservée
+                if (arrivee != depart and
+                        poids[j] < sortants[depart].get(arrivee, INFINI)):
+                    sortants[depart][arrivee] = poids[j]
+                    entrants[arrivee][depart] = poids[j]
+
+        self.milieux = {}
+        self.montants_avant = [None] * nb_noeuds
+        self.montants_arriere = [None] * nb_noeuds
+        self.rangs = [0] * nb_noeuds
+        self.nb_raccourcis = 0
+        contractes = [0] * nb_noeuds
+        tas = [(self._priorite(sortants, entrants, contractes, noeud,
+                               self._raccourcis(sortants, entrants, noeud)),
+                noeud) for noeud in range(nb_noeuds)]
+        heapq.heapify(tas)
+        rang = 0
+        while tas:
+            _, noeud = heapq.heappop(tas)
+            # Mise à jour paresseuse : la priorité est recalculée et le
+            # noeud remis dans le tas s'il n'est plus le moins important
+            raccourcis = self._raccourcis(sortants, entrants, noeud)
+            priorite = self._priorite(sortants, entrants, contractes, noeud,
+                                      raccourcis)
+            if tas and priorite > tas[0][0]:
+                heapq.heappush(tas, (priorite, noeud))
+                continue
+
+            for amont, aval, cout in raccourcis:
+                if cout < sortants[amont].get(aval, INFINI):
+                    if aval not in sortants[amont]:
+                        self.nb_raccourcis += 1
+                    sortants[amont][aval] = cout
+                    entrants[aval][amont] = cout
+                    self.milieux[(amont, aval)] = noeud
+            # Les arêtes restantes mènent à des noeuds de rang supérieur
+            self.montants_avant[noeud] = list(sortants[noeud].items())
+            self.montants_arriere[noeud] = list(entrants[noeud].items())
+            for aval in sortants[noeud]:
+                del entrants[aval][noeud]
+                contractes[aval] += 1
+            for amont in entrants[noeud]:
+                del sortants[amont][noeud]
+                contractes[amont] += 1
+            sortants[noeud] = {}
+            entrants[noeud] = {}
+            self.rangs[noeud] = rang
+            rang += 1
+
+    def _deplier(self, depart, arrivee):
+        """Remplace récursivement une arête raccourci par les arêtes du
+        graphe d'origine qu'elle représente."""
+        milieu = self.milieux.get((depart, arrivee))
+        if milieu is None:
+            return [depart, arrivee]
+        return self._deplier(depart, milieu) + self._deplier(milieu,
+                                                             arrivee)[1:]
+
+    def chemin_destination(self, source, destination):
+        """Trouve le plus court chemin pour une destination
+          atteignable donnée, par une recherche bidirectionnelle montante.
+
+        Parametres
+        ----------
+        source : any
+            noeud de départ nécessairement contenu dans la colonne des départs
+            de la table.
+        destination : any
+            noeud d'arrivée nécessairement contenu dans la colonne des arrivées
+            de la table.
+
+        Renvoie
+        -------
+        list :
+            liste comportant le plus court chemin et son coût, comme
+            Dijkstra.chemin_destination.
+        """
+        depart, arrivee = self.dijkstra._verifier_trajet(source, destination)
+        sens = [(self.montants_avant, {depart: 0}, {}, [(0, depart)]),
+                (self.montants_arriere, {arrivee: 0}, {}, [(0, arrivee)])]
+        meilleur = INFINI
+        sommet = None
+        self.noeuds_fixes = 0
+        while sens[0][3] or sens[1][3]:
+            avant, arriere = sens[0][3], sens[1][3]
+            cote = 0 if avant and (not arriere
+                                   or avant[0][0] <= arriere[0][0]) else 1
+            montants, distances, predecesseurs, tas = sens[cote]
+            coefficient, selection = heapq.heappop(tas)
+            if coefficient > distances[selection]:
+                continue
+            if coefficient >= meilleur:
+                # Aucun noeud restant de ce côté ne peut améliorer le chemin
+                tas.clear()
+                continue
+            self.noeuds_fixes += 1
+            cout = coefficient + sens[1 - cote][1].get(selection, INFINI)
+            if cout < meilleur:
+                meilleur, sommet = cout, selection
+            # Arrêt à la demande : si un noeud de rang supérieur offre un
+            # meilleur coût, le chemin trouvé n'est pas le plus court et
+            # ses arêtes montantes n'ont pas à être suivies
+            descendants = sens[1 - cote][0][selection]
+            if any(distances.get(noeud, INFINI) + poids < coefficient
+                   for noeud, poids in descendants):
+                continue
+            for noeud, poids in montants[selection]:
+                cout = coefficient + poids
+                if cout < distances.get(noeud, INFINI):
+                    distances[noeud] = cout
+                    predecesseurs[noeud] = selection
+                    heapq.heappush(tas, (cout, noeud))
+
+        if sommet is None:
+            raise ValueError('Pas de trajet')
+        # Arêtes montantes de la source au sommet puis descendantes
+        montee = [sommet]
+        while montee[-1] != depart:
+            montee.append(sens[0][2][montee[-1]])
+        montee.reverse()
+        descente = [sommet]
+        while descente[-1] != arrivee:
+            descente.append(sens[1][2][descente[-1]])
+        aretes = montee + descente[1:]
+        parcours = [depart]
+        for a, b in zip(aretes, aretes[1:]):
+            parcours.extend(self._deplier(a, b)[1:])
+        # Le coût est additionné le long du chemin déplié depuis la source,
+        # comme par Dijkstra : la somme des raccourcis peut en différer en
+        # virgule flottante
+        cout = _cumuls(self.dijkstra.graphe.listes(), parcours)[-1]
+        return [self.dijkstra.graphe.noeuds[parcours].tolist(), cout]
+
+    def rapport(self, paires):
+        """Mesure le prétraitement et la durée moyenne des recherches.
+
+        Parametre
+        ----------
+        paires : list[tuple]
+            Couples (source, destination) à rechercher.
+
+        Renvoie
+        -------
+        dict :
+            la durée du prétraitement (s), le nombre de raccourcis et la
+            durée moyenne d'une recherche (ms) avec la hiérarchie et avec
+            Dijkstra.chemin_destination, ainsi que le nombre moyen de noeuds
+            fixés par chacune.
+        """
+        mesures = {"hierarchie": [0.0, 0], "dijkstra": [0.0, 0]}
+        for source, destination in paires:
+            for nom, methode in (("hierarchie", self),
+                                 ("dijkstra", self.dijkstra)):
+                debut = time.perf_counter()
+                try:
+                    methode.chemin_destination(source, destination)
+                except ValueError:
+                    pass
+                mesures[nom][0] += time.perf_counter() - debut
+                mesures[nom][1] += methode.noeuds_fixes
+        nb_paires = max(len(paires), 1)
+        return {
+            "pretraitement_s": self.duree_pretraitement,
+            "raccourcis": self.nb_raccourcis,
+            "aretes": self.dijkstra.graphe.nb_aretes,
+            "requete_hierarchie_ms": 1000 * mesures["hierarchie"][0] / nb_paires,
+            "requete_dijkstra_ms": 1000 * mesures["dijkstra"][0] / nb_paires,
+            "noeuds_hierarchie": mesures["hierarchie"][1] / nb_paires,
+            "noeuds_dijkstra": mesures["dijkstra"][1] / nb_paires,
+        }
+
+
+if __name__ == '__main__':
+    import random
+    import pandas as pd
+    from .dijkstra import Dijkstra
+
+    tarifs = pd.read_csv("data/tarifs-tgv-inoui-ouigo.csv", sep=";")
+    aeroports = pd.read_csv("data/air_routes_edges.csv", sep=",")
+    aeroports = aeroports[aeroports["label"] == "route"]
+    for nom, dataf, depart, arrivee, distance in (
+            ("SNCF", tarifs, "Gare origine - code UIC",
+             "Gare destination - code UIC", "Prix minimum"),
+            ("Aérien", aeroports, "from", "to", "dist")):
+        dijkstra = Dijkstra(dataf, depart, arrivee, distance)
+        hierarchie = HierarchieContraction(dijkstra)
+        generateur = random.Random(0)
+        origines = sorted(set(dataf[depart]))
+        destinations = sorted(set(dataf[arrivee]))
+        paires = [(generateur.choice(origines), generateur.choice(destinations))
+                  for _ in range(200)]
+        print(nom, hierarchie.rapport(paires))
@@ -1,7 +1,331 @@
 """Algorithme de Dijkstra permettant de trouver le plus court chemin
 dans un dataframe."""
 
-import pandas as pd
+import heapq
+import os
+import sys
+from collections.abc import Mapping
+
+import numpy as np
+
+from .annulation import PERIODE_VERIFICATION
+from .chronometre import chronometre
+from .graphe import Graphe
+
+INFINI = 2**30  # Coût d'un noeud non atteignable
+STRATEGIES = ("tas", "naif", "bidirectionnel")
+
+
+def _parcours_naif(graphe, source, jeton=None):
+    """Parcours historique : recherche linéaire du minimum.
+
+    À chaque itération, tous les noeuds du graphe sont parcourus pour
+    trouver le noeud non marqué le plus proche de la source, d'où une
+    complexité quadratique en le nombre de noeuds.
+    """
+    offsets, cibles, poids = graphe.listes()
+    nb_noeuds = len(offsets) - 1
+    # Seuls les noeuds non culs-de-sac peuvent être sélectionnés
+    sommets = [i for i in range(nb_noeuds) if offsets[i + 1] > offsets[i]]
+    distances = [INFINI] * nb_noeuds
+    predecesseurs = [-1] * nb_noeuds
+    marques = []  # Contiendra les noeuds visités
+    selection = source
+    coefficient = 0
+    while len(marques) < len(sommets) and selection is not None:
+        if jeton is not None:
+            jeton.verifier()
+        marques.append(selection)
+        for j in range(offsets[selection], offsets[selection + 1]):
+            noeud = cibles[j]  # Le noeud qu'on parcourt
+            if (noeud not in marques and
+               coefficient + poids[j] < distances[noeud]):
+                # On met à jour la distance du noeud à la source
+                distances[noeud] = coefficient + poids[j]
+                predecesseurs[noeud] = selection
+
+        # On recherche le minimum parmi les non marqués
+        minimum = (None, INFINI)
+        for sommet in sommets:
+            if sommet not in marques and distances[sommet] < minimum[1]:
+                minimum = (sommet, distances[sommet])
+        selection, coefficient = minimum
+    return distances, predecesseurs, len(marques)
+
+
+def _parcours_tas(graphe, source, cible=None, jeton=None):
+    """Parcours par tas binaire avec suppression paresseuse.
+
+    Les candidats sont stockés dans un tas ordonné par coût ; une entrée
+    dont le noeud est déjà marqué est simplement ignorée lorsqu'elle
+    ressort du tas, d'où une complexité en O((A + N) log N). À coût égal,
+    le noeud d'identifiant le plus petit est sélectionné en premier, comme
+    dans le parcours naïf. Si une cible est donnée, le parcours s'arrête
+    dès que son coût est définitif. Si un jeton d'annulation est donné, il
+    est vérifié tous les PERIODE_VERIFICATION noeuds marqués.
+    """
+    offsets, cibles, poids = graphe.listes()
+    nb_noeuds = len(offsets) - 1
+    distances = [INFINI] * nb_noeuds
+    predecesseurs = [-1] * nb_noeuds
+    marques = bytearray(nb_noeuds)
+    nb_marques = 0
+    distances[source] = 0
+    tas = [(0, source)]
+    while tas:
+        coefficient, selection = heapq.heappop(tas)
+        if marques[selection]:
+            continue
+        marques[selection] = 1
+        nb_marques += 1
+        if selection == cible:
+            break
+        if jeton is not None and nb_marques % PERIODE_VERIFICATION == 0:
+            jeton.verifier()
+        for j in range(offsets[selection], offsets[selection + 1]):
+            noeud = cibles[j]
+            cout = coefficient + poids[j]
+            if not marques[noeud] and cout < distances[noeud]:
+                distances[noeud] = cout
+                predecesseurs[noeud] = selection
+                heapq.heappush(tas, (cout, noeud))
+    return distances, predecesseurs, nb_marques
+
+
+def _parcours_bidirectionnel(graphe, source, cible, jeton=None):
+    """Parcours simultané depuis la source et vers la cible.
+
+    Une recherche avant part de la source dans le graphe et une recherche
+    arrière part de la cible dans le graphe inverse ; on avance à chaque
+    étape celle dont le prochain coût est le plus faible. Le meilleur
+    chemin passant par une arête reliant les deux recherches est conservé,
+    et le parcours s'arrête dès que la somme des deux prochains coûts le
+    dépasse : aucun chemin plus court ne peut alors exister.
+
+    Renvoie
+    -------
+    tuple :
+        le coût minimal (INFINI si la cible n'est pas atteignable), la
+        liste des identifiants du chemin et le nombre de noeuds marqués.
+    """
+    nb_noeuds = len(graphe)
+    sens = []
+    for depart, parcouru in ((source, graphe), (cible, graphe.inverse())):
+        distances = [INFINI] * nb_noeuds
+        distances[depart] = 0
+        sens.append((parcouru.listes(), distances, [-1] * nb_noeuds,
+                     bytearray(nb_noeuds), [(0, depart)]))
+    meilleur = INFINI
+    jonction = None  # Arête (a, b) reliant la recherche avant à l'arrière
+    nb_marques = 0
+    while True:
+        for _, _, _, marques, tas in sens:
+            while tas and marques[tas[0][1]]:
+                heapq.heappop(tas)
+        avant, arriere = sens[0][4], sens[1][4]
+        if not avant or not arriere or avant[0][0] + arriere[0][0] >= meilleur:
+            break
+        cote = 0 if avant[0][0] <= arriere[0][0] else 1
+        (offsets, cibles, poids), distances, predecesseurs, marques, tas = \
+            sens[cote]
+        distances_opposees = sens[1 - cote][1]
+        coefficient, selection = heapq.heappop(tas)
+        marques[selection] = 1
+        nb_marques += 1
+        if jeton is not None and nb_marques % PERIODE_VERIFICATION == 0:
+            jeton.verifier()
+        for j in range(offsets[selection], offsets[selection + 1]):
+            noeud = cibles[j]
+            cout = coefficient + poids[j]
+            if not marques[noeud] and cout < distances[noeud]:
+                distances[noeud] = cout
+                predecesseurs[noeud] = selection
+                heapq.heappush(tas, (cout, noeud))
+            if cout + distances_opposees[noeud] < meilleur:
+                meilleur = cout + distances_opposees[noeud]
+                jonction = ((selection, noeud) if cote == 0
+                            else (noeud, selection))
+
+    if jonction is None:
+        return INFINI, [], nb_marques
+    parcours = _remonter(sens[0][2], source, jonction[0])
+    sommet = jonction[1]
+    parcours.append(sommet)
+    while sommet != cible:
+        sommet = sens[1][2][sommet]
+        parcours.append(sommet)
+    # Le coût est additionné le long du chemin depuis la source, comme
+    # dans les autres parcours : la somme des distances avant et arrière
+    # peut différer en virgule flottante
+    return _cumuls(sens[0][0], parcours)[-1], parcours, nb_marques
+
+
+def _remonter(predecesseurs, source, cible):
+    """Parcourt l'arbre des prédécesseurs à l'envers pour obtenir le
+    chemin de la source à la cible."""
+    parcours = [cible]
+    sommet = cible
+    while sommet != source:
+        sommet = predecesseurs[sommet]
+        parcours.append(sommet)
+    parcours.reverse()
+    return parcours
+
+
+def _poids_arete(listes, depart, arrivee):
+    """Renvoie le poids minimal des arêtes parallèles de depart vers
+    arrivee."""
+    offsets, cibles, poids = listes
+    return min(poids[j] for j in range(offsets[depart], offsets[depart + 1])
+               if cibles[j] == arrivee)
+
+
+def _cumuls(listes, parcours):
+    """Renvoie les coûts cumulés depuis le premier noeud du chemin jusqu'à
+    chacun de ses noeuds, additionnés dans le sens du trajet."""
+    cumuls = [0]
+    for depart, arrivee in zip(parcours, parcours[1:]):
+        cumuls.append(cumuls[-1] + _poids_arete(listes, depart, arrivee))
+    return cumuls
+
+
+def _deviation(listes, vers_cible, suivants, cible, precedents_cible,
+               racine, cout_racine, aretes_interdites, jeton=None):
+    """Plus court chemin de déviation de l'algorithme de Yen.
+
+    Cherche le plus court chemin du dernier noeud de la racine jusqu'à la
+    cible, sans repasser par les autres noeuds de la racine ni emprunter
+    les arêtes interdites depuis ce noeud. La recherche est un A* guidé
+    par les coûts exacts vers la cible dans le graphe complet
+    (vers_cible) : ils ne peuvent qu'augmenter quand des noeuds et des
+    arêtes sont retirés, l'heuristique est donc admissible. La recherche
+    s'arrête dès qu'elle fixe un noeud dont le chemin dans l'arbre des
+    plus courts chemins vers la cible (suivants) évite la racine : ce
+    chemin est alors optimal. Si la cible n'a plus d'arête entrante
+    utilisable (precedents_cible : noeuds ayant une arête vers la cible),
+    aucune recherche n'est lancée.
+
+    Renvoie
+    -------
+    tuple :
+        le chemin de déviation (liste d'identifiants, du dernier noeud de
+        la racine à la cible) ou None s'il n'en existe pas, et le nombre
+        de noeuds fixés.
+    """
+    offsets, cibles, poids = listes
+    debut = racine[-1]
+    interdits = set(racine)
+    if all(noeud in interdits
+           and (noeud != debut or cible in aretes_interdites)
+           for noeud in precedents_cible):
+        return None, 0
+    # Indique si le chemin de l'arbre depuis un noeud évite la racine
+    rejoint = {}
+
+    def rejoint_arbre(noeud):
+        chemin = []
+        while noeud not in rejoint:
+            if suivants[noeud] == -1:  # la cible
+                rejoint[noeud] = True
+                break
+            if noeud in interdits:
+                rejoint[noeud] = False
+                break
+            chemin.append(noeud)
+            noeud = suivants[noeud]
+        resultat = rejoint[noeud]
+        for sommet in chemin:
+            rejoint[sommet] = resultat
+        return resultat
+
+    couts = {debut: cout_racine}
+    predecesseurs = {debut: -1}
+    fixes = set()
+    tas = [(cout_racine + vers_cible[debut], debut)]
+    while tas:
+        _, selection = heapq.heappop(tas)
+        if selection in fixes:
+            continue
+        fixes.add(selection)
+        if jeton is not None and len(fixes) % PERIODE_VERIFICATION == 0:
+            jeton.verifier()
+        if selection == debut:
+            suivant = suivants[debut]
+            arrivee = (suivant != -1 and suivant not in aretes_interdites
+                       and rejoint_arbre(suivant))
+        else:
+            arrivee = rejoint_arbre(selection)
+        if arrivee:
+            parcours = [selection]
+            while predecesseurs[parcours[-1]] != -1:
+                parcours.append(predecesseurs[parcours[-1]])
+            parcours.reverse()
+            sommet = selection
+            while suivants[sommet] != -1:
+                sommet = suivants[sommet]
+                parcours.append(sommet)
+            return _sans_boucle(parcours), len(fixes)
+        for j in range(offsets[selection], offsets[selection + 1]):
+            noeud = cibles[j]
+            if (noeud in fixes or noeud in interdits
+                    or vers_cible[noeud] == INFINI
+                    or (selection == debut and noeud in aretes_interdites)):
+                continue
+            cout = couts[selection] + poids[j]
+            if cout < couts.get(noeud, INFINI):
+                couts[noeud] = cout
+                predecesseurs[noeud] = selection
+                heapq.heappush(tas, (cout + vers_cible[noeud], noeud))
+    return None, len(fixes)
+
+
+def _sans_boucle(parcours):
+    """Retire les boucles d'un chemin : elles ne peuvent venir que
+    d'arêtes de poids nul, le coût du chemin est donc inchangé."""
+    resultat = []
+    positions = {}
+    for noeud in parcours:
+        if noeud in positions:
+            for sommet in resultat[positions[noeud] + 1:]:
+                del positions[sommet]
+            del resultat[positions[noeud] + 1:]
+        else:
+            positions[noeud] = len(resultat)
+            resultat.append(noeud)
+    return resultat
+
+
+_GRAPHE_PROCESSUS = None  # Graphe partagé par les tâches d'un processus
+
+
+def _initialiser_processus(graphe):
+    """Reçoit une seule fois le graphe dans chaque processus de calcul."""
+    global _GRAPHE_PROCESSUS
+    _GRAPHE_PROCESSUS = graphe
+
+
+def _lignes_couts(sources, destinations, avec_predecesseurs, graphe=None):
+    """Calcule les lignes de la matrice des coûts pour un lot de sources.
+
+    Renvoie
+    -------
+    tuple :
+        le tableau des coûts (infini si non atteignable) de chaque source
+        vers chaque destination et, si demandé, le tableau des
+        prédécesseurs de tous les noeuds pour chaque source (None sinon).
+    """
+    graphe = _GRAPHE_PROCESSUS if graphe is None else graphe
+    couts = np.empty((len(sources), len(destinations)))
+    predecesseurs = (np.empty((len(sources), len(graphe)), dtype=np.int32)
+                     if avec_predecesseurs else None)
+    for ligne, source in enumerate(sources):
+        distances, preds, _ = _parcours_tas(graphe, source)
+        distances = np.array(distances, dtype=np.float64)[destinations]
+        distances[distances == INFINI] = np.inf
+        couts[ligne] = distances
+        if avec_predecesseurs:
+            predecesseurs[ligne] = preds
+    return couts, predecesseurs
 
 
 class Dijkstra:
@@ -14,39 +338,93 @@ class Dijkstra:
     d'arrivée et le noeud de départ. La classe modélise également
     le graphe utilisé dans ces deux différentes versions.
 
+    Le graphe est construit une seule fois, à l'initialisation, sous la
+    forme d'un objet Graphe réutilisé par toutes les recherches.
+
     Parametres
     ----------
-    dataf : pandas.DataFrame
-        Le dataframe contenant les données du graphe.
+    dataf : pandas.DataFrame or dict
+        Le dataframe contenant les données du graphe, ou un dictionnaire
+        associant à chaque nom de colonne une liste ou un tableau NumPy :
+        pandas n'est alors pas importé.
     colonne_noeud_depart : str
         Le nom de la colonne contenant les nœuds de départ.
     colonne_noeud_arrivee : str
         Le nom de la colonne contenant les nœuds d'arrivée.
     colonne_distance : str
         Le nom de la colonne contenant les distances entre les nœuds.
+    strategie : str
+        Le moteur de recherche utilisé : "tas" (par défaut) pour un tas
+        binaire, "naif" pour la recherche linéaire du minimum ou
+        "bidirectionnel" pour une recherche simultanée depuis le départ et
+        vers l'arrivée dans chemin_destination. Lorsque plusieurs chemins
+        ont le même coût minimal, cette dernière peut renvoyer un autre
+        chemin que les deux premières.
+
+    Attributs
+    ----------
+    noeuds_fixes : int
+        Le nombre de noeuds dont le coût a été fixé lors de la dernière
+        recherche, permettant de comparer les stratégies.
     """
 
+    @chronometre("dijkstra.construction")
     def __init__(self, dataf, colonne_noeud_depart, colonne_noeud_arrivee,
-                 colonne_distance):
-
-        if not isinstance(dataf, pd.DataFrame):
-            raise TypeError("dataf doit être un dataframe pandas")
-        if dataf[colonne_noeud_depart].isna().any():
-            raise ValueError("Valeurs manquantes")
-        if dataf[colonne_noeud_arrivee].isna().any():
-            raise ValueError("Valeurs manquantes")
-        if dataf[colonne_distance].isna().any():
-            raise ValueError("Valeurs manquantes")
-        for i in set(dataf[colonne_distance]):
-            if not isinstance(i, (float, int)):
-                raise TypeError("Distances non numeriques")
-            if i < 0:
-                raise ValueError("Distances non strictement positives")
+                 colonne_distance, strategie="tas"):
+
+        # pandas n'est consulté que s'il a déjà été importé : sinon dataf
+        # ne peut pas être un dataframe
+        pandas = sys.modules.get("pandas")
+        if not (isinstance(dataf, Mapping)
+                or (pandas is not None
+                    and isinstance(dataf, pandas.DataFrame))):
+            raise TypeError("dataf doit être un dataframe pandas ou un "
+                            "dictionnaire de colonnes")
+        if strategie not in STRATEGIES:
+            raise ValueError(f"Stratégie inconnue, doit être parmi {STRATEGIES}")
 
         self.dataf = dataf
         self.colonne_noeud_depart = colonne_noeud_depart
         self.colonne_noeud_arrivee = colonne_noeud_arrivee
         self.colonne_distance = colonne_distance
+        self.strategie = strategie
+        self.noeuds_fixes = 0
+        self._arbre_inverse = None  # Dernier arbre calculé par _arbre_vers
+        self.graphe = Graphe.depuis_dataframe(dataf, colonne_noeud_depart,
+                                              colonne_noeud_arrivee,
+                                              colonne_distance)
+
+    @classmethod
+    def depuis_graphe(cls, graphe, strategie="tas"):
+        """Crée l'algorithme sur un graphe déjà construit, par exemple
+        ouvert depuis un fichier binaire avec FichierGraphe : aucune table
+        n'est nécessaire.
+
+        Parametres
+        ----------
+        graphe : Graphe
+            Le graphe à interroger.
+        strategie : str
+            Le moteur de recherche utilisé (par défaut : "tas").
+
+        Renvoie
+        -------
+        Dijkstra :
+            L'algorithme prêt à être interrogé, sans table (dataf et les
+            noms de colonnes valent None).
+        """
+        if strategie not in STRATEGIES:
+            raise ValueError(f"Stratégie inconnue, doit être parmi {STRATEGIES}")
+        dijkstra = cls.__new__(cls)
+        dijkstra.dataf = None
+        dijkstra.colonne_noeud_depart = None
+        dijkstra.colonne_noeud_arrivee = None
+        dijkstra.colonne_distance = None
+        dijkstra.strategie = strategie
+        dijkstra.noeuds_fixes = 0
+        dijkstra._arbre_inverse = None
+        dijkstra.graphe = graphe
+        return dijkstra
 
     def graph(self):
         """Crée un graphe représentant les nœuds et les distances entre eux.
@@ -62,12 +440,48 @@ class Dijkstra:
         dict[list] :
             Le graphe représenté sous forme de dictionnaire.
         """
-        df_grouped = self.dataf.groupby(self.colonne_noeud_depart).apply(
-            lambda x: list(zip(x[self.colonne_noeud_arrivee], x[self.colonne_distance]))
-        ).to_dict()
-        return df_grouped
+        return self.graphe.vers_dict()
 
-    def chemin_partout(self, source):
+    def _parcours(self, source, cible=None, jeton=None):
+        """Calcule les plus courtes distances depuis la source.
+
+        Parametres
+        ----------
+        source : int
+            identifiant dense du noeud de départ dans le graphe.
+        cible : int
+            identifiant dense d'un noeud d'arrivée : la recherche par tas
+            s'arrête dès que son coût est définitif.
+        jeton : JetonAnnulation
+            jeton permettant d'interrompre la recherche.
+
+        Renvoie
+        -------
+        tuple[list] :
+            les listes des coûts minimaux depuis la source (INFINI pour un
+            noeud non atteignable) et des prédécesseurs de chaque noeud.
+        """
+        if self.strategie == "naif":
+            distances, predecesseurs, self.noeuds_fixes = _parcours_naif(
+                self.graphe, source, jeton)
+        else:
+            distances, predecesseurs, self.noeuds_fixes = _parcours_tas(
+                self.graphe, source, cible, jeton)
+        return distances, predecesseurs
+
+    def _verifier_trajet(self, source, destination):
+        """Vérifie qu'un trajet peut être recherché entre deux noeuds et
+        renvoie leurs identifiants denses dans le graphe."""
+        if destination == source:
+            raise ValueError("Le point de départ et le point d'arrivée sont identiques")
+        if not self.graphe.est_origine(source):
+            raise ValueError('Pas de trajet depuis votre point de départ')
+        if not self.graphe.est_destination(destination):
+            raise ValueError("Votre point d'arrivée n'est pas atteignable")
+        return self.graphe.indice(source), self.graphe.indice(destination)
+
+    @chronometre("dijkstra.chemin_partout")
+    def chemin_partout(self, source, jeton=None):
         """Trouve le plus court chemin pour une multitude de destinations
           atteignables.
 
@@ -83,6 +497,9 @@ class Dijkstra:
         source : any
             noeud de départ nécessairement contenu dans la colonne des départs
             de la table.
+        jeton : JetonAnnulation
+            jeton permettant d'annuler la recherche ou d'en limiter la
+            durée : RechercheAnnulee ou DelaiDepasse est alors levée.
 
         Renvoie
         -------
@@ -92,53 +509,25 @@ class Dijkstra:
             et son coût si le noeud est atteignable sinon le
             string 'Pas de trajet'.
         """
-        graphe = self.graph()
-        marques = []  # Contiendra le nom des noeuds visités
-        distances = {sommet: (None, 2**30) for sommet in
-                     set(self.dataf[self.colonne_noeud_depart]).union(
-                     set(self.dataf[self.colonne_noeud_arrivee]))}
-
-        if source not in set(self.dataf[self.colonne_noeud_depart]):
+        if not self.graphe.est_origine(source):
             raise ValueError('Pas de trajet')
-        selection = source
-        coefficient = 0
-        while len(marques) < len(graphe) and selection is not None:
-            marques.append(selection)
-            for voisin in graphe[selection]:  # On parcourt ses voisins
-                # voisin est le couple (noeud, poids)
-                noeud = voisin[0]  # Le noeud qu'on parcourt
-                poids = voisin[1]  # Le poids de selection à noeud
-                if (noeud not in marques and
-                   coefficient + poids < distances[noeud][1]):
-                    # On met à jour la distance du noeud à la source
-                    distances[noeud] = (selection, coefficient + poids)
-
-            # On recherche le minimum parmi les non marqués
-            minimum = (None, 2**30)
-            for sommet in graphe:
-                if sommet not in marques and distances[sommet][1] < minimum[1]:
-                    minimum = (sommet, distances[sommet][1])
-            selection, coefficient = minimum
+        depart = self.graphe.indice(source)
+        distances, predecesseurs = self._parcours(depart, jeton=jeton)
 
+        noeuds = self.graphe.noeuds.tolist()
         dict_parcours = {}
-        for sommet in distances:
-            if sommet != source:
-                if distances[sommet][1] == 2**30:
+        for sommet in range(len(noeuds)):
+            if sommet != depart:
+                if distances[sommet] == INFINI:
                     raise ValueError('Pas de trajet')
-                else:
-                    # Parcourt le graphe à l'envers pour obtenir le chemin
-                    parcours = [sommet]
-                    intermediaire = sommet
-                    while intermediaire != source:
-                        intermediaire = distances[intermediaire][0]
-                        parcours.append(intermediaire)
-                    parcours.reverse()
-                    dict_parcours[sommet] = [parcours,
-                                             distances[sommet][1]]
+                parcours = _remonter(predecesseurs, depart, sommet)
+                dict_parcours[noeuds[sommet]] = [
+                    [noeuds[i] for i in parcours], distances[sommet]]
 
         return dict_parcours
 
-    def chemin_destination(self, source, destination):
+    @chronometre("dijkstra.chemin_destination")
+    def chemin_destination(self, source, destination, jeton=None):
         """Trouve le plus court chemin pour une destination
           atteignable donnée.
 
@@ -155,6 +544,9 @@ class Dijkstra:
         destination : any
             noeud d'arrivée nécessairement contenu dans la colonne des arrivées
             de la table.
+        jeton : JetonAnnulation
+            jeton permettant d'annuler la recherche ou d'en limiter la
+            durée : RechercheAnnulee ou DelaiDepasse est alors levée.
 
         Renvoie
         -------
@@ -162,50 +554,207 @@ class Dijkstra:
             liste comportant le plus court chemin et son coût ou le string
             'Pas de trajet' si pas de chemin possible.
         """
-        if destination == source:
-            raise ValueError("Le point de départ et le point d'arrivée sont identiques")
-        if source not in set(self.dataf[self.colonne_noeud_depart]):
-            raise ValueError('Pas de trajet depuis votre point de départ')
-        if destination not in set(self.dataf[self.colonne_noeud_arrivee]):
-            raise ValueError("Votre point d'arrivée n'est pas atteignable")
+        depart, arrivee = self._verifier_trajet(source, destination)
+        if self.strategie == "bidirectionnel":
+            cout, parcours, self.noeuds_fixes = _parcours_bidirectionnel(
+                self.graphe, depart, arrivee, jeton)
+        else:
+            distances, predecesseurs = self._parcours(depart, arrivee, jeton)
+            cout = distances[arrivee]
+            if cout != INFINI:
+                parcours = _remonter(predecesseurs, depart, arrivee)
+
+        if cout == INFINI:
+            raise ValueError('Pas de trajet')
+        return [self.graphe.noeuds[parcours].tolist(), cout]
+
+    @chronometre("dijkstra.chemins_alternatifs")
+    def chemins_alternatifs(self, source, destination, k=3, jeton=None):
+        """Trouve les k chemins sans boucle les moins coûteux entre deux
+        noeuds (algorithme de Yen).
+
+        Chaque chemin est la déviation la moins coûteuse d'un chemin
+        précédent : il en reprend le début (la racine) puis le quitte par
+        une arête différente de celles de tous les chemins déjà trouvés
+        ayant la même racine. L'arbre des plus courts chemins vers la
+        destination, calculé une seule fois, guide chacune des recherches
+        de déviation et les arrête dès qu'elles le rejoignent : chaque
+        déviation ne fixe que quelques noeuds.
+
+        Parametres
+        ----------
+        source : any
+            noeud de départ nécessairement contenu dans la colonne des départs
+            de la table.
+        destination : any
+            noeud d'arrivée nécessairement contenu dans la colonne des arrivées
+            de la table.
+        k : int
+            nombre maximal de chemins (par défaut : 3).
+        jeton : JetonAnnulation
+            jeton permettant d'annuler la recherche ou d'en limiter la
+            durée : RechercheAnnulee ou DelaiDepasse est alors levée.
 
-        graphe = self.graph()
-        marques = []  # Contiendra le nom des noeuds visités
-        distances = {sommet: (None, 2**30) for sommet in
-                     set(self.dataf[self.colonne_noeud_depart]).union(
-                     set(self.dataf[self.colonne_noeud_arrivee]))}
-        selection = source
-        coefficient = 0
-        while len(marques) < len(graphe) and selection is not None:
-            marques.append(selection)
-            for voisin in graphe[selection]:  # On parcours ses voisins
-                # voisin est le couple (noeud, poids)
-                noeud = voisin[0]  # Le noeud qu'on parcourt
-                poids = voisin[1]  # Le poids de selection à noeud
-                if (noeud not in marques and
-                   coefficient + poids < distances[noeud][1]):
-                    # On met à jour la distance du noeud à la source
-                    distances[noeud] = (selection, coefficient + poids)
-
-            # On recherche le minimum parmi les non marqués
-            minimum = (None, 2**30)
-            for sommet in graphe:
-                if sommet not in marques and distances[sommet][1] < minimum[1]:
-                    minimum = (sommet, distances[sommet][1])
-            selection, coefficient = minimum
-
-        if distances[destination][1] == 2**30:
+        Renvoie
+        -------
+        list :
+            au plus k listes comportant un chemin et son coût, par coût
+            croissant ; le premier est un plus court chemin.
+
+        Exemples
+        --------
+        >>> dataf = {'Départ': ['A', 'A', 'B', 'C', 'B'],
+        ...          'Arrivé': ['B', 'C', 'D', 'D', 'C'],
+        ...          'Distance': [1, 2, 3, 3, 1]}
+        >>> Dijkstra(dataf, 'Départ', 'Arrivé',
+        ...          'Distance').chemins_alternatifs('A', 'D')
+        [[['A', 'B', 'D'], 4], [['A', 'B', 'C', 'D'], 5], [['A', 'C', 'D'], 5]]
+        """
+        if k < 1:
+            raise ValueError("Le nombre de chemins doit être au moins de 1")
+        depart, arrivee = self._verifier_trajet(source, destination)
+        listes = self.graphe.listes()
+        vers_cible, suivants, self.noeuds_fixes = self._arbre_vers(arrivee,
+                                                                  jeton)
+        if vers_cible[depart] == INFINI:
             raise ValueError('Pas de trajet')
-        # Parcourt le graphe à l'envers pour obtenir le chemin
-        parcours = [destination]
-        sommet = destination
-        while sommet != source:
-            sommet = distances[sommet][0]
-            parcours.append(sommet)
-        parcours.reverse()
-        return [parcours, distances[destination][1]]
+
+        parcours = [depart]
+        while parcours[-1] != arrivee:
+            parcours.append(suivants[parcours[-1]])
+        chemins = [(parcours, _cumuls(listes, parcours))]
+        offsets_inverses, precedents, _ = self.graphe.inverse().listes()
+        precedents = set(precedents[offsets_inverses[arrivee]:
+                                    offsets_inverses[arrivee + 1]])
+        candidats = []
+        connus = {tuple(parcours)}
+        while len(chemins) < k:
+            precedent, cumuls = chemins[-1]
+            for i in range(len(precedent) - 1):
+                racine = precedent[:i + 1]
+                aretes_interdites = {chemin[i + 1] for chemin, _ in chemins
+                                     if chemin[:i + 1] == racine}
+                deviation, nb_fixes = _deviation(
+                    listes, vers_cible, suivants, arrivee, precedents,
+                    racine, cumuls[i], aretes_interdites, jeton)
+                self.noeuds_fixes += nb_fixes
+                if deviation is None:
+                    continue
+                parcours = racine[:-1] + deviation
+                if tuple(parcours) not in connus:
+                    connus.add(tuple(parcours))
+                    cumuls_parcours = _cumuls(listes, parcours)
+                    heapq.heappush(candidats, (cumuls_parcours[-1], parcours,
+                                               cumuls_parcours))
+            if not candidats:
+                break
+            _, parcours, cumuls_parcours = heapq.heappop(candidats)
+            chemins.append((parcours, cumuls_parcours))
+
+        return [[self.graphe.noeuds[parcours].tolist(), cumuls[-1]]
+                for parcours, cumuls in chemins]
+
+    def _arbre_vers(self, arrivee, jeton=None):
+        """Renvoie les coûts minimaux vers la destination, le noeud
+        suivant sur le plus court chemin vers elle (-1 pour la destination
+        et les noeuds qui ne l'atteignent pas) et le nombre de noeuds
+        fixés pour les calculer.
+
+        L'arbre de la dernière destination demandée est conservé : il
+        n'est pas recalculé (aucun noeud fixé) pour la même destination."""
+        arbre = self._arbre_inverse
+        if arbre is not None and arbre[0] == arrivee:
+            return arbre[1], arbre[2], 0
+        distances, suivants, nb_marques = _parcours_tas(
+            self.graphe.inverse(), arrivee, jeton=jeton)
+        self._arbre_inverse = (arrivee, distances, suivants)
+        return distances, suivants, nb_marques
+
+    @chronometre("dijkstra.matrice_couts")
+    def matrice_couts(self, sources, destinations=None, predecesseurs=False,
+                      processus=None, format="numpy"):
+        """Calcule la matrice des coûts minimaux entre deux listes de noeuds.
+
+        Une recherche complète est lancée depuis chaque source. Les sources
+        sont réparties entre plusieurs processus, qui reçoivent chacun une
+        seule fois le graphe déjà construit.
+
+        Parametres
+        ----------
+        sources : list
+            noeuds de départ.
+        destinations : list
+            noeuds d'arrivée (par défaut : les sources).
+        predecesseurs : bool
+            si True, renvoie aussi les prédécesseurs de tous les noeuds
+            pour chaque source, permettant de reconstruire les chemins.
+        processus : int
+            nombre de processus de calcul (par défaut : le nombre de
+            coeurs). Avec 1, le calcul est fait dans le processus courant.
+        format : str
+            "numpy" pour des tableaux numpy ou "dataframe" pour des
+            dataframes pandas indexés par les noeuds.
+
+        Renvoie
+        -------
+        numpy.ndarray or pandas.DataFrame or tuple :
+            la matrice des coûts, de taille (sources, destinations), dont
+            les coûts non atteignables valent inf. Avec predecesseurs, un
+            couple (coûts, prédécesseurs) où la ligne d'une source donne
+            le prédécesseur de chaque noeud du graphe : identifiant dense
+            (-1 si aucun) avec "numpy", noeud (None si aucun) avec
+            "dataframe".
+        """
+        if format not in ("numpy", "dataframe"):
+            raise ValueError("Le format doit être 'numpy' ou 'dataframe'")
+        if destinations is None:
+            destinations = sources
+        identifiants = []
+        for noeuds in (sources, destinations):
+            identifiants.append([self.graphe.indice(noeud) for noeud in noeuds])
+            for noeud, indice in zip(noeuds, identifiants[-1]):
+                if indice is None:
+                    raise ValueError(f"{noeud} n'est pas un noeud du graphe")
+        ids_sources, ids_destinations = identifiants
+
+        if processus is None:
+            processus = os.cpu_count() or 1
+        processus = max(1, min(processus, len(ids_sources)))
+        if processus == 1:
+            couts, preds = _lignes_couts(ids_sources, ids_destinations,
+                                         predecesseurs, self.graphe)
+        else:
+            # Importé ici : concurrent.futures alourdit l'import du module
+            from concurrent.futures import ProcessPoolExecutor
+            # Plusieurs lots par processus pour équilibrer la charge
+            taille = -(-len(ids_sources) // (4 * processus))
+            lots = [ids_sources[i:i + taille]
+                    for i in range(0, len(ids_sources), taille)]
+            with ProcessPoolExecutor(processus,
+                                     initializer=_initialiser_processus,
+                                     initargs=(self.graphe,)) as executeur:
+                resultats = list(executeur.map(
+                    _lignes_couts, lots, [ids_destinations] * len(lots),
+                    [predecesseurs] * len(lots)))
+            couts = np.vstack([lignes for lignes, _ in resultats])
+            preds = (np.vstack([lignes for _, lignes in resultats])
+                     if predecesseurs else None)
+
+        if format == "dataframe":
+            import pandas as pd
+            couts = pd.DataFrame(couts, index=list(sources),
+                                 columns=list(destinations))
+            if predecesseurs:
+                noeuds = np.append(self.graphe.noeuds.astype(object), None)
+                preds = pd.DataFrame(noeuds[preds], index=list(sources),
+                                     columns=self.graphe.noeuds.tolist())
+        if predecesseurs:
+            return couts, preds
+        return couts
+
 
 if __name__ == '__main__':
+    import pandas as pd
     df_ex_4 = {
     'Distance': [4, 3, 5, 2, 4, 4, 2, 4, 3, 3, 3, 3.5],
     'Départ': ['Paris', 'Paris', 'Paris', 'Marseille', 'Bastia', 'Marseille',
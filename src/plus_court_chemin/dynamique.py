@@ -0,0 +1,315 @@
+"""Graphe modifiable dont l'arbre des plus courts chemins depuis une source
+est réparé après chaque modification au lieu d'être recalculé."""
+
+import heapq
+import numbers
+
+import numpy as np
+
+from .dijkstra import INFINI
+from .graphe import Graphe
+
+
+class GrapheDynamique:
+    """Graphe orienté pondéré modifiable.
+
+    Chaque arête reçoit à son ajout un identifiant entier, qui n'est
+    jamais réattribué après sa suppression. Les arêtes
+    sortantes et entrantes de chaque noeud sont rangées dans des
+    ensembles d'identifiants : ajouter ou supprimer une arête ne coûte
+    qu'un temps constant en moyenne, sans copie de la table.
+
+    Lorsqu'une source est fixée, l'arbre des plus courts chemins depuis
+    cette source est conservé. Après un ajout, seuls les noeuds dont le
+    coût diminue sont revisités ; après la suppression d'une arête de
+    l'arbre, seul le sous-arbre qu'elle portait est recalculé, à partir
+    des noeuds restés atteignables.
+
+    Attributs
+    ----------
+    source : any
+        La source de l'arbre des plus courts chemins, None si aucune.
+    noeuds_repares : int
+        Le nombre de noeuds dont le coût a été fixé par la dernière
+        réparation de l'arbre.
+    """
+
+    def __init__(self):
+        self.source = None
+        self.noeuds_repares = 0
+        self._indices = {}
+        self._etiquettes = []
+        self._sortants = []
+        self._entrants = []
+        self._origines = []
+        self._cibles = []
+        self._poids = []
+        self._nb_supprimees = 0
+        self._distances = []
+        self._parents = []
+        self._enfants = []
+
+    @classmethod
+    def depuis_dataframe(cls, dataf, colonne_noeud_depart,
+                         colonne_noeud_arrivee, colonne_distance):
+        """Construit le graphe à partir d'une table d'arêtes.
+
+        L'arête construite à partir de la i-ème ligne de la table reçoit
+        l'identifiant i.
+
+        Parametres
+        ----------
+        dataf : pandas.DataFrame
+            Le dataframe contenant les données du graphe.
+        colonne_noeud_depart : str
+            Le nom de la colonne contenant les nœuds de départ.
+        colonne_noeud_arrivee : str
+            Le nom de la colonne contenant les nœuds d'arrivée.
+        colonne_distance : str
+            Le nom de la colonne contenant les distances entre les nœuds.
+
+        Renvoie
+        -------
+        GrapheDynamique :
+            Le graphe construit.
+        """
+        origines, destinations, poids = Graphe._tableaux(
+            dataf, colonne_noeud_depart, colonne_noeud_arrivee,
+            colonne_distance)
+        if (poids < 0).any():
+            raise ValueError("Distances non strictement positives")
+        graphe = cls()
+        for depart, arrivee, distance in zip(origines.tolist(),
+                                             destinations.tolist(),
+                                             poids.tolist()):
+            graphe.ajouter_arete(depart, arrivee, distance)
+        return graphe
+
+    def __len__(self):
+        return len(self._etiquettes)
+
+    @property
+    def nb_aretes(self):
+        """Nombre d'arêtes du graphe."""
+        return len(self._origines) - self._nb_supprimees
+
+    def _indice(self, noeud):
+        """Renvoie l'identifiant d'un noeud, en l'ajoutant s'il est
+        nouveau."""
+        i = self._indices.get(noeud)
+        if i is None:
+            i = self._indices[noeud] = len(self._etiquettes)
+            self._etiquettes.append(noeud)
+            self._sortants.append(set())
+            self._entrants.append(set())
+            self._distances.append(INFINI)
+            self._parents.append(-1)
+            self._enfants.append(set())
+        return i
+
+    def ajouter_arete(self, depart, arrivee, poids):
+        """Ajoute une arête et répare l'arbre des plus courts chemins.
+
+        Parametres
+        ----------
+        depart : any
+            Le noeud de départ de l'arête.
+        arrivee : any
+            Le noeud d'arrivée de l'arête.
+        poids : int ou float
+            Le poids positif de l'arête.
+
+        Renvoie
+        -------
+        int :
+            L'identifiant de l'arête.
+        """
+        if isinstance(poids, bool) or not isinstance(poids, numbers.Real):
+            raise TypeError("Distances non numeriques")
+        if poids < 0:
+            raise ValueError("Distances non strictement positives")
+        u, v = self._indice(depart), self._indice(arrivee)
+        arete = len(self._origines)
+        self._origines.append(u)
+        self._cibles.append(v)
+        self._poids.append(poids)
+        self._sortants[u].add(arete)
+        self._entrants[v].add(arete)
+
+        self.noeuds_repares = 0
+        if self.source is not None:
+            cout = self._distances[u] + poids
+            if self._distances[u] < INFINI and cout < self._distances[v]:
+                self._rattacher(v, arete, cout)
+                self._propager([(cout, v)])
+        return arete
+
+    def supprimer_arete(self, arete):
+        """Supprime une arête et répare l'arbre des plus courts chemins.
+
+        Parametre
+        ----------
+        arete : int
+            L'identifiant de l'arête, renvoyé par ajouter_arete.
+        """
+        if (not isinstance(arete, numbers.Integral)
+                or not 0 <= arete < len(self._origines)
+                or self._origines[arete] == -1):
+            raise ValueError(f"L'arête {arete} n'existe pas")
+        arete = int(arete)
+        u, v = self._origines[arete], self._cibles[arete]
+        self._sortants[u].discard(arete)
+        self._entrants[v].discard(arete)
+        self._origines[arete] = self._cibles[arete] = -1
+        self._nb_supprimees += 1
+
+        self.noeuds_repares = 0
+        if self.source is not None and self._parents[v] == arete:
+            self._enfants[u].discard(v)
+            self._reparer_sous_arbre(v)
+
+    def aretes(self):
+        """Renvoie les arêtes du graphe.
+
+        Renvoie
+        -------
+        dict[tuple] :
+            dictionnaire dont les clés sont les identifiants des arêtes et
+            les valeurs les triplets (départ, arrivée, poids).
+        """
+        return {arete: (self._etiquettes[u],
+                        self._etiquettes[self._cibles[arete]],
+                        self._poids[arete])
+                for arete, u in enumerate(self._origines) if u != -1}
+
+    def vers_graphe(self):
+        """Renvoie les arêtes actuelles sous la forme d'un Graphe."""
+        aretes = list(self.aretes().values())
+        if not aretes:
+            raise ValueError("Aucune arête")
+        origines, destinations, poids = (np.array(colonne) for colonne
+                                         in zip(*aretes))
+        return Graphe.depuis_aretes(origines, destinations, poids)
+
+    def fixer_source(self, source):
+        """Calcule l'arbre des plus courts chemins depuis la source, qui
+        sera ensuite réparé après chaque modification du graphe.
+
+        Parametre
+        ----------
+        source : any
+            noeud de départ nécessairement présent dans le graphe.
+        """
+        s = self._indices.get(source)
+        if s is None or not self._sortants[s]:
+            raise ValueError('Pas de trajet depuis votre point de départ')
+        self.source = source
+        for i in range(len(self)):
+            self._distances[i] = INFINI
+            self._parents[i] = -1
+            self._enfants[i].clear()
+        self._distances[s] = 0
+        self._propager([(0, s)])
+
+    def _rattacher(self, noeud, arete, cout):
+        """Donne au noeud le coût cout et l'arête parente arete."""
+        ancienne = self._parents[noeud]
+        if ancienne != -1:
+            self._enfants[self._origines[ancienne]].discard(noeud)
+        self._distances[noeud] = cout
+        self._parents[noeud] = arete
+        if arete != -1:
+            self._enfants[self._origines[arete]].add(noeud)
+
+    def _propager(self, tas, restreint=None):
+        """Parcours de Dijkstra depuis les noeuds du tas, dont le coût vient
+        de diminuer. Si restreint est donné, seuls ses noeuds peuvent voir
+        leur coût diminuer."""
+        heapq.heapify(tas)
+        while tas:
+            coefficient, selection = heapq.heappop(tas)
+            if coefficient > self._distances[selection]:
+                continue
+            self.noeuds_repares += 1
+            for arete in self._sortants[selection]:
+                noeud = self._cibles[arete]
+                cout = coefficient + self._poids[arete]
+                if (cout < self._distances[noeud]
+                        and (restreint is None or noeud in restreint)):
+                    self._rattacher(noeud, arete, cout)
+                    heapq.heappush(tas, (cout, noeud))
+
+    def _reparer_sous_arbre(self, racine):
+        """Recalcule les coûts du sous-arbre de racine, dont l'arête
+        parente vient d'être supprimée. Les coûts des autres noeuds ne
+        peuvent pas diminuer et restent valables."""
+        sous_arbre = []
+        pile = [racine]
+        while pile:
+            noeud = pile.pop()
+            sous_arbre.append(noeud)
+            pile.extend(self._enfants[noeud])
+        touches = set(sous_arbre)
+        for noeud in sous_arbre:
+            self._distances[noeud] = INFINI
+            self._parents[noeud] = -1
+            self._enfants[noeud].clear()
+
+        # Meilleur coût de chaque noeud du sous-arbre depuis un noeud
+        # extérieur, dont le coût n'a pas changé
+        tas = []
+        for noeud in sous_arbre:
+            for arete in self._entrants[noeud]:
+                amont = self._origines[arete]
+                if amont in touches or self._distances[amont] == INFINI:
+                    continue
+                cout = self._distances[amont] + self._poids[arete]
+                if cout < self._distances[noeud]:
+                    self._rattacher(noeud, arete, cout)
+            if self._distances[noeud] < INFINI:
+                tas.append((self._distances[noeud], noeud))
+        self._propager(tas, touches)
+
+    def distance(self, destination):
+        """Renvoie le coût minimal depuis la source jusqu'à la destination.
+
+        Parametre
+        ----------
+        destination : any
+            noeud d'arrivée.
+
+        Renvoie
+        -------
+        int ou float :
+            le coût minimal, ou INFINI si la destination n'est pas
+            atteignable.
+        """
+        if self.source is None:
+            raise ValueError("Aucune source n'a été fixée")
+        i = self._indices.get(destination)
+        return INFINI if i is None else self._distances[i]
+
+    def chemin_destination(self, destination):
+        """Renvoie le plus court chemin depuis la source jusqu'à la
+        destination, lu dans l'arbre des plus courts chemins.
+
+        Parametre
+        ----------
+        destination : any
+            noeud d'arrivée.
+
+        Renvoie
+        -------
+        list :
+            liste comportant le plus court chemin et son coût, comme
+            Dijkstra.chemin_destination.
+        """
+        cout = self.distance(destination)
+        if cout == INFINI:
+            raise ValueError('Pas de trajet')
+        noeud = self._indices[destination]
+        parcours = [noeud]
+        while self._parents[noeud] != -1:
+            noeud = self._origines[self._parents[noeud]]
+            parcours.append(noeud)
+        return [[self._etiquettes[i] for i in reversed(parcours)], cout]
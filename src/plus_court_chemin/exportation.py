@@ -1,7 +1,13 @@
 """Exportation des données"""
 
+import gzip
+import itertools
+
 import pandas as pd
 
+# Formats pouvant être écrits morceau par morceau
+FORMATS_FLUX = ("csv", "csv.gz", "csv.zst", "jsonl", "parquet")
+
 
 class Exportation:
     """Exportation des données.
@@ -11,28 +17,46 @@ class Exportation:
 
     Parameters
     ----------
-    dataframe : pandas.core.frame.DataFrame
-        DataFrame correspondant au fichier de données déjà traité
+    dataframe : pandas.core.frame.DataFrame ou itérable de DataFrame
+        DataFrame correspondant au fichier de données déjà traité, ou
+        morceaux successifs de ce DataFrame (par exemple produits par un
+        générateur) : ils sont alors écrits un par un, sans jamais
+        construire le DataFrame complet
 
     chemin : Chemin du fichier
         Chemin du fichier après exportation
 
-    format : Fichier csv, xlsx, xls ou json
-        Format souhaité pour le fichier exporté
+    format : Fichier csv, csv.gz, csv.zst, xlsx, xls, json, jsonl ou parquet
+        Format souhaité pour le fichier exporté. Les formats csv.gz et
+        csv.zst sont des csv compressés par gzip et zstandard, jsonl écrit
+        une ligne json par ligne du DataFrame. csv.zst nécessite le module
+        zstandard et parquet le module pyarrow.
+
+    colonnes : list
+        Colonnes écrites en en-tête (ou schéma parquet) d'une exportation
+        par morceaux ne produisant aucun morceau (par défaut : None, aucune
+        colonne)
     """
 
-    def __init__(self, dataframe, chemin, format):
+    def __init__(self, dataframe, chemin, format, colonnes=None):
         self.dataframe = dataframe
         self.chemin = chemin
         self.format = format
+        self.colonnes = colonnes
 
-    def export(self, sep):
+    def export(self, sep=";"):
         """Permet d'exporter un fichier.
 
         La fonction export permet d'exporter un fichier csv, excel (xls ou
         xlsx) ou json initialement sous forme de DataFrame pandas. Elle
         vérifiera que le format voulu existe et puisse être créé à
-        partir d'un DataFrame pandas.
+        partir d'un DataFrame pandas. Les formats csv, csv.gz, csv.zst,
+        jsonl et parquet peuvent aussi être écrits à partir de morceaux.
+
+        Parameters
+        ----------
+        sep : str
+            Séparateur des colonnes des formats csv (par défaut : ";")
 
         Returns
         -------
@@ -45,6 +69,9 @@ class Exportation:
         >>> print(dataframe.export(";"))
         None
         """
+        if not isinstance(self.dataframe, pd.DataFrame):
+            return self._export_morceaux(self.dataframe, sep)
+
         match self.format:
             case "csv":
                 return self.dataframe.to_csv(self.chemin, sep)
@@ -58,9 +85,89 @@ class Exportation:
             case "json":
                 return self.dataframe.to_json(self.chemin)
 
+            case "csv.gz" | "csv.zst" | "jsonl" | "parquet":
+                return self._export_morceaux([self.dataframe], sep)
+
             case _:
                 raise TypeError("Format d'exportation indisponible")
 
+    def _ouvrir(self):
+        """Ouvre le fichier exporté en écriture texte, compressé si le
+        format le demande."""
+        match self.format:
+            case "csv.gz":
+                # Niveau par défaut de l'outil gzip : deux fois plus rapide
+                # que le niveau 9 pour un fichier à peine plus gros
+                return gzip.open(self.chemin, "wt", compresslevel=6,
+                                 encoding="utf-8", newline="")
+            case "csv.zst":
+                try:
+                    import zstandard
+                except ImportError as erreur:
+                    raise ImportError("Le format csv.zst nécessite le "
+                                      "module zstandard") from erreur
+                return zstandard.open(self.chemin, "wt", encoding="utf-8",
+                                      newline="")
+            case _:
+                return open(self.chemin, "w", encoding="utf-8", newline="")
+
+    def _export_morceaux(self, morceaux, sep):
+        """Écrit les morceaux un par un : seul le morceau courant est en
+        mémoire.
+
+        Le fichier obtenu est identique à l'exportation de la
+        concaténation des morceaux (index compris pour les csv ; l'index
+        n'est pas écrit pour jsonl et parquet). Sans aucun morceau, le
+        fichier est écrit pour un DataFrame vide de colonnes colonnes :
+        en-tête seul ou fichier parquet sans ligne.
+        """
+        if self.format not in FORMATS_FLUX:
+            raise TypeError("Format d'exportation indisponible par morceaux")
+        morceaux = iter(morceaux)
+        premier = next(morceaux, None)
+        if premier is None:
+            premier = pd.DataFrame(columns=self.colonnes)
+        morceaux = itertools.chain([premier], morceaux)
+        if self.format == "parquet":
+            return self._export_parquet(morceaux)
+        with self._ouvrir() as fichier:
+            premier = True
+            for morceau in morceaux:
+                if self.format == "jsonl":
+                    if len(morceau):
+                        morceau.to_json(fichier, orient="records",
+                                        lines=True, force_ascii=False)
+                else:
+                    # L'en-tête n'est écrit qu'avant le premier morceau
+                    morceau.to_csv(fichier, sep=sep, header=premier)
+                premier = False
+        return None
+
+    def _export_parquet(self, morceaux):
+        """Écrit les morceaux comme groupes de lignes successifs d'un
+        fichier parquet, tous au schéma du premier morceau."""
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as erreur:
+            raise ImportError("Le format parquet nécessite le module "
+                              "pyarrow") from erreur
+        ecrivain = None
+        schema = None
+        try:
+            for morceau in morceaux:
+                table = pyarrow.Table.from_pandas(morceau, schema=schema,
+                                                  preserve_index=False)
+                if ecrivain is None:
+                    schema = table.schema
+                    ecrivain = pyarrow.parquet.ParquetWriter(self.chemin,
+                                                             schema)
+                ecrivain.write_table(table)
+        finally:
+            if ecrivain is not None:
+                ecrivain.close()
+        return None
+
 
 if __name__ == "__main__":
     import doctest
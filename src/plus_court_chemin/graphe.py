@@ -0,0 +1,384 @@
+"""Représentation compacte d'un graphe orienté pondéré sous forme de
+tableaux NumPy (format CSR)."""
+
+import hashlib
+from collections.abc import Mapping
+
+import numpy as np
+
+
+def _concatener(tableaux):
+    """Concatène des tableaux d'étiquettes de noeuds.
+
+    Des tableaux de textes et de nombres sont concaténés en un tableau
+    d'objets : numpy convertirait sinon les nombres en textes.
+    """
+    types = {tableau.dtype.kind for tableau in tableaux}
+    if len(types) > 1 and types & set("SUO"):
+        return np.concatenate(tableaux, dtype=object)
+    return np.concatenate(tableaux)
+
+
+class Graphe:
+    """Graphe orienté pondéré stocké au format CSR.
+
+    Les noeuds sont identifiés par un entier dense compris entre 0 et
+    le nombre de noeuds - 1, attribué dans l'ordre croissant de leurs
+    étiquettes (par exemple les codes UIC). Les arêtes partant du noeud
+    i sont les arêtes d'indice offsets[i] à offsets[i + 1] - 1 des
+    tableaux cibles et poids.
+
+    Parametres
+    ----------
+    noeuds : numpy.ndarray
+        Les étiquettes des noeuds, la position de chacune étant
+        l'identifiant du noeud.
+    offsets : numpy.ndarray
+        Tableau de taille nombre de noeuds + 1 donnant le début des
+        arêtes de chaque noeud.
+    cibles : numpy.ndarray
+        Identifiant du noeud d'arrivée de chaque arête.
+    poids : numpy.ndarray
+        Poids de chaque arête.
+    ordre : numpy.ndarray
+        Indice, dans la table d'origine, de la ligne ayant donné chaque
+        arête (par défaut : l'ordre des arêtes).
+    """
+
+    def __init__(self, noeuds, offsets, cibles, poids, ordre=None):
+        if len(offsets) != len(noeuds) + 1:
+            raise ValueError("offsets doit contenir un élément de plus "
+                             "que noeuds")
+        if len(cibles) != len(poids):
+            raise ValueError("cibles et poids doivent avoir la même taille")
+        self.noeuds = noeuds
+        self.offsets = offsets
+        self.cibles = cibles
+        self.poids = poids
+        self.ordre = np.arange(len(cibles)) if ordre is None else ordre
+        self._indices = None
+        self._listes = None
+        self._entrants = None
+        self._dict = None
+        self._inverse = None
+
+    @classmethod
+    def depuis_dataframe(cls, dataf, colonne_noeud_depart,
+                         colonne_noeud_arrivee, colonne_distance):
+        """Construit le graphe à partir d'une table d'arêtes.
+
+        Les valeurs de la table sont validées de façon vectorisée avant
+        la construction.
+
+        Parametres
+        ----------
+        dataf : pandas.DataFrame or dict
+            Le dataframe contenant les données du graphe, ou un
+            dictionnaire associant à chaque nom de colonne une liste ou un
+            tableau NumPy (pandas n'est alors pas nécessaire).
+        colonne_noeud_depart : str
+            Le nom de la colonne contenant les nœuds de départ.
+        colonne_noeud_arrivee : str
+            Le nom de la colonne contenant les nœuds d'arrivée.
+        colonne_distance : str
+            Le nom de la colonne contenant les distances entre les nœuds.
+
+        Renvoie
+        -------
+        Graphe :
+            Le graphe construit.
+        """
+        return cls.depuis_aretes(*cls._tableaux(
+            dataf, colonne_noeud_depart, colonne_noeud_arrivee,
+            colonne_distance))
+
+    @classmethod
+    def depuis_morceaux(cls, morceaux, colonne_noeud_depart,
+                        colonne_noeud_arrivee, colonne_distance):
+        """Construit le graphe à partir d'une table d'arêtes lue par
+        morceaux, par exemple avec Importation.lecture_par_morceaux.
+
+        Seules les trois colonnes utiles de chaque morceau sont conservées
+        jusqu'à la construction du graphe.
+
+        Parametres
+        ----------
+        morceaux : iterable[pandas.DataFrame]
+            Les morceaux de la table des arêtes.
+        colonne_noeud_depart : str
+            Le nom de la colonne contenant les nœuds de départ.
+        colonne_noeud_arrivee : str
+            Le nom de la colonne contenant les nœuds d'arrivée.
+        colonne_distance : str
+            Le nom de la colonne contenant les distances entre les nœuds.
+
+        Renvoie
+        -------
+        Graphe :
+            Le graphe construit.
+        """
+        origines, destinations, poids = [], [], []
+        for morceau in morceaux:
+            tableaux = cls._tableaux(morceau, colonne_noeud_depart,
+                                     colonne_noeud_arrivee, colonne_distance)
+            origines.append(tableaux[0])
+            destinations.append(tableaux[1])
+            poids.append(tableaux[2])
+        if not origines:
+            raise ValueError("Aucune arête")
+        return cls.depuis_aretes(_concatener(origines),
+                                 _concatener(destinations),
+                                 np.concatenate(poids))
+
+    @staticmethod
+    def _tableaux(dataf, colonne_noeud_depart, colonne_noeud_arrivee,
+                  colonne_distance):
+        """Valide une table d'arêtes et renvoie ses trois colonnes utiles
+        sous forme de tableaux."""
+        if isinstance(dataf, Mapping):
+            return Graphe._tableaux_colonnes(dataf[colonne_noeud_depart],
+                                             dataf[colonne_noeud_arrivee],
+                                             dataf[colonne_distance])
+        # Une table pandas a été donnée : pandas est déjà importé
+        import pandas as pd
+        if dataf[colonne_noeud_depart].isna().any():
+            raise ValueError("Valeurs manquantes")
+        if dataf[colonne_noeud_arrivee].isna().any():
+            raise ValueError("Valeurs manquantes")
+        distances = dataf[colonne_distance]
+        if distances.isna().any():
+            raise ValueError("Valeurs manquantes")
+        if not pd.api.types.is_numeric_dtype(distances):
+            # Colonne de type objet : acceptée si toutes ses valeurs
+            # sont des nombres
+            if pd.api.types.infer_dtype(distances, skipna=False) not in (
+                    "integer", "floating", "mixed-integer-float", "boolean"):
+                raise TypeError("Distances non numeriques")
+            distances = pd.to_numeric(distances)
+        return (dataf[colonne_noeud_depart].to_numpy(),
+                dataf[colonne_noeud_arrivee].to_numpy(),
+                distances.to_numpy())
+
+    @staticmethod
+    def _tableaux_colonnes(origines, destinations, distances):
+        """Valide des colonnes données sous forme de listes ou de tableaux
+        NumPy, avec les mêmes règles que pour une table pandas, et les
+        renvoie sous forme de tableaux."""
+        colonnes = []
+        for noeuds in (origines, destinations):
+            valeurs = noeuds
+            noeuds = np.asarray(noeuds)
+            if (noeuds.dtype.kind in "SU"
+                    and not isinstance(valeurs, np.ndarray)
+                    and not all(isinstance(valeur, (str, bytes))
+                                for valeur in valeurs)):
+                # Étiquettes de types mélangés (nombres et textes) : chacune
+                # garde son type Python, comme dans une table pandas
+                noeuds = np.empty(len(valeurs), dtype=object)
+                noeuds[:] = list(valeurs)
+            if noeuds.ndim != 1:
+                raise ValueError("Les colonnes doivent être à une dimension")
+            if noeuds.dtype.kind == "f":
+                manquant = np.isnan(noeuds).any()
+            else:
+                manquant = noeuds.dtype == object and any(
+                    noeud is None or noeud != noeud
+                    for noeud in noeuds.tolist())
+            if manquant:
+                raise ValueError("Valeurs manquantes")
+            colonnes.append(noeuds)
+        distances = np.asarray(distances)
+        if distances.dtype == object:
+            valeurs = distances.tolist()
+            if any(valeur is None for valeur in valeurs):
+                raise ValueError("Valeurs manquantes")
+            # Colonne de type objet : acceptée si toutes ses valeurs
+            # sont des nombres
+            if not all(isinstance(valeur, (int, float, np.number))
+                       for valeur in valeurs):
+                raise TypeError("Distances non numeriques")
+            distances = np.array(valeurs)
+        if distances.dtype.kind not in "biuf":
+            raise TypeError("Distances non numeriques")
+        if distances.dtype.kind == "f" and np.isnan(distances).any():
+            raise ValueError("Valeurs manquantes")
+        if not len(colonnes[0]) == len(colonnes[1]) == len(distances):
+            raise ValueError("Les colonnes doivent avoir la même taille")
+        return colonnes[0], colonnes[1], distances
+
+    @classmethod
+    def depuis_aretes(cls, origines, destinations, poids):
+        """Construit le graphe à partir des tableaux d'arêtes.
+
+        Parametres
+        ----------
+        origines : numpy.ndarray
+            Noeud de départ de chaque arête.
+        destinations : numpy.ndarray
+            Noeud d'arrivée de chaque arête.
+        poids : numpy.ndarray
+            Poids positif de chaque arête.
+
+        Renvoie
+        -------
+        Graphe :
+            Le graphe construit.
+        """
+        if np.any(poids < 0):
+            raise ValueError("Distances non strictement positives")
+        if poids.dtype == bool:
+            poids = poids.astype(np.int64)
+        nb_aretes = len(origines)
+        etiquettes = _concatener([origines, destinations])
+        try:
+            noeuds, identifiants = np.unique(etiquettes, return_inverse=True)
+        except TypeError:
+            # Étiquettes non comparables entre elles : ordre d'apparition
+            uniques = dict.fromkeys(etiquettes.tolist())
+            noeuds = np.empty(len(uniques), dtype=object)
+            noeuds[:] = list(uniques)
+            indices = {noeud: i for i, noeud in enumerate(uniques)}
+            identifiants = np.fromiter(
+                (indices[noeud] for noeud in etiquettes.tolist()),
+                dtype=np.int64, count=len(etiquettes))
+        identifiants = identifiants.reshape(-1)
+        sources = identifiants[:nb_aretes]
+        ordre = np.argsort(sources, kind="stable")
+        offsets = np.zeros(len(noeuds) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=len(noeuds)),
+                  out=offsets[1:])
+        return cls(noeuds, offsets,
+                   identifiants[nb_aretes:][ordre].astype(np.int32),
+                   poids[ordre], ordre)
+
+    def __len__(self):
+        return len(self.noeuds)
+
+    def __getstate__(self):
+        # Seuls les tableaux sont transmis (par exemple à un autre
+        # processus) : les structures dérivées sont recalculées au besoin
+        etat = self.__dict__.copy()
+        for attribut in ("_indices", "_listes", "_entrants", "_dict",
+                         "_inverse"):
+            etat[attribut] = None
+        return etat
+
+    def __contains__(self, noeud):
+        return self.indice(noeud) is not None
+
+    @property
+    def nb_aretes(self):
+        """Nombre d'arêtes du graphe."""
+        return len(self.cibles)
+
+    def indice(self, noeud):
+        """Renvoie l'identifiant dense d'un noeud ou None s'il est absent."""
+        if self._indices is None:
+            self._indices = {etiquette: i for i, etiquette
+                             in enumerate(self.noeuds.tolist())}
+        return self._indices.get(noeud)
+
+    def est_origine(self, noeud):
+        """Indique si au moins une arête part du noeud."""
+        i = self.indice(noeud)
+        return i is not None and self.offsets[i + 1] > self.offsets[i]
+
+    def est_destination(self, noeud):
+        """Indique si au moins une arête arrive au noeud."""
+        i = self.indice(noeud)
+        if i is None:
+            return False
+        if self._entrants is None:
+            self._entrants = np.bincount(self.cibles, minlength=len(self))
+        return self._entrants[i] > 0
+
+    def empreinte(self):
+        """Renvoie une empreinte du graphe (noeuds, arêtes et poids),
+        permettant de vérifier qu'un résultat précalculé lui correspond."""
+        empreinte = hashlib.sha1(repr(self.noeuds.tolist()).encode())
+        for tableau in (self.offsets.astype(np.int64),
+                        self.cibles.astype(np.int64),
+                        self.poids.astype(np.float64)):
+            empreinte.update(np.ascontiguousarray(tableau).tobytes())
+        return empreinte.hexdigest()
+
+    def origines(self):
+        """Renvoie l'identifiant du noeud de départ de chaque arête."""
+        return np.repeat(np.arange(len(self), dtype=np.int32),
+                         np.diff(self.offsets))
+
+    def inverse(self):
+        """Renvoie le graphe inverse, dont toutes les arêtes sont
+        retournées.
+
+        Les noeuds conservent les mêmes identifiants. Le graphe inverse
+        est calculé une seule fois puis conservé.
+
+        Renvoie
+        -------
+        Graphe :
+            Le graphe inverse.
+        """
+        if self._inverse is None:
+            ordre = np.argsort(self.cibles, kind="stable")
+            offsets = np.zeros(len(self) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self.cibles, minlength=len(self)),
+                      out=offsets[1:])
+            self._inverse = Graphe(self.noeuds, offsets,
+                                   self.origines()[ordre],
+                                   self.poids[ordre], self.ordre[ordre])
+            self._inverse._indices = self._indices
+        return self._inverse
+
+    def listes(self):
+        """Renvoie les tableaux du graphe sous forme de listes Python.
+
+        L'accès élément par élément à une liste est bien plus rapide qu'à
+        un tableau NumPy : ce sont ces listes, calculées une seule fois,
+        que parcourent les boucles de recherche.
+
+        Renvoie
+        -------
+        tuple[list] :
+            Les listes (offsets, cibles, poids).
+        """
+        if self._listes is None:
+            self._listes = (self.offsets.tolist(), self.cibles.tolist(),
+                            self.poids.tolist())
+        return self._listes
+
+    def preparer(self):
+        """Calcule à l'avance les structures dérivées utilisées par les
+        recherches (index des noeuds, listes et arêtes entrantes).
+
+        Utile avant de créer des processus par fork : ils héritent de ces
+        structures au lieu de les recalculer chacun. Les listes et l'index
+        sont des objets Python, copiés peu à peu dans chaque processus qui
+        les parcourt ; seuls les tableaux NumPy restent partagés.
+        """
+        self.listes()
+        if self._indices is None:
+            self._indices = {etiquette: i for i, etiquette
+                             in enumerate(self.noeuds.tolist())}
+        if self._entrants is None:
+            self._entrants = np.bincount(self.cibles, minlength=len(self))
+
+    def vers_dict(self):
+        """Renvoie le graphe sous la forme d'un dictionnaire d'adjacence.
+
+        Renvoie
+        -------
+        dict[list] :
+            dictionnaire dont les clés sont les noeuds ayant au moins une
+            arête sortante et les valeurs la liste des couples
+            (voisin, distance).
+        """
+        if self._dict is None:
+            offsets, cibles, poids = self.listes()
+            noeuds = self.noeuds.tolist()
+            self._dict = {
+                noeuds[i]: [(noeuds[cibles[j]], poids[j])
+                            for j in range(offsets[i], offsets[i + 1])]
+                for i in range(len(noeuds)) if offsets[i + 1] > offsets[i]
+            }
+        return self._dict
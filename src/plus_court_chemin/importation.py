@@ -1,7 +1,21 @@
 """Importation des données"""
 
+import glob
+import hashlib
+import os
+import pickle
+import tempfile
+
+import numpy as np
 import pandas as pd
 
+from .chronometre import chronometre
+
+# Avant pandas 2.2, pandas.merge regroupe par clef les lignes d'une fusion
+# "inner" au lieu de conserver l'ordre du premier DataFrame
+_REGROUPEMENT_INNER = tuple(
+    int(partie) for partie in pd.__version__.split(".")[:2]) < (2, 2)
+
 
 class Importation:
     """Importation des données.
@@ -17,19 +31,108 @@ class Importation:
     sep : str
         Séparateur des colonnes dans le fichier
         initial (par défaut : ";")
+
+    cache : str
+        Dossier où conserver le fichier une fois lu, dans un format
+        binaire rapide à relire : Parquet si pyarrow est installé, pickle
+        sinon (par défaut : None, pas de cache). Le cache est invalidé
+        dès que le fichier d'origine est modifié.
+
+    colonnes : list[str]
+        Colonnes à importer, dans l'ordre voulu (par défaut : None, toutes
+        les colonnes). Les autres colonnes ne sont pas analysées.
+
+    types : dict
+        Type de certaines colonnes, par exemple {"Prix": "float64"}
+        (par défaut : None, types déduits des données)
     """
 
-    def __init__(self, chemin_fichier, sep=";"):
+    def __init__(self, chemin_fichier, sep=";", cache=None, colonnes=None,
+                 types=None):
         self.chemin_fichier = chemin_fichier
         self.sep = sep
+        self.cache = cache
+        self.colonnes = None if colonnes is None else list(colonnes)
+        self.types = types
+        self._data = None
+        self._version = None
+        self._index_clefs = {}
+
+    def _clef_cache(self):
+        """Renvoie le préfixe des fichiers de cache du fichier importé, le
+        préfixe de ceux de sa version actuelle (date de modification et
+        taille du fichier) et le nom complet de son fichier de cache, qui
+        dépend aussi du séparateur, des colonnes et des types demandés."""
+        chemin = os.path.abspath(self.chemin_fichier)
+        etat = os.stat(chemin)
+        source = hashlib.sha1(chemin.encode()).hexdigest()[:16]
+        version = hashlib.sha1(repr(
+            (etat.st_mtime_ns, etat.st_size)).encode()).hexdigest()[:16]
+        projection = hashlib.sha1(repr(
+            (self.sep, self.colonnes, self.types)).encode()).hexdigest()[:16]
+        prefixe = os.path.join(
+            self.cache, f"{os.path.basename(chemin)}-{source}-")
+        actuel = f"{prefixe}{version}-"
+        return prefixe, actuel, actuel + projection
 
+    def _lire_cache(self, nom):
+        """Relit le DataFrame conservé en cache, ou renvoie None s'il est
+        absent ou illisible."""
+        for extension, lire in ((".parquet", pd.read_parquet),
+                                (".pkl", pd.read_pickle)):
+            if os.path.exists(nom + extension):
+                try:
+                    return lire(nom + extension)
+                except Exception:
+                    return None
+        return None
+
+    def _ecrire_cache(self, prefixe, actuel, nom, data):
+        """Conserve le DataFrame en cache et supprime les fichiers de cache
+        des versions précédentes du même fichier ; ceux des autres
+        colonnes et types de sa version actuelle sont conservés."""
+        os.makedirs(self.cache, exist_ok=True)
+        for ancien in glob.glob(glob.escape(prefixe) + "*"):
+            if not ancien.startswith(actuel):
+                try:
+                    os.remove(ancien)
+                except FileNotFoundError:  # supprimé par un autre processus
+                    pass
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:  # le cache est alors enregistré au format pickle
+            pyarrow = None
+        descripteur, temporaire = tempfile.mkstemp(dir=self.cache)
+        os.close(descripteur)
+        extension = ".pkl"
+        try:
+            if pyarrow is not None:
+                try:
+                    data.to_parquet(temporaire)
+                    extension = ".parquet"
+                except Exception:
+                    # Colonnes de types mélangés : non représentables en
+                    # Parquet
+                    pass
+            if extension == ".pkl":
+                data.to_pickle(temporaire, protocol=pickle.HIGHEST_PROTOCOL)
+            # Écriture atomique : un autre processus ne lit jamais un
+            # fichier de cache incomplet
+            os.replace(temporaire, nom + extension)
+        finally:
+            if os.path.exists(temporaire):
+                os.remove(temporaire)
+
+    @chronometre("importation.lecture")
     def lecture(self):
         """Permet d'importer un fichier.
 
         La fonction lecture permet d'importer un fichier csv, excel
         (xls ou xlsx) ou json sous forme de DataFrame pandas. Elle
         vérifiera que le fichier à importer a une extension valable
-        et le format correspondant.
+        et le format correspondant. Si un dossier de cache a été donné,
+        le fichier n'est analysé qu'une seule fois tant qu'il n'est pas
+        modifié.
 
 
         Returns
@@ -43,11 +146,79 @@ class Importation:
         >>> print(trajets_sncf.lecture().iat[0,2])
         87784793
         """
+        if self.cache is None:
+            return self._lire()
+        prefixe, actuel, nom = self._clef_cache()
+        data = self._lire_cache(nom)
+        if data is None:
+            data = self._lire()
+            self._ecrire_cache(prefixe, actuel, nom, data)
+        return data
+
+    def donnees(self):
+        """Renvoie le DataFrame du fichier, lu une seule fois tant que le
+        fichier n'est pas modifié.
+
+        Contrairement à lecture, le même DataFrame est renvoyé à chaque
+        appel : il ne doit pas être modifié.
+
+        Returns
+        -------
+        pandas.core.frame.DataFrame
+        DataFrame pandas contenant toutes les données du fichier importé.
+        """
+        etat = os.stat(self.chemin_fichier)
+        version = (etat.st_mtime_ns, etat.st_size)
+        if self._data is None or version != self._version:
+            self._data = self.lecture()
+            self._version = version
+            self._index_clefs = {}
+        return self._data
+
+    def index_clef(self, clef):
+        """Renvoie l'index des valeurs d'une colonne du fichier, construit
+        une seule fois puis conservé.
+
+        Parameters
+        ----------
+        clef : str
+            Nom de la colonne
 
+        Returns
+        -------
+        tuple
+        Index des valeurs distinctes de la colonne, numéros des lignes
+        regroupés par valeur et début du groupe de chaque valeur
+        (voir _indexer).
+        """
+        data = self.donnees()
+        index = self._index_clefs.get(clef)
+        if index is None:
+            index = self._index_clefs[clef] = self._indexer(data[clef])
+        return index
+
+    @staticmethod
+    def _indexer(valeurs):
+        """Regroupe les lignes par valeur de clef.
+
+        Les lignes de la valeur distincte i sont les lignes
+        lignes[debuts[i]:debuts[i + 1]], dans l'ordre du fichier.
+        """
+        codes, distinctes = pd.factorize(valeurs, use_na_sentinel=False)
+        lignes = np.argsort(codes, kind="stable")
+        debuts = np.zeros(len(distinctes) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codes, minlength=len(distinctes)),
+                  out=debuts[1:])
+        return pd.Index(distinctes), lignes, debuts
+
+    def _lire(self):
+        """Analyse le fichier selon son extension."""
         match self.chemin_fichier[-4:]:
             case ".csv":
                 try:
-                    data = pd.read_csv(self.chemin_fichier, sep=self.sep)
+                    data = pd.read_csv(self.chemin_fichier, sep=self.sep,
+                                       usecols=self.colonnes,
+                                       dtype=self.types)
                 except Exception as exception:
                     print(
                         """Le nom de l'extension du fichier ne correspond pas
@@ -57,7 +228,9 @@ class Importation:
 
             case "xlsx":
                 try:
-                    data = pd.read_excel(self.chemin_fichier)
+                    data = pd.read_excel(self.chemin_fichier,
+                                         usecols=self.colonnes,
+                                         dtype=self.types)
                 except Exception as exception:
                     print(
                         """Le nom de l'extension du fichier ne correspond pas
@@ -67,7 +240,9 @@ class Importation:
 
             case ".xls":
                 try:
-                    data = pd.read_excel(self.chemin_fichier)
+                    data = pd.read_excel(self.chemin_fichier,
+                                         usecols=self.colonnes,
+                                         dtype=self.types)
                 except Exception as exception:
                     print(
                         """Le nom de l'extension du fichier ne correspond pas
@@ -77,7 +252,8 @@ class Importation:
 
             case "json":
                 try:
-                    data = pd.read_json(self.chemin_fichier)
+                    data = pd.read_json(self.chemin_fichier,
+                                        dtype=self.types)
                 except Exception as exception:
                     print(
                         """Le nom de l'extension du fichier ne correspond pas
@@ -88,8 +264,55 @@ class Importation:
             case _:
                 raise TypeError("Mauvaise extension")
 
-        return data
+        return self._projeter(data)
+
+    def _projeter(self, data):
+        """Ne garde que les colonnes demandées, dans l'ordre demandé."""
+        if self.colonnes is None:
+            return data
+        return data[self.colonnes]
+
+    def lecture_par_morceaux(self, taille=100_000):
+        """Permet d'importer un fichier par morceaux.
+
+        Les fichiers csv sont lus morceau par morceau : seul le morceau
+        courant est en mémoire, ce qui permet de filtrer de très grands
+        fichiers. Les autres formats sont lus entièrement puis découpés.
+        Les colonnes et types demandés sont appliqués à chaque morceau.
+
+        Parameters
+        ----------
+        taille : int
+            Nombre de lignes de chaque morceau (par défaut : 100000)
+
+        Yields
+        ------
+        pandas.core.frame.DataFrame
+        DataFrame pandas contenant au plus taille lignes du fichier.
+
+        Examples
+        --------
+        >>> aeroports = Importation("././data/air_routes_edges.csv", ",")
+        >>> routes = pd.concat(morceau[morceau["label"] == "route"] for
+        ...                    morceau in aeroports.lecture_par_morceaux(10000))
+        >>> print(routes.iat[0, 2])
+        3
+        """
+        if not isinstance(taille, int) or taille < 1:
+            raise ValueError("La taille des morceaux doit être un entier "
+                             "strictement positif")
+        if self.chemin_fichier[-4:] != ".csv":
+            data = self.lecture()
+            for debut in range(0, len(data), taille):
+                yield data.iloc[debut:debut + taille]
+            return
+        with pd.read_csv(self.chemin_fichier, sep=self.sep,
+                         usecols=self.colonnes, dtype=self.types,
+                         chunksize=taille) as lecteur:
+            for morceau in lecteur:
+                yield self._projeter(morceau)
 
+    @chronometre("importation.fusion")
     def fusion(self, clef1, clef2, type_fusion, fichier2):
         """Permet de fusionner 2 fichiers.
 
@@ -99,6 +322,13 @@ class Importation:
         Elle vérifiera que les clefs permettant de fusionner
         les 2 fichiers existent.
 
+        Les fichiers ne sont lus qu'une seule fois (voir donnees). Pour une
+        fusion "inner" ou "left", chaque ligne du premier fichier est
+        associée à ses lignes du second par une seule recherche dans
+        l'index conservé de la clef du second fichier : les fusions
+        répétées avec un même référentiel sont ainsi bien plus rapides.
+        Les autres cas sont confiés à pandas.merge.
+
         Parameters
         ----------
         clef1 : str
@@ -113,8 +343,8 @@ class Importation:
             Type de fusion entre les deux fichiers ("inner", "outer",
             "left", "right" ou "cross")
 
-        fichier2 : Importation
-            Fichier à fusionner avec le premier
+        fichier2 : Importation ou pandas.core.frame.DataFrame
+            Fichier, ou données déjà chargées, à fusionner avec le premier
 
         Returns
         -------
@@ -131,8 +361,11 @@ class Importation:
         """
         if clef2 is None:
             clef2 = clef1
-        dataframe1 = self.lecture()
-        dataframe2 = fichier2.lecture()
+        dataframe1 = self.donnees()
+        if isinstance(fichier2, pd.DataFrame):
+            dataframe2 = fichier2
+        else:
+            dataframe2 = fichier2.donnees()
         if not isinstance(clef1, str):
             raise TypeError("""La clef doit correspondre au nom d'une colonne
             du fichier 1.""")
@@ -142,9 +375,66 @@ class Importation:
         if clef1 not in dataframe1.columns or clef2 not in dataframe2.columns:
             raise ValueError("""Les clefs de fusion doivent être des colonnes
             des fichiers.""")
+        communes = set(dataframe1.columns) & set(dataframe2.columns)
+        if clef1 == clef2:
+            communes.discard(clef1)
+        # Clefs de types différents : pandas.merge les convertit ou lève
+        # une erreur
+        if (type_fusion in ("inner", "left") and not communes
+                and len(dataframe1)
+                and dataframe1[clef1].dtype == dataframe2[clef2].dtype):
+            if isinstance(fichier2, pd.DataFrame):
+                index = self._indexer(dataframe2[clef2])
+            else:
+                index = fichier2.index_clef(clef2)
+            return self._fusion_indexee(dataframe1, dataframe2, clef1,
+                                        clef2, type_fusion, index)
         return pd.merge(dataframe1, dataframe2, left_on=clef1,
                         right_on=clef2, how=type_fusion)
 
+    @staticmethod
+    def _fusion_indexee(dataframe1, dataframe2, clef1, clef2, type_fusion,
+                        index):
+        """Fusionne en associant chaque ligne de dataframe1 aux lignes de
+        dataframe2 de même clef, trouvées dans l'index de ses clefs.
+
+        Les lignes sont dans l'ordre de pandas.merge : celui de dataframe1,
+        ou, pour une fusion "inner" avant pandas 2.2, regroupées par clef
+        dans l'ordre de première apparition des clefs dans dataframe1.
+        """
+        distinctes, lignes, debuts = index
+        groupes = distinctes.get_indexer(dataframe1[clef1])
+        ordre = np.arange(len(dataframe1))
+        if type_fusion == "inner" and _REGROUPEMENT_INNER:
+            ordre = np.argsort(pd.factorize(groupes)[0], kind="stable")
+            groupes = groupes[ordre]
+        trouvees = groupes >= 0
+        premieres = np.where(trouvees, debuts[groupes], 0)
+        nombres = np.where(trouvees, debuts[groupes + 1] - premieres, 0)
+        if type_fusion == "left":
+            # Une ligne sans correspondance est conservée une fois
+            repetitions = np.maximum(nombres, 1)
+        else:
+            repetitions = nombres
+        gauche = np.repeat(ordre, repetitions)
+        rangs = np.arange(len(gauche)) - np.repeat(
+            np.cumsum(repetitions) - repetitions, repetitions)
+        associees = np.repeat(trouvees, repetitions)
+        positions = np.full(len(gauche), -1, dtype=np.int64)
+        positions[associees] = lignes[
+            (np.repeat(premieres, repetitions) + rangs)[associees]]
+        if clef1 == clef2:
+            dataframe2 = dataframe2.drop(columns=clef2)
+        if associees.all():
+            droite = dataframe2.take(positions)
+        else:
+            # Une position -1 (clef absente) donne une ligne de valeurs
+            # manquantes, comme pour pandas.merge
+            droite = dataframe2.reset_index(drop=True).reindex(positions)
+        gauche = dataframe1.take(gauche)
+        gauche.index = droite.index = pd.RangeIndex(len(gauche))
+        return pd.concat([gauche, droite], axis=1, copy=False)
+
 
 if __name__ == "__main__":
     import doctest
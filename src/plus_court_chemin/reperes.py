@@ -0,0 +1,193 @@
+"""Recherche du plus court chemin guidée par des points de repère
+(algorithme ALT : A*, Landmarks et inégalité Triangulaire)."""
+
+import heapq
+
+import numpy as np
+
+from .dijkstra import INFINI, _parcours_tas, _remonter
+
+
+def _distances(graphe, source):
+    """Renvoie les coûts minimaux depuis la source sous forme de tableau,
+    les noeuds non atteignables ayant un coût infini."""
+    distances = np.array(_parcours_tas(graphe, source)[0], dtype=np.float64)
+    distances[distances == INFINI] = np.inf
+    return distances
+
+
+class Reperes:
+    """Points de repère pour accélérer les recherches point à point.
+
+    Le prétraitement choisit des noeuds repères éloignés les uns des
+    autres et calcule, pour chacun, le coût minimal depuis le repère vers
+    tous les noeuds (tableau avant) et depuis tous les noeuds vers le
+    repère (tableau arrière). Par inégalité triangulaire, ces coûts
+    donnent une borne inférieure du coût restant jusqu'à la destination,
+    qui guide une recherche A* : beaucoup moins de noeuds sont visités
+    qu'avec chemin_destination.
+
+    Parametres
+    ----------
+    dijkstra : Dijkstra
+        L'algorithme de Dijkstra dont le graphe est prétraité.
+    nombre : int
+        Le nombre de repères à choisir (par défaut : 8).
+    chemin : str
+        Chemin d'un fichier .npz enregistré par sauvegarder : les repères
+        y sont lus au lieu d'être calculés.
+
+    Attributs
+    ----------
+    noeuds_fixes : int
+        Le nombre de noeuds dont le coût a été fixé lors de la dernière
+        recherche.
+    """
+
+    def __init__(self, dijkstra, nombre=8, chemin=None):
+        self.dijkstra = dijkstra
+        self.noeuds_fixes = 0
+        if chemin is not None:
+            with np.load(chemin) as donnees:
+                if str(donnees["empreinte"]) != dijkstra.graphe.empreinte():
+                    raise ValueError("Les repères enregistrés ne "
+                                     "correspondent pas au graphe")
+                self.reperes = donnees["reperes"]
+                self.avant = donnees["avant"]
+                self.arriere = donnees["arriere"]
+        else:
+            if nombre < 1:
+                raise ValueError("Il faut au moins un repère")
+            self._selectionner(min(nombre, len(dijkstra.graphe)))
+
+    def _selectionner(self, nombre):
+        """Choisit les repères par sélection du plus éloigné.
+
+        Le premier repère est le noeud le plus éloigné du noeud ayant le
+        plus d'arêtes sortantes ; chaque repère suivant est le noeud dont
+        le coût depuis le repère le plus proche est le plus grand.
+        """
+        graphe = self.dijkstra.graphe
+        inverse = graphe.inverse()
+        depart = int(np.argmax(np.diff(graphe.offsets)))
+        eloignement = _distances(graphe, depart)
+        reperes, avant, arriere = [], [], []
+        for _ in range(nombre):
+            candidats = np.where(np.isinf(eloignement), -1, eloignement)
+            candidats[reperes] = -1
+            repere = int(np.argmax(candidats))
+            reperes.append(repere)
+            avant.append(_distances(graphe, repere))
+            arriere.append(_distances(inverse, repere))
+            eloignement = (avant[-1] if len(reperes) == 1
+                           else np.minimum(eloignement, avant[-1]))
+        self.reperes = np.array(reperes)
+        self.avant = np.vstack(avant)
+        self.arriere = np.vstack(arriere)
+
+    def sauvegarder(self, chemin):
+        """Enregistre les repères et leurs tableaux de coûts dans un fichier
+        .npz, relu en passant chemin à la construction."""
+        np.savez(chemin, reperes=self.reperes, avant=self.avant,
+                 arriere=self.arriere,
+                 empreinte=np.array(self.dijkstra.graphe.empreinte()))
+
+    def _bornes(self, arrivee):
+        """Renvoie, pour chaque noeud, une borne inférieure du coût
+        minimal jusqu'au noeud d'arrivée (infinie si l'arrivée n'est pas
+        atteignable depuis ce noeud)."""
+        with np.errstate(invalid="ignore"):
+            bornes = np.maximum(
+                self.avant[:, [arrivee]] - self.avant,
+                self.arriere - self.arriere[:, [arrivee]])
+        bornes[np.isnan(bornes)] = 0
+        return np.maximum(bornes.max(axis=0), 0).tolist()
+
+    def chemin_destination(self, source, destination):
+        """Trouve le plus court chemin pour une destination
+          atteignable donnée, par une recherche A* guidée par les repères.
+
+        Parametres
+        ----------
+        source : any
+            noeud de départ nécessairement contenu dans la colonne des départs
+            de la table.
+        destination : any
+            noeud d'arrivée nécessairement contenu dans la colonne des arrivées
+            de la table.
+
+        Renvoie
+        -------
+        list :
+            liste comportant le plus court chemin et son coût, comme
+            Dijkstra.chemin_destination.
+        """
+        depart, arrivee = self.dijkstra._verifier_trajet(source, destination)
+        bornes = self._bornes(arrivee)
+        offsets, cibles, poids = self.dijkstra.graphe.listes()
+        nb_noeuds = len(bornes)
+        distances = [INFINI] * nb_noeuds
+        predecesseurs = [-1] * nb_noeuds
+        marques = bytearray(nb_noeuds)
+        self.noeuds_fixes = 0
+        distances[depart] = 0
+        tas = [(bornes[depart], depart)]
+        while tas:
+            _, selection = heapq.heappop(tas)
+            if marques[selection]:
+                continue
+            marques[selection] = 1
+            self.noeuds_fixes += 1
+            if selection == arrivee:
+                break
+            coefficient = distances[selection]
+            for j in range(offsets[selection], offsets[selection + 1]):
+                noeud = cibles[j]
+                cout = coefficient + poids[j]
+                # Une borne infinie signifie que l'arrivée est inaccessible
+                # depuis ce noeud : il est inutile de l'explorer
+                if (not marques[noeud] and cout < distances[noeud]
+                        and bornes[noeud] != np.inf):
+                    distances[noeud] = cout
+                    predecesseurs[noeud] = selection
+                    heapq.heappush(tas, (cout + bornes[noeud], noeud))
+
+        if distances[arrivee] == INFINI:
+            raise ValueError('Pas de trajet')
+        parcours = _remonter(predecesseurs, depart, arrivee)
+        return [self.dijkstra.graphe.noeuds[parcours].tolist(),
+                distances[arrivee]]
+
+    def comparer(self, paires):
+        """Compare le nombre de noeuds visités avec et sans repères.
+
+        Parametre
+        ----------
+        paires : list[tuple]
+            Couples (source, destination) à rechercher.
+
+        Renvoie
+        -------
+        list[dict] :
+            pour chaque couple, le coût trouvé (None s'il n'y a pas de
+            trajet) et le nombre de noeuds fixés par la recherche avec
+            repères et par Dijkstra.chemin_destination.
+        """
+        rapport = []
+        for source, destination in paires:
+            # Une paire invalide ne fixe aucun noeud : le compte de la
+            # paire précédente ne doit pas être repris
+            self.noeuds_fixes = self.dijkstra.noeuds_fixes = 0
+            try:
+                cout = self.chemin_destination(source, destination)[1]
+            except ValueError:
+                cout = None
+            try:
+                self.dijkstra.chemin_destination(source, destination)
+            except ValueError:
+                pass
+            rapport.append({"source": source, "destination": destination,
+                            "cout": cout,
+                            "noeuds_reperes": self.noeuds_fixes,
+                            "noeuds_dijkstra": self.dijkstra.noeuds_fixes})
+        return rapport
@@ -0,0 +1,118 @@
+"""Table des coûts minimaux entre toutes les paires de noeuds, calculée
+à l'avance : une recherche n'est plus qu'une lecture de la table."""
+
+import numpy as np
+
+from .binaire import FichierGraphe, enregistrer_graphe
+from .dijkstra import _remonter
+
+
+class TableCouts:
+    """Coûts minimaux et arbres des plus courts chemins de chaque source.
+
+    Une recherche complète est lancée depuis chaque source (en parallèle,
+    voir Dijkstra.matrice_couts). La table conserve, pour chaque source,
+    le coût minimal vers chaque noeud et le prédécesseur de chaque noeud
+    dans l'arbre des plus courts chemins : chemin_destination lit le coût
+    et remonte l'arbre jusqu'à la source, sans aucune recherche. Les
+    chemins obtenus sont ceux de Dijkstra.chemin_destination.
+
+    Parametres
+    ----------
+    dijkstra : Dijkstra
+        L'algorithme de Dijkstra dont le graphe est précalculé.
+    sources : list
+        Les noeuds de départ précalculés (par défaut : tous les noeuds
+        ayant une arête sortante).
+    processus : int
+        Nombre de processus de calcul, voir Dijkstra.matrice_couts.
+    chemin : str
+        Chemin d'un fichier enregistré par sauvegarder : la table y est
+        projetée en mémoire au lieu d'être calculée.
+
+    Attributs
+    ----------
+    sources : numpy.ndarray
+        Identifiants denses des sources, un par ligne des tableaux.
+    couts : numpy.ndarray
+        Coût minimal (infini si non atteignable) de chaque source vers
+        chaque noeud du graphe.
+    predecesseurs : numpy.ndarray
+        Prédécesseur (identifiant dense, -1 si aucun) de chaque noeud
+        dans l'arbre de chaque source.
+    """
+
+    def __init__(self, dijkstra, sources=None, processus=None, chemin=None):
+        self.dijkstra = dijkstra
+        graphe = dijkstra.graphe
+        if chemin is not None:
+            fichier = FichierGraphe(chemin)
+            if fichier.metadonnees.get("empreinte") != graphe.empreinte():
+                raise ValueError("La table enregistrée ne correspond pas "
+                                 "au graphe")
+            self.sources = fichier.tableau("sources")
+            self.couts = fichier.tableau("couts").reshape(
+                len(self.sources), len(graphe))
+            self.predecesseurs = fichier.tableau("predecesseurs").reshape(
+                len(self.sources), len(graphe))
+        else:
+            if sources is None:
+                sources = graphe.noeuds[np.diff(graphe.offsets) > 0].tolist()
+            self.couts, predecesseurs = dijkstra.matrice_couts(
+                sources, graphe.noeuds.tolist(), predecesseurs=True,
+                processus=processus)
+            self.sources = np.array([graphe.indice(source)
+                                     for source in sources], dtype=np.int32)
+            # Les identifiants denses tiennent souvent sur 16 bits
+            type_ = np.int16 if len(graphe) < 2 ** 15 else np.int32
+            self.predecesseurs = predecesseurs.astype(type_)
+        self._lignes = {source: ligne for ligne, source
+                        in enumerate(self.sources.tolist())}
+
+    def sauvegarder(self, chemin):
+        """Enregistre la table dans un fichier binaire, relu en passant
+        chemin à la construction.
+
+        Le fichier est projeté en mémoire à la lecture : les processus
+        qui l'ouvrent en partagent les pages.
+        """
+        graphe = self.dijkstra.graphe
+        enregistrer_graphe(chemin, graphe,
+                           tableaux={"sources": self.sources,
+                                     "couts": self.couts.ravel(),
+                                     "predecesseurs":
+                                         self.predecesseurs.ravel()},
+                           metadonnees={"empreinte": graphe.empreinte()})
+
+    def __contains__(self, source):
+        return self.dijkstra.graphe.indice(source) in self._lignes
+
+    def chemin_destination(self, source, destination):
+        """Trouve le plus court chemin pour une destination
+          atteignable donnée, par lecture de la table.
+
+        Parametres
+        ----------
+        source : any
+            noeud de départ, parmi les sources de la table.
+        destination : any
+            noeud d'arrivée nécessairement contenu dans la colonne des arrivées
+            de la table.
+
+        Renvoie
+        -------
+        list :
+            liste comportant le plus court chemin et son coût, comme
+            Dijkstra.chemin_destination.
+        """
+        depart, arrivee = self.dijkstra._verifier_trajet(source, destination)
+        ligne = self._lignes.get(depart)
+        if ligne is None:
+            raise ValueError(f"{source} n'est pas une source de la table")
+        cout = self.couts[ligne, arrivee].item()
+        if cout == np.inf:
+            raise ValueError('Pas de trajet')
+        if self.dijkstra.graphe.poids.dtype.kind in "biu":
+            cout = int(cout)
+        parcours = _remonter(self.predecesseurs[ligne], depart, arrivee)
+        return [self.dijkstra.graphe.noeuds[parcours].tolist(), cout]
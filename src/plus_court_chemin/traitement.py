@@ -1,8 +1,21 @@
 """
 Module pour traiter les dataframes en tant que graphes.
 """
+import itertools
+import operator
+
+import numpy as np
 import pandas as pd
 
+from .chronometre import chronometre
+from .dijkstra import Dijkstra
+from .dynamique import GrapheDynamique
+from .graphe import Graphe
+
+CONDITIONS = {'>': operator.gt, '<': operator.lt, '==': operator.eq,
+              '>=': operator.ge, '<=': operator.le, '!=': operator.ne}
+RAYON_TERRE = 6371008.8  # Rayon moyen de la Terre en mètres
+
 
 class Traitement:
     """
@@ -28,6 +41,7 @@ class Traitement:
         self.colonne_noeud_arrivee = colonne_noeud_arrivee
         self.colonne_distance = colonne_distance
 
+    @chronometre("traitement.ajouter_aretes")
     def ajouter_aretes(self, lignes):
         """
         Ajoute une arête à notre graphe.
@@ -43,6 +57,7 @@ class Traitement:
         """
         return pd.concat([self.df, lignes], ignore_index=True, sort=False)
 
+    @chronometre("traitement.supprimer_arete")
     def supprimer_arete(self, ligne):
         """
         Supprime une arête de notre graphe.
@@ -58,6 +73,96 @@ class Traitement:
         """
         return self.df.drop(ligne)
 
+    def graphe_dynamique(self, source=None):
+        """
+        Construit un graphe modifiable à partir du dataframe, pour étudier
+        l'effet de quelques modifications d'arêtes sans recopier la table
+        ni recalculer tous les plus courts chemins.
+
+        L'arête issue de la i-ème ligne du dataframe a l'identifiant i.
+
+        Paramètre
+        ----------
+        source : any
+            Source de l'arbre des plus courts chemins maintenu par le
+            graphe (par défaut : None, aucun arbre).
+
+        Retour
+        -------
+        GrapheDynamique :
+            Le graphe modifiable.
+        """
+        graphe = GrapheDynamique.depuis_dataframe(
+            self.df, self.colonne_noeud_depart, self.colonne_noeud_arrivee,
+            self.colonne_distance)
+        if source is not None:
+            graphe.fixer_source(source)
+        return graphe
+
+    @chronometre("traitement.correspondances")
+    def correspondances(self, gares, rayon, prix, colonne_code="Code UIC",
+                        colonne_longitude="Longitude",
+                        colonne_latitude="Latitude"):
+        """
+        Génère les arêtes de correspondance, à pied ou en transport urbain,
+        entre les gares distantes d'au plus rayon mètres à vol d'oiseau.
+
+        Les gares sont placées dans une grille dont les cases mesurent le
+        rayon : seules les gares de cases voisines sont comparées, au lieu
+        de toutes les paires de gares. Une correspondance est créée dans
+        les deux sens ; les gares sans coordonnées sont ignorées, de même
+        que les paires de plateformes d'un même code.
+
+        Paramètres
+        ----------
+        gares : pandas.DataFrame
+            Le référentiel des gares.
+        rayon : float
+            La distance maximale entre deux gares, en mètres.
+        prix : float
+            Le coût de chaque correspondance.
+        colonne_code : str
+            La colonne des identifiants des gares, noeuds du graphe (par
+            défaut : "Code UIC").
+        colonne_longitude, colonne_latitude : str
+            Les colonnes des coordonnées des gares, en degrés (par
+            défaut : "Longitude" et "Latitude").
+
+        Retour
+        -------
+        pandas.DataFrame :
+            Les arêtes de correspondance, avec les colonnes des noeuds et
+            de la distance du dataframe, à ajouter avec ajouter_aretes.
+        """
+        if rayon <= 0:
+            raise ValueError("Le rayon doit être strictement positif")
+        gares = gares.dropna(subset=[colonne_code, colonne_longitude,
+                                     colonne_latitude])
+        codes = gares[colonne_code].to_numpy()
+        longitudes = np.radians(gares[colonne_longitude].to_numpy(float))
+        latitudes = np.radians(gares[colonne_latitude].to_numpy(float))
+        # Coordonnées cartésiennes sur la sphère : une distance à vol
+        # d'oiseau d'au plus rayon équivaut à une corde d'au plus corde
+        points = RAYON_TERRE * np.column_stack([
+            np.cos(latitudes) * np.cos(longitudes),
+            np.cos(latitudes) * np.sin(longitudes),
+            np.sin(latitudes)])
+        corde = 2 * RAYON_TERRE * np.sin(min(rayon / (2 * RAYON_TERRE),
+                                             np.pi / 2))
+        premiers, seconds = _paires_proches(points, corde)
+        differents = codes[premiers] != codes[seconds]
+        departs = np.concatenate([codes[premiers][differents],
+                                  codes[seconds][differents]])
+        arrivees = np.concatenate([codes[seconds][differents],
+                                   codes[premiers][differents]])
+        aretes = pd.DataFrame({self.colonne_noeud_depart: departs,
+                               self.colonne_noeud_arrivee: arrivees})
+        aretes = aretes.drop_duplicates().sort_values(
+            [self.colonne_noeud_depart, self.colonne_noeud_arrivee])
+        aretes[self.colonne_distance] = prix
+        return aretes.reset_index(drop=True)
+
+    @chronometre("traitement.filtrer_dataframe")
     def filtrer_dataframe(self, colonne, condition, valeur):
         """
         Filtre un DataFrame en fonction d'une condition et d'une valeur dans
@@ -80,21 +185,10 @@ class Traitement:
         pandas.DataFrame :
             Le DataFrame filtré.
         """
-        if condition == '>':
-            return self.df[self.df[colonne] > valeur]
-        if condition == '<':
-            return self.df[self.df[colonne] < valeur]
-        if condition == '==':
-            return self.df[self.df[colonne] == valeur]
-        if condition == '>=':
-            return self.df[self.df[colonne] >= valeur]
-        if condition == '<=':
-            return self.df[self.df[colonne] <= valeur]
-        if condition == '!=':
-            return self.df[self.df[colonne] != valeur]
-        raise ValueError(f"""Condition invalide {condition}. Doit etre '>',
-                         '<', '==', '>=', '<=', '!='.""")
+        _verifier_condition(condition)
+        return self.df[CONDITIONS[condition](self.df[colonne], valeur)]
 
+    @chronometre("traitement.retirer_manquant")
     def retirer_manquant(self):
         """
         Cette fonction supprime les lignes avec des valeurs manquantes dans un
@@ -110,3 +204,288 @@ class Traitement:
             valeurs manquantes.
         """
         return self.df.dropna()
+
+    def plan(self):
+        """
+        Commence un plan de traitement paresseux sur le dataframe.
+
+        Les filtres, suppressions de valeurs manquantes et ajouts ou
+        suppressions d'arêtes enregistrés dans le plan ne sont appliqués
+        qu'à sa matérialisation, en une seule fois : un unique masque
+        booléen est calculé au lieu d'une copie du dataframe par étape.
+
+        Retour
+        -------
+        PlanTraitement :
+            Le plan, vide, à compléter.
+
+        Exemple
+        -------
+        >>> df = pd.DataFrame({'Départ': ['A', 'A', 'B'],
+        ...                    'Arrivée': ['B', 'C', 'C'],
+        ...                    'Prix': [1, 5, None]})
+        >>> plan = (Traitement(df, 'Départ', 'Arrivée', 'Prix').plan()
+        ...         .retirer_manquant().filtrer('Prix', '<', 3))
+        >>> plan.dataframe()['Arrivée'].tolist()
+        ['B']
+        """
+        return PlanTraitement(self)
+
+
+def _paires_proches(points, distance):
+    """Renvoie les indices (i, j), i < j, des couples de points distants
+    d'au plus distance.
+
+    Chaque point est rangé dans une case de la grille de côté distance :
+    les points proches d'un point sont dans sa case ou une case voisine.
+    Les cases voisines de tous les points sont trouvées par recherche
+    dichotomique dans les cases triées, une fois par décalage.
+    """
+    cases = np.floor(points / distance).astype(np.int64)
+    # Cases numérotées à partir de 1 pour que leurs voisines soient
+    # positives, puis réduites à un unique entier
+    cases -= cases.min(axis=0) - 1
+    dimensions = cases.max(axis=0) + 2
+    if np.prod(dimensions.astype(float)) >= 2 ** 62:
+        raise ValueError("Distance trop petite pour l'étendue des points")
+    clefs = (cases[:, 0] * dimensions[1] + cases[:, 1]) * dimensions[2] \
+        + cases[:, 2]
+    ordre = np.argsort(clefs, kind="stable")
+    triees = clefs[ordre]
+    premiers, seconds = [], []
+    for dx, dy, dz in itertools.product((-1, 0, 1), repeat=3):
+        voisines = clefs + (dx * dimensions[1] + dy) * dimensions[2] + dz
+        debuts = np.searchsorted(triees, voisines, side="left")
+        nombres = np.searchsorted(triees, voisines, side="right") - debuts
+        i = np.repeat(np.arange(len(points)), nombres)
+        # Position de chaque candidat dans les cases triées
+        decalages = np.arange(len(i)) - np.repeat(np.cumsum(nombres)
+                                                  - nombres, nombres)
+        j = ordre[np.repeat(debuts, nombres) + decalages]
+        garder = i < j
+        i, j = i[garder], j[garder]
+        proches = (np.square(points[i] - points[j]).sum(axis=1)
+                   <= distance ** 2)
+        premiers.append(i[proches])
+        seconds.append(j[proches])
+    return np.concatenate(premiers), np.concatenate(seconds)
+
+
+def _verifier_condition(condition):
+    """Lève une erreur si la condition de filtrage est inconnue."""
+    if condition not in CONDITIONS:
+        raise ValueError(f"""Condition invalide {condition}. Doit etre '>',
+                         '<', '==', '>=', '<=', '!='.""")
+
+
+def _colonne(table, colonne):
+    """Renvoie la colonne de la table, ou une colonne de valeurs
+    manquantes si la table ne la contient pas (lignes ajoutées)."""
+    if colonne in table.columns:
+        return table[colonne]
+    return pd.Series(np.nan, index=table.index)
+
+
+class PlanTraitement:
+    """
+    Plan de traitement paresseux d'un dataframe de graphe.
+
+    Chaque méthode enregistre une étape et renvoie le plan, ce qui permet
+    de les enchaîner. Les étapes s'appliquent dans l'ordre : un filtre
+    enregistré après un ajout d'arêtes s'applique aussi aux arêtes
+    ajoutées.
+
+    Attributs
+    ----------
+    traitement : Traitement
+        Le traitement dont le dataframe est transformé.
+    """
+    def __init__(self, traitement):
+        self.traitement = traitement
+        self._etapes = []
+
+    def __len__(self):
+        return len(self._etapes)
+
+    def filtrer(self, colonne, condition, valeur):
+        """
+        Enregistre un filtre, comme Traitement.filtrer_dataframe.
+
+        Paramètres
+        ----------
+        colonne : str
+            Le nom de la colonne sur laquelle appliquer le filtre.
+        condition : str
+            La condition à appliquer ('>', '<', '==', '>=', '<=', '!=').
+        valeur : any
+            La valeur à comparer.
+
+        Retour
+        -------
+        PlanTraitement :
+            Le plan complété.
+        """
+        _verifier_condition(condition)
+        self._etapes.append(("filtre", colonne, condition, valeur))
+        return self
+
+    def retirer_manquant(self, colonnes=None):
+        """
+        Enregistre la suppression des lignes ayant des valeurs manquantes,
+        comme Traitement.retirer_manquant.
+
+        Paramètre
+        ----------
+        colonnes : list[str]
+            Les colonnes examinées (par défaut : None, toutes les colonnes
+            du dataframe).
+
+        Retour
+        -------
+        PlanTraitement :
+            Le plan complété.
+        """
+        self._etapes.append(("manquant", colonnes))
+        return self
+
+    def ajouter_aretes(self, lignes):
+        """
+        Enregistre un ajout d'arêtes, comme Traitement.ajouter_aretes.
+
+        Paramètre
+        ----------
+        lignes : pandas.DataFrame
+            Les arêtes à ajouter.
+
+        Retour
+        -------
+        PlanTraitement :
+            Le plan complété.
+        """
+        if not isinstance(lignes, pd.DataFrame):
+            raise TypeError("lignes doit être un dataframe pandas")
+        self._etapes.append(("ajout", lignes))
+        return self
+
+    def supprimer_arete(self, ligne):
+        """
+        Enregistre la suppression d'arêtes du dataframe initial, comme
+        Traitement.supprimer_arete.
+
+        Paramètre
+        ----------
+        ligne : int ou list
+            Le ou les indices des arêtes à supprimer.
+
+        Retour
+        -------
+        PlanTraitement :
+            Le plan complété.
+        """
+        self._etapes.append(("suppression", ligne))
+        return self
+
+    def masques(self):
+        """
+        Calcule le masque des lignes conservées de chaque table.
+
+        Retour
+        -------
+        list[tuple] :
+            Les couples (table, masque) : le dataframe initial puis chaque
+            table d'arêtes ajoutées, avec le tableau de booléens des lignes
+            conservées.
+        """
+        df = self.traitement.df
+        blocs = [(df, np.ones(len(df), dtype=bool))]
+        for etape in self._etapes:
+            if etape[0] == "ajout":
+                blocs.append((etape[1], np.ones(len(etape[1]), dtype=bool)))
+            elif etape[0] == "suppression":
+                lignes = etape[1] if isinstance(etape[1], list) else [etape[1]]
+                absentes = [ligne for ligne in lignes if ligne not in df.index]
+                if absentes:
+                    raise KeyError(f"{absentes} absent de l'index")
+                blocs[0][1][df.index.isin(lignes)] = False
+            else:
+                for table, masque in blocs:
+                    if etape[0] == "filtre":
+                        _, colonne, condition, valeur = etape
+                        masque &= CONDITIONS[condition](
+                            _colonne(table, colonne), valeur).to_numpy(
+                                dtype=bool, na_value=False)
+                    else:
+                        colonnes = (df.columns if etape[1] is None
+                                    else etape[1])
+                        masque &= pd.concat(
+                            [_colonne(table, colonne).notna()
+                             for colonne in colonnes],
+                            axis=1).all(axis=1).to_numpy()
+        return blocs
+
+    @chronometre("traitement.plan.dataframe")
+    def dataframe(self):
+        """
+        Matérialise le plan en un dataframe.
+
+        Retour
+        -------
+        pandas.DataFrame :
+            Le dataframe obtenu. Il conserve l'index du dataframe initial
+            si aucune arête n'a été ajoutée ; sinon, comme pour
+            Traitement.ajouter_aretes, les lignes sont renumérotées.
+        """
+        blocs = self.masques()
+        if len(blocs) == 1:
+            return blocs[0][0][blocs[0][1]]
+        return pd.concat([table[masque] for table, masque in blocs],
+                         ignore_index=True, sort=False)
+
+    def _aretes(self):
+        """Renvoie les trois colonnes du graphe des lignes conservées de
+        chaque table."""
+        colonnes = [self.traitement.colonne_noeud_depart,
+                    self.traitement.colonne_noeud_arrivee,
+                    self.traitement.colonne_distance]
+        return [table.loc[masque, colonnes]
+                for table, masque in self.masques()]
+
+    @chronometre("traitement.plan.graphe")
+    def graphe(self):
+        """
+        Matérialise le plan directement en un graphe, sans construire le
+        dataframe complet : seules les trois colonnes du graphe sont lues.
+
+        Retour
+        -------
+        Graphe :
+            Le graphe des arêtes conservées.
+        """
+        traitement = self.traitement
+        return Graphe.depuis_morceaux(self._aretes(),
+                                      traitement.colonne_noeud_depart,
+                                      traitement.colonne_noeud_arrivee,
+                                      traitement.colonne_distance)
+
+    def dijkstra(self, strategie="tas"):
+        """
+        Matérialise le plan en un algorithme de Dijkstra prêt à être
+        interrogé, construit sur les trois colonnes du graphe seulement.
+
+        Paramètre
+        ----------
+        strategie : str
+            Le moteur de recherche utilisé (voir Dijkstra).
+
+        Retour
+        -------
+        Dijkstra :
+            L'algorithme construit sur les arêtes conservées.
+        """
+        aretes = self._aretes()
+        table = (aretes[0] if len(aretes) == 1
+                 else pd.concat(aretes, ignore_index=True))
+        traitement = self.traitement
+        return Dijkstra(table, traitement.colonne_noeud_depart,
+                        traitement.colonne_noeud_arrivee,
+                        traitement.colonne_distance, strategie)
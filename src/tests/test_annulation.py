@@ -0,0 +1,53 @@
+""" Tests de l'annulation des recherches avec pytest """
+import time
+import pytest
+import pandas as pd
+from plus_court_chemin.dijkstra import Dijkstra, STRATEGIES
+from plus_court_chemin.annulation import (PERIODE_VERIFICATION,
+                                          JetonAnnulation, RechercheAnnulee,
+                                          DelaiDepasse)
+
+
+# Ligne de noeuds assez longue pour dépasser une période de vérification
+nb_noeuds = 2 * PERIODE_VERIFICATION
+dataf_ligne = pd.DataFrame({'Départ': range(nb_noeuds - 1),
+                            'Arrivé': range(1, nb_noeuds),
+                            'Distance': [1] * (nb_noeuds - 1)})
+
+
+@pytest.mark.parametrize('strategie', STRATEGIES)
+def test_recherche_annulee(strategie):
+    """
+    Test de l'interruption d'une recherche dont le jeton est annulé.
+    """
+    jeton = JetonAnnulation()
+    jeton.annuler()
+    dijkstra = Dijkstra(dataf_ligne, 'Départ', 'Arrivé', 'Distance',
+                        strategie)
+    with pytest.raises(RechercheAnnulee, match='annulée'):
+        dijkstra.chemin_destination(0, nb_noeuds - 1, jeton)
+
+
+@pytest.mark.parametrize('strategie', STRATEGIES)
+def test_delai_depasse(strategie):
+    """
+    Test de l'interruption d'une recherche ayant dépassé son budget.
+    """
+    jeton = JetonAnnulation(0.001)
+    time.sleep(0.01)
+    dijkstra = Dijkstra(dataf_ligne, 'Départ', 'Arrivé', 'Distance',
+                        strategie)
+    with pytest.raises(DelaiDepasse, match='durée maximale'):
+        dijkstra.chemin_partout(0, jeton)
+
+
+@pytest.mark.parametrize('strategie', STRATEGIES)
+def test_jeton_actif(strategie):
+    """
+    Test de l'égalité des résultats avec un jeton jamais déclenché.
+    """
+    dijkstra = Dijkstra(dataf_ligne, 'Départ', 'Arrivé', 'Distance',
+                        strategie)
+    assert dijkstra.chemin_destination(
+        0, nb_noeuds - 1, JetonAnnulation(60)) == \
+        dijkstra.chemin_destination(0, nb_noeuds - 1)
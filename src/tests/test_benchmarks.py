@@ -0,0 +1,64 @@
+""" Tests de la suite de mesures avec pytest """
+import json
+import shutil
+import time
+import pytest
+from benchmarks import FICHIERS, comparer, executer, mesurer
+
+
+def test_executer(tmp_path):
+    """
+    Test des mesures obtenues sur le seul réseau aérien.
+    """
+    shutil.copy("././data/air_routes_edges.csv", tmp_path)
+    resultats = executer(str(tmp_path), repetitions=1, nb_paires=3,
+                         nb_sources=1, strategies=("tas",))
+    assert sorted(resultats["mesures"]) == [
+        "chemin_destination/aerien/tas", "chemin_partout/aerien/tas",
+        "chemins_alternatifs/aerien/k5", "construction/aerien", "graph/aerien",
+        "lecture/air_routes_edges.csv", "parcours/aerien/tas"]
+    assert resultats["absents"] == [
+        nom for nom in FICHIERS if nom != "air_routes_edges.csv"]
+    assert resultats["mesures"]["chemin_destination/aerien/tas"][
+        "operations"] == 3
+    # Les résultats sont sérialisables et comparables entre eux
+    relus = json.loads(json.dumps(resultats))
+    assert all(rapport == 1 and not regression
+               for _, _, _, rapport, regression in comparer(relus, resultats))
+
+
+@pytest.mark.parametrize('avant, apres, regression', [
+    (1.0, 1.1, False), (1.0, 1.5, True), (1.0, 0.5, False)])
+def test_comparer(avant, apres, regression):
+    """
+    Test de la détection des régressions au-delà du seuil.
+    """
+    ancien = {"mesures": {"etape": {"mediane_s": avant}}}
+    nouveau = {"mesures": {"etape": {"mediane_s": apres},
+                           "nouvelle": {"mediane_s": 1.0}}}
+    assert comparer(ancien, nouveau, seuil=0.2) == [
+        ("etape", avant, apres, apres / avant, regression)]
+
+
+def test_erreur_mesurer():
+    """
+    Test de l'erreur levée pour un nombre de répétitions invalide.
+    """
+    with pytest.raises(ValueError):
+        mesurer(lambda: None, repetitions=0)
+
+
+def test_preparation_mesurer():
+    """
+    Test de la préparation appelée avant chaque exécution, hors de la
+    mesure, dont le résultat est transmis à la fonction mesurée.
+    """
+    recus = []
+
+    def preparation():
+        time.sleep(0.05)
+        return len(recus)
+
+    resultat = mesurer(recus.append, repetitions=3, preparation=preparation)
+    assert recus == [0, 1, 2, 3]
+    assert resultat["max_s"] < 0.05
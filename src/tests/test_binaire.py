@@ -0,0 +1,100 @@
+""" Tests du fichier binaire de graphe avec pytest """
+import pytest
+import numpy as np
+import pandas as pd
+from plus_court_chemin.binaire import FichierGraphe, enregistrer_graphe
+from plus_court_chemin.dijkstra import Dijkstra
+from plus_court_chemin.graphe import Graphe
+
+
+dataf_ex_1 = pd.DataFrame({
+    'Départ': [101, 101, 101, 102, 107, 102, 103, 103, 103, 104, 104, 106],
+    'Arrivé': [103, 104, 105, 103, 106, 104, 102, 101, 104, 103, 101, 107],
+    'Prix min': [4, 3, 5, 2, 4, 4, 2, 4, 3, 3, 3, 3.5],
+    'Prix max': [8, 6, 5, 2, 9, 4, 3, 4, 7, 3, 9, 3.5],
+    'Classe': [1, 2, 1, 2, 2, 1, 1, 2, 2, 1, 2, 1]
+})
+
+
+@pytest.fixture
+def fichier(tmp_path):
+    """Enregistre le graphe de dataf_ex_1 et renvoie le fichier ouvert."""
+    chemin = str(tmp_path / "graphe.pccg")
+    graphe = Graphe.depuis_dataframe(dataf_ex_1, 'Départ', 'Arrivé',
+                                     'Prix min')
+    enregistrer_graphe(chemin, graphe, poids={'max': dataf_ex_1['Prix max']},
+                       attributs={'classe': dataf_ex_1['Classe']},
+                       tableaux={'noms': ['Paris', 'Lyon', 'Nîmes']},
+                       metadonnees={'version': 1})
+    return FichierGraphe(chemin)
+
+
+def test_ouverture_binaire(fichier):
+    """
+    Test de la relecture des tableaux et des métadonnées.
+    """
+    assert fichier.modes == ['defaut', 'max']
+    assert fichier.metadonnees == {'version': 1}
+    assert fichier.tableau('noms') == ['Paris', 'Lyon', 'Nîmes']
+    assert isinstance(fichier.cibles, np.memmap)
+    graphe = Graphe.depuis_dataframe(dataf_ex_1, 'Départ', 'Arrivé',
+                                     'Prix min')
+    assert fichier.graphe().empreinte() == graphe.empreinte()
+    with pytest.raises(ValueError, match='Mode inconnu'):
+        fichier.graphe('moyen')
+
+
+@pytest.mark.parametrize('masque', [None, np.ones(12, dtype=bool)])
+def test_graphe_complet_binaire(fichier, masque):
+    """
+    Test du graphe complet, construit sur les tableaux projetés en mémoire
+    sans copie.
+    """
+    graphe = fichier.graphe('max', masque)
+    for tableau in (graphe.offsets, graphe.cibles, graphe.poids,
+                    graphe.ordre):
+        assert isinstance(tableau, np.memmap)
+    assert graphe.empreinte() == Graphe.depuis_dataframe(
+        dataf_ex_1, 'Départ', 'Arrivé', 'Prix max').empreinte()
+
+
+@pytest.mark.parametrize('mode, colonne', [('defaut', 'Prix min'),
+                                           ('max', 'Prix max')])
+@pytest.mark.parametrize('classe', [1, 2])
+def test_graphe_filtre_binaire(fichier, mode, colonne, classe):
+    """
+    Test de l'égalité du graphe filtré avec le graphe construit sur les
+    seules lignes conservées.
+    """
+    table = dataf_ex_1[dataf_ex_1['Classe'] == classe]
+    attendu = Graphe.depuis_dataframe(table, 'Départ', 'Arrivé', colonne)
+    graphe = fichier.graphe(mode, fichier.attribut('classe') == classe)
+    assert graphe.empreinte() == attendu.empreinte()
+    np.testing.assert_array_equal(graphe.ordre, attendu.ordre)
+    assert (Dijkstra.depuis_graphe(graphe).graph()
+            == Dijkstra(table, 'Départ', 'Arrivé', colonne).graph())
+
+
+def test_noeuds_texte_binaire(tmp_path):
+    """
+    Test d'un graphe dont les noeuds sont des chaînes.
+    """
+    chemin = str(tmp_path / "graphe.pccg")
+    table = pd.DataFrame({'Départ': ['Paris', 'Lyon'],
+                          'Arrivé': ['Lyon', 'Marseille'],
+                          'Distance': [4, 2]})
+    enregistrer_graphe(chemin, Graphe.depuis_dataframe(
+        table, 'Départ', 'Arrivé', 'Distance'))
+    dijkstra = Dijkstra.depuis_graphe(FichierGraphe(chemin).graphe())
+    assert dijkstra.chemin_destination('Paris', 'Marseille') == [
+        ['Paris', 'Lyon', 'Marseille'], 6]
+
+
+def test_erreur_binaire(tmp_path):
+    """
+    Test de l'erreur levée pour un fichier qui n'est pas un graphe.
+    """
+    chemin = tmp_path / "texte.pccg"
+    chemin.write_text("Départ;Arrivé")
+    with pytest.raises(ValueError, match="n'est pas un fichier de graphe"):
+        FichierGraphe(str(chemin))
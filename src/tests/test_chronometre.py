@@ -0,0 +1,56 @@
+""" Tests du chronométrage des étapes avec pytest """
+import pytest
+import pandas as pd
+import plus_court_chemin as pcc
+
+
+dataf_ex_1 = pd.DataFrame({
+    'Départ': ['Paris', 'Paris', 'Lyon', 'Lyon'],
+    'Arrivé': ['Lyon', 'Rennes', 'Marseille', 'Paris'],
+    'Distance': [4, 3, 2, 4]
+})
+
+
+@pytest.fixture
+def etapes():
+    """Enregistre un observateur le temps du test et renvoie les étapes
+    observées."""
+    observees = []
+    observateur = lambda nom, duree: observees.append((nom, duree))
+    pcc.ajouter_observateur(observateur)
+    yield observees
+    pcc.retirer_observateur(observateur)
+
+
+def test_etapes_dijkstra(etapes):
+    """
+    Test des étapes transmises par Dijkstra, y compris en cas d'erreur.
+    """
+    dijkstra = pcc.Dijkstra(dataf_ex_1, 'Départ', 'Arrivé', 'Distance')
+    dijkstra.chemin_destination('Paris', 'Marseille')
+    with pytest.raises(ValueError):
+        dijkstra.chemin_destination('Rennes', 'Paris')
+    assert [nom for nom, _ in etapes] == [
+        'dijkstra.construction', 'dijkstra.chemin_destination',
+        'dijkstra.chemin_destination']
+    assert all(duree >= 0 for _, duree in etapes)
+
+
+def test_etapes_traitement(etapes):
+    """
+    Test des étapes transmises par Traitement et par un bloc etape.
+    """
+    with pcc.etape('bloc'):
+        pcc.Traitement(dataf_ex_1, 'Départ', 'Arrivé',
+                       'Distance').filtrer_dataframe('Distance', '<', 4)
+    assert [nom for nom, _ in etapes] == ['traitement.filtrer_dataframe',
+                                          'bloc']
+    assert etapes[0][1] <= etapes[1][1]
+
+
+def test_erreur_observateur():
+    """
+    Test de l'erreur levée pour le retrait d'un observateur inconnu.
+    """
+    with pytest.raises(ValueError, match='Observateur inconnu'):
+        pcc.retirer_observateur(print)
@@ -0,0 +1,91 @@
+""" Tests du module contraction avec pytest """
+import random
+import pytest
+import pandas as pd
+from plus_court_chemin.dijkstra import Dijkstra
+from plus_court_chemin.contraction import HierarchieContraction
+
+
+dataf_ex_1 = pd.DataFrame({
+    'Départ': ['Paris', 'Paris', 'Paris', 'Marseille', 'Bastia', 'Marseille',
+               'Lyon', 'Lyon', 'Lyon', 'Rennes', 'Rennes', 'Ajaccio'],
+    'Arrivé': ['Lyon', 'Rennes', 'Tarbes', 'Lyon', 'Ajaccio', 'Rennes',
+               'Marseille', 'Paris', 'Rennes', 'Lyon', 'Paris', 'Bastia'],
+    'Distance': [4, 3, 5, 2, 4, 4, 2, 4, 3, 3, 3, 3.5]
+})
+
+generateur = random.Random(0)
+dataf_ex_2 = pd.DataFrame({
+    'Départ': [generateur.randrange(40) for _ in range(200)],
+    'Arrivé': [generateur.randrange(40) for _ in range(200)],
+    'Distance': [generateur.randint(1, 20) for _ in range(200)]
+})  # graphe aléatoire avec boucles et arêtes parallèles
+
+dataf_ex_3 = pd.DataFrame({
+    'Départ': [generateur.randrange(40) for _ in range(200)],
+    'Arrivé': [generateur.randrange(40) for _ in range(200)],
+    'Distance': [round(generateur.uniform(0, 80), 1) for _ in range(200)]
+})  # graphe aléatoire à poids réels
+
+
+@pytest.mark.parametrize('source, destination, resultat', [
+    ('Paris', 'Marseille', [['Paris', 'Lyon', 'Marseille'], 6]),
+    ('Marseille', 'Tarbes', [['Marseille', 'Lyon', 'Paris', 'Tarbes'], 11]),
+    ('Ajaccio', 'Bastia', [['Ajaccio', 'Bastia'], 3.5])])
+def test_resultat_contraction(source, destination, resultat):
+    """
+    Test des résultats de chemin_destination de la hiérarchie.
+    """
+    hierarchie = HierarchieContraction(
+        Dijkstra(dataf_ex_1, 'Départ', 'Arrivé', 'Distance'))
+    assert hierarchie.chemin_destination(source, destination) == resultat
+
+
+def test_pas_de_trajet_contraction():
+    """
+    Test de l'erreur levée sans chemin possible.
+    """
+    hierarchie = HierarchieContraction(
+        Dijkstra(dataf_ex_1, 'Départ', 'Arrivé', 'Distance'))
+    with pytest.raises(ValueError, match='Pas de trajet'):
+        hierarchie.chemin_destination('Bastia', 'Lyon')
+
+
+def test_graphe_aleatoire_contraction():
+    """
+    Test de l'égalité des coûts avec Dijkstra sur toutes les paires d'un
+    graphe aléatoire et de la validité des chemins dépliés.
+    """
+    dijkstra = Dijkstra(dataf_ex_2, 'Départ', 'Arrivé', 'Distance')
+    hierarchie = HierarchieContraction(dijkstra, limite_temoins=5)
+    graphe = dijkstra.graph()
+    for source in graphe:
+        for destination in set(dataf_ex_2['Arrivé']) - {source}:
+            try:
+                attendu = dijkstra.chemin_destination(source, destination)[1]
+            except ValueError:
+                with pytest.raises(ValueError):
+                    hierarchie.chemin_destination(source, destination)
+                continue
+            parcours, cout = hierarchie.chemin_destination(source,
+                                                           destination)
+            assert cout == attendu
+            assert sum(min(poids for voisin, poids in graphe[a] if voisin == b)
+                       for a, b in zip(parcours, parcours[1:])) == cout
+
+
+def test_couts_reels_contraction():
+    """
+    Test de l'égalité exacte des coûts réels avec Dijkstra sur toutes les
+    paires d'un graphe aléatoire.
+    """
+    dijkstra = Dijkstra(dataf_ex_3, 'Départ', 'Arrivé', 'Distance')
+    hierarchie = HierarchieContraction(dijkstra)
+    for source in set(dataf_ex_3['Départ']):
+        for destination in set(dataf_ex_3['Arrivé']) - {source}:
+            try:
+                attendu = dijkstra.chemin_destination(source, destination)
+            except ValueError:
+                continue
+            assert (hierarchie.chemin_destination(source, destination)[1]
+                    == attendu[1])
@@ -1,7 +1,12 @@
 """ Tests du module chemin avec pytest """
+import os
 import re
+import subprocess
+import sys
 import pytest
+import numpy as np
 import pandas as pd
+import plus_court_chemin
 from plus_court_chemin.dijkstra import Dijkstra
 
 
@@ -211,3 +216,175 @@ def test_resultat_destination_dijkstra(dataf, colonne_noeud_depart,
     assert (Dijkstra(dataf, colonne_noeud_depart, colonne_noeud_arrivee,
                      colonne_distance).chemin_destination(source, destination)
             == resultat)
+
+
+@pytest.mark.parametrize('strategie', ['tas', 'bidirectionnel'])
+@pytest.mark.parametrize('''dataf, source, destination''', [
+  (dataf_ex_4, 'Paris', 'Marseille'),
+  (dataf_ex_4, 'Lyon', 'Tarbes'),
+  (dataf_ex_4, 'Bastia', 'Ajaccio'),
+  (dataf_ex_5, 101, 102),
+  (dataf_ex_5, 104, 102)])
+def test_strategies_dijkstra(dataf, source, destination, strategie):
+    """
+    Test de l'égalité des résultats des stratégies avec la stratégie "naif".
+    """
+    naif = Dijkstra(dataf, 'Départ', 'Arrivé', 'Distance', strategie='naif')
+    autre = Dijkstra(dataf, 'Départ', 'Arrivé', 'Distance',
+                     strategie=strategie)
+    assert (autre.chemin_destination(source, destination)
+            == naif.chemin_destination(source, destination))
+
+
+@pytest.mark.parametrize('strategie', ['tas', 'bidirectionnel'])
+def test_pas_de_trajet_strategies_dijkstra(strategie):
+    """
+    Test de l'erreur levée sans chemin possible pour chaque stratégie.
+    """
+    with pytest.raises(ValueError, match='Pas de trajet'):
+        Dijkstra(dataf_ex_4, 'Départ', 'Arrivé', 'Distance',
+                 strategie=strategie).chemin_destination('Bastia', 'Lyon')
+
+
+def test_couts_reels_strategies_dijkstra():
+    """
+    Test de l'égalité exacte des coûts réels de la stratégie
+    "bidirectionnel" avec ceux de la stratégie "tas".
+    """
+    dataf = pd.DataFrame({
+        'Départ': ['A', 'B', 'C', 'D', 'E'],
+        'Arrivé': ['B', 'C', 'D', 'E', 'F'],
+        'Distance': [66.9, 34.6, 61.0, 0.2, 35.6]
+    })
+    tas = Dijkstra(dataf, 'Départ', 'Arrivé', 'Distance')
+    bidirectionnel = Dijkstra(dataf, 'Départ', 'Arrivé', 'Distance',
+                              strategie='bidirectionnel')
+    for destination in ['B', 'C', 'D', 'E', 'F']:
+        assert (bidirectionnel.chemin_destination('A', destination)
+                == tas.chemin_destination('A', destination))
+
+
+def test_arret_anticipe_dijkstra():
+    """
+    Test de l'arrêt de la recherche dès que la destination est fixée.
+    """
+    dijkstra = Dijkstra(dataf_ex_4, 'Départ', 'Arrivé', 'Distance')
+    dijkstra.chemin_destination('Paris', 'Rennes')
+    assert dijkstra.noeuds_fixes == 2
+    naif = Dijkstra(dataf_ex_4, 'Départ', 'Arrivé', 'Distance',
+                    strategie='naif')
+    naif.chemin_destination('Paris', 'Rennes')
+    assert naif.noeuds_fixes == 4
+
+
+@pytest.mark.parametrize('processus', [1, 2])
+def test_matrice_couts_dijkstra(processus):
+    """
+    Test de la matrice des coûts et des prédécesseurs de matrice_couts.
+    """
+    dijkstra = Dijkstra(dataf_ex_4, 'Départ', 'Arrivé', 'Distance')
+    couts, predecesseurs = dijkstra.matrice_couts(
+        ['Paris', 'Bastia'], ['Marseille', 'Ajaccio', 'Paris'],
+        predecesseurs=True, processus=processus)
+    np.testing.assert_array_equal(couts, [[6, np.inf, 0], [np.inf, 4, np.inf]])
+    assert predecesseurs.shape == (2, 7)
+    tableau = dijkstra.matrice_couts(['Paris'], ['Lyon', 'Tarbes'],
+                                     format='dataframe',
+                                     processus=processus)
+    assert tableau.loc['Paris', 'Tarbes'] == 5
+    with pytest.raises(ValueError, match="Nice n'est pas un noeud"):
+        dijkstra.matrice_couts(['Paris'], ['Nice'])
+
+
+@pytest.mark.parametrize('''dataf, source, destination, k, resultat''', [
+  (dataf_ex_4, 'Paris', 'Marseille', 3,
+   [[['Paris', 'Lyon', 'Marseille'], 6],
+    [['Paris', 'Rennes', 'Lyon', 'Marseille'], 8]]),
+  (dataf_ex_4, 'Marseille', 'Paris', 1, [[['Marseille', 'Lyon', 'Paris'], 6]]),
+  (dataf_ex_5, 102, 101, 5,
+   [[[102, 103, 101], 6], [[102, 104, 101], 7], [[102, 103, 104, 101], 8],
+    [[102, 104, 103, 101], 11]])])
+def test_chemins_alternatifs_dijkstra(dataf, source, destination, k, resultat):
+    """
+    Test des k chemins sans boucle les moins coûteux par coût croissant.
+    """
+    dijkstra = Dijkstra(dataf, 'Départ', 'Arrivé', 'Distance')
+    assert dijkstra.chemins_alternatifs(source, destination, k) == resultat
+    assert (dijkstra.chemins_alternatifs(source, destination, 1)[0]
+            == dijkstra.chemin_destination(source, destination))
+
+
+def test_erreur_chemins_alternatifs_dijkstra():
+    """
+    Test des erreurs levées par chemins_alternatifs.
+    """
+    dijkstra = Dijkstra(dataf_ex_4, 'Départ', 'Arrivé', 'Distance')
+    with pytest.raises(ValueError, match='Pas de trajet'):
+        dijkstra.chemins_alternatifs('Bastia', 'Lyon')
+    with pytest.raises(ValueError, match='au moins de 1'):
+        dijkstra.chemins_alternatifs('Paris', 'Lyon', 0)
+
+
+@pytest.mark.parametrize('departs, distances, message_erreur, type_erreur', [
+  ([101, None, 102], [4, 3, 5], MESSAGE_2, ValueError),
+  ([101, 101, 102], [4, None, 5], MESSAGE_2, ValueError),
+  ([101, 101, 102], [4, np.nan, 5], MESSAGE_2, ValueError),
+  ([101, 101, 102], [4, '0', 5], MESSAGE_1, TypeError),
+  ([101, 101, 102], [4, -3.5, 5], MESSAGE_3, ValueError)])
+def test_erreur_colonnes_dijkstra(departs, distances, message_erreur,
+                                  type_erreur):
+    """
+    Test des erreurs de validation des colonnes données sous forme de
+    listes, identiques à celles d'un dataframe.
+    """
+    colonnes = {'Départ': departs, 'Arrivé': [103, 104, 103],
+                'Distance': distances}
+    with pytest.raises(type_erreur, match=re.escape(message_erreur)):
+        Dijkstra(colonnes, 'Départ', 'Arrivé', 'Distance')
+
+
+@pytest.mark.parametrize('conversion', [list, np.asarray])
+def test_colonnes_dijkstra(conversion):
+    """
+    Test de l'égalité des résultats obtenus à partir d'un dictionnaire de
+    listes ou de tableaux NumPy et à partir du dataframe correspondant.
+    """
+    colonnes = {nom: conversion(dataf_ex_4[nom].tolist())
+                for nom in dataf_ex_4.columns}
+    dijkstra = Dijkstra(colonnes, 'Départ', 'Arrivé', 'Distance')
+    attendu = Dijkstra(dataf_ex_4, 'Départ', 'Arrivé', 'Distance')
+    assert dijkstra.graph() == attendu.graph()
+    assert (dijkstra.chemin_destination('Paris', 'Marseille')
+            == attendu.chemin_destination('Paris', 'Marseille'))
+    with pytest.raises(TypeError, match='dictionnaire de colonnes'):
+        Dijkstra(list(colonnes.values()), 'Départ', 'Arrivé', 'Distance')
+
+
+@pytest.mark.parametrize('departs, arrivees', [
+  ([101, 'Paris', 101], ['Paris', 102, 102]),
+  ([101, 103, 101], ['Paris', 'Paris', 102])])
+def test_etiquettes_melangees_dijkstra(departs, arrivees):
+    """
+    Test des étiquettes mêlant nombres et textes données par un dictionnaire
+    de listes : chacune garde son type, comme dans un dataframe.
+    """
+    colonnes = {'Départ': departs, 'Arrivé': arrivees, 'Distance': [1, 1, 5]}
+    dijkstra = Dijkstra(colonnes, 'Départ', 'Arrivé', 'Distance')
+    attendu = Dijkstra(pd.DataFrame(colonnes), 'Départ', 'Arrivé', 'Distance')
+    assert dijkstra.graph() == attendu.graph()
+    assert (dijkstra.chemin_destination(101, 102)
+            == attendu.chemin_destination(101, 102))
+
+
+def test_import_sans_pandas():
+    """
+    Test de l'import du calcul d'itinéraires sans celui de pandas.
+    """
+    code = ("import sys\n"
+            "from plus_court_chemin import Dijkstra, Graphe\n"
+            "assert 'pandas' not in sys.modules\n"
+            "import plus_court_chemin\n"
+            "plus_court_chemin.Traitement\n"
+            "assert 'pandas' in sys.modules\n")
+    dossier = os.path.dirname(os.path.dirname(plus_court_chemin.__file__))
+    subprocess.run([sys.executable, "-c", code], cwd=dossier, check=True)
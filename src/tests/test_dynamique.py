@@ -0,0 +1,94 @@
+""" Tests du module dynamique avec pytest """
+import random
+import pytest
+import numpy as np
+import pandas as pd
+from plus_court_chemin.dijkstra import INFINI, Dijkstra
+from plus_court_chemin.traitement import Traitement
+from plus_court_chemin.dynamique import GrapheDynamique
+
+
+dataf_ex_1 = pd.DataFrame({
+    'Départ': ['Paris', 'Paris', 'Paris', 'Marseille', 'Bastia', 'Marseille',
+               'Lyon', 'Lyon', 'Lyon', 'Rennes', 'Rennes', 'Ajaccio'],
+    'Arrivé': ['Lyon', 'Rennes', 'Tarbes', 'Lyon', 'Ajaccio', 'Rennes',
+               'Marseille', 'Paris', 'Rennes', 'Lyon', 'Paris', 'Bastia'],
+    'Distance': [4, 3, 5, 2, 4, 4, 2, 4, 3, 3, 3, 3.5]
+})
+
+
+def test_modifications_dynamique():
+    """
+    Test de la réparation de l'arbre après la suppression d'une arête de
+    l'arbre puis l'ajout d'un raccourci.
+    """
+    graphe = Traitement(dataf_ex_1, 'Départ', 'Arrivé',
+                        'Distance').graphe_dynamique('Paris')
+    assert graphe.chemin_destination('Marseille') == [
+        ['Paris', 'Lyon', 'Marseille'], 6]
+    # L'arête Lyon -> Marseille est la 7e ligne de la table
+    graphe.supprimer_arete(6)
+    with pytest.raises(ValueError, match='Pas de trajet'):
+        graphe.chemin_destination('Marseille')
+    arete = graphe.ajouter_arete('Rennes', 'Marseille', 1)
+    assert graphe.chemin_destination('Marseille') == [
+        ['Paris', 'Rennes', 'Marseille'], 4]
+    assert graphe.nb_aretes == 12
+    with pytest.raises(ValueError, match="L'arête 6 n'existe pas"):
+        graphe.supprimer_arete(6)
+    assert arete == 12
+
+
+def test_suppression_entier_numpy_dynamique():
+    """
+    Test de la suppression d'une arête désignée par un entier NumPy.
+    """
+    graphe = Traitement(dataf_ex_1, 'Départ', 'Arrivé',
+                        'Distance').graphe_dynamique('Paris')
+    graphe.supprimer_arete(np.arange(12)[6])
+    with pytest.raises(ValueError, match='Pas de trajet'):
+        graphe.chemin_destination('Marseille')
+    with pytest.raises(ValueError, match="L'arête 6.0 n'existe pas"):
+        graphe.supprimer_arete(6.0)
+
+
+@pytest.mark.parametrize('graine', range(5))
+def test_aleatoire_dynamique(graine):
+    """
+    Test de l'égalité des coûts avec un Dijkstra recalculé après chaque
+    modification aléatoire du graphe.
+    """
+    generateur = random.Random(graine)
+    graphe = GrapheDynamique()
+    for _ in range(20):
+        graphe.ajouter_arete(generateur.randrange(8), generateur.randrange(8),
+                             generateur.choice([0, 1, 2, 5]))
+    graphe.ajouter_arete(0, 1, 1)
+    graphe.fixer_source(0)
+    for _ in range(40):
+        aretes = graphe.aretes()
+        if generateur.random() < 0.5:
+            graphe.supprimer_arete(generateur.choice(list(aretes)))
+        else:
+            graphe.ajouter_arete(generateur.randrange(8),
+                                 generateur.randrange(8),
+                                 generateur.choice([0, 1, 2, 5]))
+        aretes = pd.DataFrame(list(graphe.aretes().values()),
+                              columns=['Départ', 'Arrivé', 'Distance'])
+        if not (aretes['Départ'] == 0).any():
+            continue
+        dijkstra = Dijkstra(aretes, 'Départ', 'Arrivé', 'Distance')
+        distances, _ = dijkstra._parcours(dijkstra.graphe.indice(0))
+        attendu = dict(zip(dijkstra.graphe.noeuds.tolist(), distances))
+        for noeud in range(1, 8):
+            assert graphe.distance(noeud) == attendu.get(noeud, INFINI)
+
+
+@pytest.mark.parametrize('poids, erreur', [
+    ('1', TypeError), (True, TypeError), (-1, ValueError)])
+def test_erreur_poids_dynamique(poids, erreur):
+    """
+    Test des erreurs levées pour un poids invalide.
+    """
+    with pytest.raises(erreur):
+        GrapheDynamique().ajouter_arete('Paris', 'Lyon', poids)
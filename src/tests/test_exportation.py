@@ -0,0 +1,78 @@
+"""Tests sur l'exportation des données avec pytest"""
+
+import gzip
+import pytest
+import pandas as pd
+import plus_court_chemin as pcc
+
+
+dataf_ex_1 = pd.DataFrame({'Départ': ['Paris', 'Lyon', 'Rennes', 'Bastia'],
+                           'Arrivé': ['Lyon', 'Marseille', 'Paris', 'Ajaccio'],
+                           'Prix': [4, 2, 3, 3.5]})
+
+
+def morceaux_ex_1():
+    """Découpe dataf_ex_1 en morceaux de deux lignes."""
+    for debut in range(0, len(dataf_ex_1), 2):
+        yield dataf_ex_1.iloc[debut:debut + 2]
+
+
+def test_exportation_csv_morceaux(tmp_path):
+    """Test de l'égalité entre l'export par morceaux et l'export complet"""
+    complet = tmp_path / "complet.csv"
+    flux = tmp_path / "flux.csv"
+    pcc.Exportation(dataf_ex_1, str(complet), "csv").export(";")
+    pcc.Exportation(morceaux_ex_1(), str(flux), "csv").export(";")
+    assert flux.read_text() == complet.read_text()
+
+
+@pytest.mark.parametrize('format, lecture', [
+    ("csv.gz", lambda chemin: pd.read_csv(chemin, sep=";", index_col=0)),
+    ("jsonl", lambda chemin: pd.read_json(chemin, lines=True))])
+@pytest.mark.parametrize('morceaux', [False, True])
+def test_exportation_formats(tmp_path, format, lecture, morceaux):
+    """Test de la relecture des formats compressés et jsonl"""
+    chemin = str(tmp_path / f"export.{format}")
+    donnees = morceaux_ex_1() if morceaux else dataf_ex_1
+    pcc.Exportation(donnees, chemin, format).export(";")
+    assert lecture(chemin).equals(dataf_ex_1)
+    if format == "csv.gz":
+        with gzip.open(chemin, "rt") as fichier:
+            assert fichier.readline().startswith(";Départ")
+
+
+def test_exportation_parquet(tmp_path):
+    """Test de l'export parquet par morceaux"""
+    pytest.importorskip("pyarrow")
+    chemin = str(tmp_path / "export.parquet")
+    pcc.Exportation(morceaux_ex_1(), chemin, "parquet").export()
+    assert pd.read_parquet(chemin).equals(dataf_ex_1)
+
+
+def test_exportation_morceaux_indisponible(tmp_path):
+    """Test de l'erreur levée pour un format non exportable par morceaux"""
+    with pytest.raises(TypeError, match="par morceaux"):
+        pcc.Exportation(morceaux_ex_1(), str(tmp_path / "export.xlsx"),
+                        "xlsx").export()
+
+
+@pytest.mark.parametrize('format', ["csv", "csv.gz", "jsonl", "parquet"])
+def test_exportation_vide(tmp_path, format):
+    """Test de l'export par morceaux sans aucun morceau, identique à
+    l'export d'un DataFrame vide"""
+    if format == "parquet":
+        pytest.importorskip("pyarrow")
+    vide = dataf_ex_1.iloc[:0]
+    flux = tmp_path / f"flux.{format}"
+    complet = tmp_path / f"complet.{format}"
+    pcc.Exportation(iter([]), str(flux), format,
+                    colonnes=list(dataf_ex_1.columns)).export(";")
+    pcc.Exportation([vide], str(complet), format).export(";")
+    if format == "parquet":
+        assert list(pd.read_parquet(flux).columns) == list(vide.columns)
+    else:
+        lire = gzip.open if format == "csv.gz" else open
+        with lire(flux, "rt") as fichier, lire(complet, "rt") as attendu:
+            assert fichier.read() == attendu.read()
+        if format == "csv":
+            assert flux.read_text() == ";Départ;Arrivé;Prix\n"
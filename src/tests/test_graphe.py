@@ -0,0 +1,80 @@
+""" Tests du module graphe avec pytest """
+import re
+import pytest
+import numpy as np
+import pandas as pd
+from plus_court_chemin.graphe import Graphe
+
+
+dataf_ex_1 = pd.DataFrame({
+    'Départ': [103, 101, 101, 102, 103],
+    'Arrivé': [101, 102, 103, 103, 104],
+    'Distance': [1, 2, 5, 1, 3.5]
+})
+
+
+def test_structure_graphe():
+    """
+    Test de la structure CSR construite par depuis_dataframe.
+    """
+    graphe = Graphe.depuis_dataframe(dataf_ex_1, 'Départ', 'Arrivé',
+                                     'Distance')
+    assert graphe.noeuds.tolist() == [101, 102, 103, 104]
+    assert graphe.offsets.tolist() == [0, 2, 3, 5, 5]
+    assert graphe.cibles.tolist() == [1, 2, 2, 0, 3]
+    assert graphe.poids.tolist() == [2, 5, 1, 1, 3.5]
+    assert graphe.ordre.tolist() == [1, 2, 3, 0, 4]
+    assert graphe.est_origine(103) and not graphe.est_origine(104)
+    assert graphe.est_destination(104) and not graphe.est_destination(105)
+
+
+@pytest.mark.parametrize('distances, message_erreur, type_erreur', [
+    ([1, 2, None, 1, 3], "Valeurs manquantes", ValueError),
+    ([1, 2, '0', 1, 3], "Distances non numeriques", TypeError),
+    ([1, 2, -1, 1, 3], "Distances non strictement positives", ValueError)])
+def test_erreur_graphe(distances, message_erreur, type_erreur):
+    """
+    Test des erreurs de validation vectorisée de depuis_dataframe.
+    """
+    dataf = dataf_ex_1.assign(Distance=distances)
+    with pytest.raises(type_erreur, match=re.escape(message_erreur)):
+        Graphe.depuis_dataframe(dataf, 'Départ', 'Arrivé', 'Distance')
+
+
+def test_poids_objet_graphe():
+    """
+    Test d'une colonne de distances de type objet mais numérique.
+    """
+    dataf = dataf_ex_1.assign(
+        Distance=np.array([1, 2, 5, 1, 3.5], dtype=object))
+    graphe = Graphe.depuis_dataframe(dataf, 'Départ', 'Arrivé', 'Distance')
+    assert graphe.poids.tolist() == [2, 5, 1, 1, 3.5]
+
+
+def test_depuis_morceaux_graphe():
+    """
+    Test de la construction d'un graphe à partir d'une table lue par
+    morceaux.
+    """
+    morceaux = [dataf_ex_1.iloc[debut:debut + 2] for debut in range(0, 5, 2)]
+    graphe = Graphe.depuis_morceaux(morceaux, 'Départ', 'Arrivé', 'Distance')
+    attendu = Graphe.depuis_dataframe(dataf_ex_1, 'Départ', 'Arrivé',
+                                      'Distance')
+    assert graphe.empreinte() == attendu.empreinte()
+    with pytest.raises(ValueError, match="Aucune arête"):
+        Graphe.depuis_morceaux([], 'Départ', 'Arrivé', 'Distance')
+
+
+def test_preparer_graphe():
+    """
+    Test du calcul à l'avance des structures dérivées, conservées ensuite.
+    """
+    graphe = Graphe.depuis_dataframe(dataf_ex_1, 'Départ', 'Arrivé',
+                                     'Distance')
+    graphe.preparer()
+    listes = graphe.listes()
+    assert listes == ([0, 2, 3, 5, 5], [1, 2, 2, 0, 3], [2, 5, 1, 1, 3.5])
+    graphe.preparer()
+    assert graphe.listes() is listes
+    assert graphe.indice(103) == 2
+    assert graphe.est_destination(101) and not graphe.est_destination(105)
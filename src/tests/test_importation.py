@@ -2,6 +2,7 @@
 
 import pytest
 import openpyxl
+import pandas as pd
 import plus_court_chemin as pcc
 
 #  Tests de lecture de fichiers
@@ -38,3 +39,120 @@ def test_importation_fusion(fichier1, fichier2, clef1, clef2,
     """Test de la méthode fusion de Importation"""
     assert (fichier1.fusion(clef1, clef2, type_fusion, fichier2).iat[0, 2]
             == resultat_attendu)
+
+
+@pytest.mark.parametrize('type_fusion', ["inner", "left"])
+def test_importation_fusion_indexee(type_fusion):
+    """Test de la fusion indexée, comparée à pandas.merge"""
+    fichier1 = pcc.Importation("././data/lettres_type.xlsx")
+    fichier2 = pcc.Importation("././data/lettres_position.csv")
+    attendu = pd.merge(fichier1.lecture(), fichier2.lecture(),
+                       left_on="Lettre", right_on="lettre", how=type_fusion)
+    assert fichier1.fusion("Lettre", "lettre", type_fusion,
+                           fichier2).equals(attendu)
+    assert "lettre" in fichier2._index_clefs
+    assert fichier1.fusion("Lettre", "lettre", type_fusion,
+                           fichier2.lecture()).equals(attendu)
+
+
+@pytest.mark.parametrize('type_fusion', ["inner", "left", "right", "outer"])
+def test_importation_fusion_ordre(tmp_path, type_fusion):
+    """Test de l'ordre des lignes de chaque type de fusion, comparé à
+    pandas.merge, avec des clefs répétées ou absentes de l'un des
+    fichiers"""
+    gauche = tmp_path / "gauche.csv"
+    gauche.write_text("code;prix\n5;10\n4;20\n5;30\n9;40\n4;50\n1;60\n")
+    droite = pd.DataFrame({"code": [4, 1, 5, 4, 7], "nom": list("abcde")})
+    fichier1 = pcc.Importation(str(gauche))
+    attendu = pd.merge(fichier1.lecture(), droite, on="code",
+                       how=type_fusion)
+    assert fichier1.fusion("code", None, type_fusion, droite).equals(attendu)
+
+
+def test_importation_fusion_types_clefs(tmp_path):
+    """Test de l'erreur levée, comme par pandas.merge, pour des clefs de
+    types incompatibles"""
+    gauche = tmp_path / "gauche.csv"
+    gauche.write_text("code;prix\n1;10\n2;20\n")
+    droite = pd.DataFrame({"code": ["1", "2"], "nom": ["a", "b"]})
+    with pytest.raises(ValueError):
+        pcc.Importation(str(gauche)).fusion("code", None, "inner", droite)
+
+
+def test_importation_fusion_clefs_multiples(tmp_path):
+    """Test de la fusion indexée avec des clefs répétées et de la
+    relecture d'un fichier modifié"""
+    gauche = tmp_path / "gauche.csv"
+    gauche.write_text("code;prix\n1;10\n2;20\n3;30\n")
+    droite = tmp_path / "droite.csv"
+    droite.write_text("code;nom\n1;a\n1;b\n2;c\n")
+    fichier1 = pcc.Importation(str(gauche))
+    fichier2 = pcc.Importation(str(droite))
+    fusion = fichier1.fusion("code", None, "left", fichier2)
+    assert fusion["nom"].tolist()[:3] == ["a", "b", "c"]
+    assert fusion["nom"].isna().tolist() == [False, False, False, True]
+    droite.write_text("code;nom\n3;d\n")
+    assert fichier1.fusion("code", None, "inner",
+                           fichier2)["nom"].tolist() == ["d"]
+
+
+#  Tests du cache de lecture
+
+def test_importation_cache(tmp_path):
+    """Test du cache de la méthode lecture de Importation"""
+    source = tmp_path / "lettres.csv"
+    source.write_text("lettre;position\na;1\nb;2\n")
+    dossier = tmp_path / "cache"
+    fichier = pcc.Importation(str(source), cache=str(dossier))
+    premiere = fichier.lecture()
+    assert len(list(dossier.iterdir())) == 1
+    assert fichier.lecture().equals(premiere)
+    projection = pcc.Importation(str(source), cache=str(dossier),
+                                 colonnes=["lettre"])
+    projection.lecture()
+    assert len(list(dossier.iterdir())) == 2
+    assert fichier.lecture().equals(premiere)
+    assert len(list(dossier.iterdir())) == 2
+    source.write_text("lettre;position\na;1\nb;2\nc;3\n")
+    assert fichier.lecture().iat[2, 1] == 3
+    assert len(list(dossier.iterdir())) == 1
+
+
+#  Tests de lecture partielle et par morceaux
+
+@pytest.mark.parametrize(
+    'fichier, colonnes_attendues',
+    [(pcc.Importation("././data/referentiel-gares-voyageurs.csv",
+                      colonnes=["Intitulé plateforme", "Code UIC"],
+                      types={"Code UIC": "int64"}),
+      ["Intitulé plateforme", "Code UIC"]),
+     (pcc.Importation("././data/air_routes_edges.csv", ",",
+                      colonnes=["from", "to", "dist"],
+                      types={"dist": "float64"}),
+      ["from", "to", "dist"])]
+)
+def test_importation_colonnes(fichier, colonnes_attendues):
+    """Test de la sélection des colonnes et de leur type"""
+    data = fichier.lecture()
+    assert list(data.columns) == colonnes_attendues
+    for colonne, type_colonne in fichier.types.items():
+        assert data[colonne].dtype == type_colonne
+
+
+@pytest.mark.parametrize(
+    'fichier, taille',
+    [(pcc.Importation("././data/air_routes_edges.csv", ","), 1000),
+     (pcc.Importation("././data/lettres_type.xlsx"), 1)]
+)
+def test_importation_morceaux(fichier, taille):
+    """Test de la méthode lecture_par_morceaux de Importation"""
+    morceaux = list(fichier.lecture_par_morceaux(taille))
+    assert all(len(morceau) <= taille for morceau in morceaux)
+    assert pd.concat(morceaux).equals(fichier.lecture())
+
+
+def test_importation_morceaux_taille():
+    """Test de l'erreur levée pour une taille de morceau invalide"""
+    fichier = pcc.Importation("././data/air_routes_edges.csv", ",")
+    with pytest.raises(ValueError):
+        next(fichier.lecture_par_morceaux(0))
@@ -0,0 +1,63 @@
+""" Tests du module reperes avec pytest """
+import pytest
+import pandas as pd
+from plus_court_chemin.dijkstra import Dijkstra
+from plus_court_chemin.reperes import Reperes
+
+
+dataf_ex_1 = pd.DataFrame({
+    'Départ': ['Paris', 'Paris', 'Paris', 'Marseille', 'Bastia', 'Marseille',
+               'Lyon', 'Lyon', 'Lyon', 'Rennes', 'Rennes', 'Ajaccio'],
+    'Arrivé': ['Lyon', 'Rennes', 'Tarbes', 'Lyon', 'Ajaccio', 'Rennes',
+               'Marseille', 'Paris', 'Rennes', 'Lyon', 'Paris', 'Bastia'],
+    'Distance': [4, 3, 5, 2, 4, 4, 2, 4, 3, 3, 3, 3.5]
+})
+dijkstra_ex_1 = Dijkstra(dataf_ex_1, 'Départ', 'Arrivé', 'Distance')
+
+
+@pytest.mark.parametrize('nombre', [1, 2, 10])
+@pytest.mark.parametrize('source, destination', [
+    ('Paris', 'Marseille'), ('Marseille', 'Tarbes'), ('Rennes', 'Marseille'),
+    ('Ajaccio', 'Bastia')])
+def test_resultat_reperes(nombre, source, destination):
+    """
+    Test de l'égalité des résultats avec Dijkstra.chemin_destination.
+    """
+    assert (Reperes(dijkstra_ex_1, nombre).chemin_destination(source,
+                                                             destination)
+            == dijkstra_ex_1.chemin_destination(source, destination))
+
+
+def test_pas_de_trajet_reperes():
+    """
+    Test de l'erreur levée sans chemin possible.
+    """
+    with pytest.raises(ValueError, match='Pas de trajet'):
+        Reperes(dijkstra_ex_1, 2).chemin_destination('Bastia', 'Lyon')
+
+
+def test_sauvegarde_reperes(tmp_path):
+    """
+    Test de l'enregistrement des repères et de la vérification du graphe
+    à la relecture.
+    """
+    chemin = tmp_path / 'reperes.npz'
+    Reperes(dijkstra_ex_1, 3).sauvegarder(chemin)
+    assert (Reperes(dijkstra_ex_1, chemin=chemin).chemin_destination(
+        'Paris', 'Marseille') == [['Paris', 'Lyon', 'Marseille'], 6])
+    autre = Dijkstra(dataf_ex_1.assign(Distance=1), 'Départ', 'Arrivé',
+                     'Distance')
+    with pytest.raises(ValueError, match='ne correspondent pas'):
+        Reperes(autre, chemin=chemin)
+
+
+def test_comparer_reperes():
+    """
+    Test du rapport de comparaison, sans noeud fixé pour une paire
+    invalide.
+    """
+    rapport = Reperes(dijkstra_ex_1, 2).comparer([('Paris', 'Marseille'),
+                                                  ('Paris', 'Inconnue')])
+    assert rapport[0]['cout'] == 6 and rapport[0]['noeuds_dijkstra'] > 0
+    assert rapport[1]['cout'] is None
+    assert rapport[1]['noeuds_reperes'] == rapport[1]['noeuds_dijkstra'] == 0
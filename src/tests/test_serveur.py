@@ -0,0 +1,122 @@
+""" Tests du service par plusieurs processus avec pytest """
+import json
+import multiprocessing
+import os
+import socket
+import sys
+import time
+import urllib.request
+import pytest
+
+# serveur est un module de l'application, à la racine du dépôt
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__)))))
+
+from cache_itineraires import CacheItineraires  # noqa: E402
+from metriques import Metriques  # noqa: E402
+from serveur import TableAnnulations, servir  # noqa: E402
+from src.plus_court_chemin import RechercheAnnulee  # noqa: E402
+
+
+def test_annulation_en_cours():
+    """
+    Test de l'annulation d'une recherche enregistrée puis retirée.
+    """
+    table = TableAnnulations()
+    table.enregistrer("a")
+    jeton = table.jeton("a")
+    assert not jeton.annule
+    assert table.annuler("a")
+    with pytest.raises(RechercheAnnulee):
+        jeton.verifier()
+    table.retirer("a")
+    assert not table.est_annulee("a")
+
+
+def test_annulation_anticipee():
+    """
+    Test de l'annulation reçue avant l'enregistrement de la recherche.
+    """
+    table = TableAnnulations()
+    assert not table.annuler("a")
+    table.enregistrer("a")
+    with pytest.raises(RechercheAnnulee):
+        table.jeton("a").verifier()
+    table.retirer("a")
+    table.enregistrer("a")
+    assert not table.jeton("a").annule
+
+
+def test_annulation_case_occupee():
+    """
+    Test de l'annulation d'une recherche inconnue dont la case est occupée
+    par une autre recherche en cours.
+    """
+    table = TableAnnulations(nb_cases=1)
+    table.enregistrer("a")
+    assert not table.annuler("b")
+    assert not table.est_annulee("a")
+    assert table.annuler("a")
+
+
+def application_compteurs(cache, metriques):
+    """Application WSGI comptant ses requêtes dans le cache et les
+    métriques ; /stats renvoie leurs compteurs."""
+    def application(environ, start_response):
+        if environ["PATH_INFO"] == "/stats":
+            corps = json.dumps([cache.statistiques(), metriques.exposer()])
+        else:
+            cache.obtenir(environ["PATH_INFO"], lambda: None)
+            metriques.observer("requete", 0.001)
+            corps = str(os.getpid())
+        start_response("200 OK", [("Content-Type", "text/plain")])
+        return [corps.encode()]
+    return application
+
+
+def lire(port, chemin):
+    """Renvoie le corps de la réponse à une requête GET."""
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}{chemin}",
+                                timeout=5) as reponse:
+        return reponse.read().decode()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork indisponible")
+def test_compteurs_partages():
+    """
+    Test des compteurs du cache et des métriques, totaux des requêtes
+    servies par deux processus de service.
+    """
+    with socket.socket() as libre:
+        libre.bind(("127.0.0.1", 0))
+        port = libre.getsockname()[1]
+    cache = CacheItineraires()
+    metriques = Metriques()
+    service = multiprocessing.get_context("fork").Process(
+        target=servir, args=(application_compteurs(cache, metriques),
+                             "127.0.0.1", port, 2))
+    service.start()
+    try:
+        echeance = time.monotonic() + 30
+        while True:
+            try:
+                lire(port, "/stats")
+                break
+            except OSError:
+                if time.monotonic() > echeance:
+                    raise
+                time.sleep(0.1)
+        processus = set()
+        nb_requetes = 0
+        while len(processus) < 2 and time.monotonic() < echeance:
+            processus.add(lire(port, f"/{nb_requetes}"))
+            nb_requetes += 1
+        assert len(processus) == 2
+        for _ in range(4):
+            statistiques, exposition = json.loads(lire(port, "/stats"))
+            assert statistiques["echecs"] == nb_requetes
+            assert (f'pcc_etape_duree_secondes_count{{etape="requete"}} '
+                    f'{nb_requetes}') in exposition
+    finally:
+        service.terminate()
+        service.join(10)
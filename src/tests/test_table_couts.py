@@ -0,0 +1,67 @@
+""" Tests de la table des coûts précalculés avec pytest """
+import pytest
+import pandas as pd
+from plus_court_chemin.dijkstra import Dijkstra
+from plus_court_chemin.table_couts import TableCouts
+
+
+dataf_ex_1 = pd.DataFrame({
+    'Départ': ['Paris', 'Paris', 'Paris', 'Marseille', 'Bastia', 'Marseille',
+               'Lyon', 'Lyon', 'Lyon', 'Rennes', 'Rennes', 'Ajaccio'],
+    'Arrivé': ['Lyon', 'Rennes', 'Tarbes', 'Lyon', 'Ajaccio', 'Rennes',
+               'Marseille', 'Paris', 'Rennes', 'Lyon', 'Paris', 'Bastia'],
+    'Distance': [4, 3, 5, 2, 4, 4, 2, 4, 3, 3, 3, 3.5]
+})
+
+dataf_ex_2 = pd.DataFrame({
+    'Départ': [101, 101, 101, 102, 107, 102, 103, 103, 103, 104, 104, 106],
+    'Arrivé': [103, 104, 105, 103, 106, 104, 102, 101, 104, 103, 101, 107],
+    'Distance': [4, 3, 5, 2, 4, 4, 2, 4, 3, 3, 3, 3]
+})
+
+
+def resultat(fonction, source, destination):
+    """Renvoie le chemin trouvé ou le message d'erreur."""
+    try:
+        return fonction(source, destination)
+    except ValueError as erreur:
+        return str(erreur)
+
+
+@pytest.mark.parametrize('dataf', [dataf_ex_1, dataf_ex_2])
+def test_resultat_table_couts(dataf, tmp_path):
+    """
+    Test de l'égalité des chemins lus dans la table, calculée ou relue,
+    avec ceux de chemin_destination pour toutes les paires de noeuds.
+    """
+    dijkstra = Dijkstra(dataf, 'Départ', 'Arrivé', 'Distance')
+    table = TableCouts(dijkstra, processus=1)
+    chemin = str(tmp_path / "table.pccg")
+    table.sauvegarder(chemin)
+    relue = TableCouts(dijkstra, chemin=chemin)
+    noeuds = dijkstra.graphe.noeuds.tolist()
+    for source in noeuds:
+        for destination in noeuds:
+            attendu = resultat(dijkstra.chemin_destination, source,
+                               destination)
+            assert resultat(table.chemin_destination, source,
+                            destination) == attendu
+            assert resultat(relue.chemin_destination, source,
+                            destination) == attendu
+
+
+def test_erreur_table_couts(tmp_path):
+    """
+    Test des erreurs levées par une table ne correspondant pas au graphe
+    ou interrogée depuis une source absente.
+    """
+    dijkstra = Dijkstra(dataf_ex_1, 'Départ', 'Arrivé', 'Distance')
+    table = TableCouts(dijkstra, sources=['Paris'], processus=1)
+    assert 'Paris' in table and 'Lyon' not in table
+    with pytest.raises(ValueError, match="pas une source"):
+        table.chemin_destination('Lyon', 'Paris')
+    chemin = str(tmp_path / "table.pccg")
+    table.sauvegarder(chemin)
+    autre = Dijkstra(dataf_ex_2, 'Départ', 'Arrivé', 'Distance')
+    with pytest.raises(ValueError, match="ne correspond pas"):
+        TableCouts(autre, chemin=chemin)
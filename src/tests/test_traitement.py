@@ -0,0 +1,100 @@
+""" Tests du module traitement avec pytest """
+import pytest
+import numpy as np
+import pandas as pd
+from plus_court_chemin.traitement import Traitement
+
+
+dataf_ex_1 = pd.DataFrame({
+    'Départ': ['Paris', 'Paris', 'Paris', 'Marseille', 'Bastia', 'Lyon'],
+    'Arrivé': ['Lyon', 'Rennes', 'Tarbes', 'Lyon', 'Ajaccio', 'Marseille'],
+    'Distance': [4, 3, np.nan, 2, 4, 2],
+    'Transporteur': ['TGV', 'TER', 'TGV', 'TER', 'Bateau', 'TGV']
+})
+traitement_ex_1 = Traitement(dataf_ex_1, 'Départ', 'Arrivé', 'Distance')
+aretes_ex_1 = pd.DataFrame({'Départ': ['Lyon', 'Tarbes'],
+                            'Arrivé': ['Rennes', 'Paris'],
+                            'Distance': [1, np.nan]})
+
+
+@pytest.mark.parametrize('plan, attendu', [
+    (traitement_ex_1.plan().filtrer('Transporteur', '!=', 'TER')
+     .filtrer('Distance', '<', 4),
+     dataf_ex_1[dataf_ex_1['Transporteur'] != 'TER'].pipe(
+         lambda df: df[df['Distance'] < 4])),
+    (traitement_ex_1.plan().retirer_manquant().supprimer_arete([0, 4]),
+     dataf_ex_1.dropna().drop([0, 4])),
+    (traitement_ex_1.plan().ajouter_aretes(aretes_ex_1).retirer_manquant(
+        ['Distance']),
+     pd.concat([dataf_ex_1, aretes_ex_1], ignore_index=True).dropna(
+         subset=['Distance']).reset_index(drop=True)),
+    (traitement_ex_1.plan().filtrer('Transporteur', '==', 'TGV')
+     .ajouter_aretes(aretes_ex_1),
+     pd.concat([dataf_ex_1[dataf_ex_1['Transporteur'] == 'TGV'], aretes_ex_1],
+               ignore_index=True))])
+def test_dataframe_plan(plan, attendu):
+    """
+    Test de l'égalité du plan matérialisé avec les traitements appliqués
+    un par un.
+    """
+    assert plan.dataframe().equals(attendu)
+
+
+def test_graphe_plan():
+    """
+    Test de la matérialisation directe du plan en graphe et en Dijkstra.
+    """
+    plan = (traitement_ex_1.plan().filtrer('Transporteur', '!=', 'Bateau')
+            .ajouter_aretes(aretes_ex_1).retirer_manquant(['Distance']))
+    graphe = plan.graphe()
+    assert graphe.nb_aretes == 5
+    assert graphe.est_origine('Lyon') and not graphe.est_origine('Bastia')
+    assert plan.dijkstra().chemin_destination('Paris', 'Rennes') == [
+        ['Paris', 'Rennes'], 3]
+
+
+def test_erreurs_plan():
+    """
+    Test des erreurs levées par le plan.
+    """
+    with pytest.raises(ValueError, match='Condition invalide'):
+        traitement_ex_1.plan().filtrer('Distance', '=>', 3)
+    with pytest.raises(TypeError):
+        traitement_ex_1.plan().ajouter_aretes([['Lyon', 'Rennes', 1]])
+    with pytest.raises(KeyError):
+        traitement_ex_1.plan().supprimer_arete(10).dataframe()
+
+
+gares_ex_1 = pd.DataFrame({
+    'Code UIC': [87686006, 87686006, 87547000, 87686667, 87723197, 87000000],
+    'Longitude': [2.3733, 2.3735, 2.3656, 2.3826, 4.8596, np.nan],
+    'Latitude': [48.8443, 48.8444, 48.8420, 48.8390, 45.7606, 48.8443]
+})
+
+
+@pytest.mark.parametrize('rayon, paires', [
+    (100, set()),
+    (700, {(87547000, 87686006)}),
+    (1000, {(87547000, 87686006), (87686006, 87686667)}),
+    (1500, {(87547000, 87686006), (87686006, 87686667),
+            (87547000, 87686667)})])
+def test_correspondances(rayon, paires):
+    """
+    Test des correspondances générées entre gares proches, dans les deux
+    sens, sans correspondance entre plateformes d'une même gare.
+    """
+    traitement = Traitement(dataf_ex_1, 'Départ', 'Arrivé', 'Distance')
+    aretes = traitement.correspondances(gares_ex_1, rayon, 2)
+    assert list(aretes.columns) == ['Départ', 'Arrivé', 'Distance']
+    assert set(zip(aretes['Départ'], aretes['Arrivé'])) == (
+        paires | {(arrivee, depart) for depart, arrivee in paires})
+    assert len(aretes) == 2 * len(paires)
+    assert (aretes['Distance'] == 2).all()
+
+
+def test_erreur_correspondances():
+    """
+    Test de l'erreur levée pour un rayon négatif ou nul.
+    """
+    with pytest.raises(ValueError, match='strictement positif'):
+        traitement_ex_1.correspondances(gares_ex_1, 0, 2)